@@ -1,8 +1,25 @@
 import streamlit as st
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 from config.settings import Settings
-from aurion import GeminiEngine, PromptController, Memory, Assistant, VoiceHandler
+from aurion import GeminiEngine, PromptController, Memory, Assistant
+from aurion.storage import create_storage
+from aurion.sqlite_memory import SQLiteMemory
+from aurion.response_cache import CachedEngine, ResponseCache
+from aurion.retention import RetentionPolicy, RetentionSweeper
+from aurion.summarizer import ConversationSummarizer
+from aurion.resilience import ResilientEngine
+from aurion.scheduler import RateLimiter, SchedulingEngine
+from aurion.router import ModelRouter, ModelTier
+from aurion.search import SearchIndex
+from aurion.service import RemoteAssistant, ServiceClient
+from aurion.instrumentation import tracer, RingBufferSink, JSONLSink, PrometheusSink
+from aurion.streaming import StreamBuffer
+from aurion.templates import TemplateRegistry, default_registry, set_default_registry
+from aurion.voice_pipeline import GoogleWebRecognizer, MicrophoneSource, SphinxRecognizer, VoicePipeline
 
 
 # Page configuration
@@ -62,25 +79,173 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+MESSAGES_PAGE_SIZE = 30
+CONVERSATIONS_PAGE_SIZE = 20
+
+
+def open_memory(backend: str) -> Memory:
+    if backend == "sqlite":
+        return SQLiteMemory(Settings.get_memory_db())
+    memory_file = Settings.get_memory_file()
+    memory = Memory(memory_file, storage=create_storage(backend, memory_file), background_writes=True)
+    idle_days = Settings.get_archive_idle_days()
+    if idle_days is not None:
+        result = memory.archive_idle(idle_days * 86400)
+        if result['archived']:
+            print(f"Archived {result['archived']} idle conversations "
+                  f"({result['raw_bytes']} -> {result['archived_bytes']} bytes)")
+    return memory
+
+
+@st.cache_resource
+def start_memory_load(backend: str) -> Future:
+    """Load the history on a background thread so the page can paint meanwhile"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="aurion-memory-load").submit(open_memory, backend)
+
+
+@st.cache_resource
+def get_shared_memory(backend: str) -> Memory:
+    """One Memory per process, shared by every session"""
+    return start_memory_load(backend).result()
+
+
+@st.cache_resource
+def get_shared_retriever(backend: str):
+    """Embedding index over all conversations, or None when NumPy is missing"""
+    from aurion.retrieval import Retriever  # Imports NumPy, so only when recall is enabled
+    try:
+        retriever = Retriever(get_shared_memory(backend), index_path="data/embeddings")
+    except ImportError as e:
+        print(f"Semantic recall disabled: {e}")
+        return None
+    retriever.backfill()
+    return retriever
+
+
+@st.cache_resource
+def get_retention_sweeper(backend: str) -> Optional[RetentionSweeper]:
+    """Background sweeper applying the configured retention limits, or None when none are set"""
+    max_mb = Settings.get_retention_max_mb()
+    idle_days = Settings.get_retention_idle_days()
+    policy = RetentionPolicy(
+        max_messages_per_conversation=Settings.get_retention_max_messages(),
+        max_total_bytes=int(max_mb * 1024 * 1024) if max_mb is not None else None,
+        idle_ttl_seconds=idle_days * 86400 if idle_days is not None else None,
+        max_resident_conversations=Settings.get_max_resident_conversations()
+    )
+    if not policy.is_enabled():
+        return None
+    return RetentionSweeper(get_shared_memory(backend), policy, Settings.get_retention_interval()).start()
+
+
+@st.cache_resource
+def get_search_index(backend: str) -> SearchIndex:
+    """Full-text index over every conversation, kept current by Memory"""
+    return SearchIndex(get_shared_memory(backend))
+
+
+@st.cache_resource
+def get_shared_summarizer(backend: str, api_key: str, requests_per_second: float, tokens_per_minute,
+                          model_tiers=None) -> ConversationSummarizer:
+    """One summarizer per Memory, so sessions share its worker and never fold the same turns twice"""
+    engine = get_shared_engine(api_key, requests_per_second, tokens_per_minute, model_tiers)
+    return ConversationSummarizer(engine, get_shared_memory(backend))
+
+
+@st.cache_resource
+def get_template_registry(roles_dir: Optional[str]) -> TemplateRegistry:
+    """Role templates, reloaded when their files change; shared by every session"""
+    registry = TemplateRegistry(roles_dir) if roles_dir else default_registry()
+    set_default_registry(registry)
+    return registry
+
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(disk_path="data/response_cache.db")
+
+
+@st.cache_resource
+def get_shared_engine(api_key: str, requests_per_second: float, tokens_per_minute,
+                      model_tiers=None) -> SchedulingEngine:
+    """
+    One rate limiter and request coalescer per process, shared by every
+    session; with ``model_tiers`` (fast, slow) requests are routed per prompt
+    """
+    limiter = RateLimiter(requests_per_second, tokens_per_minute)
+    if not model_tiers:
+        return SchedulingEngine(ResilientEngine(GeminiEngine(api_key, request_timeout=60.0)), limiter)
+    
+    tiers = []
+    for model_name in model_tiers:
+        input_cost, output_cost = Settings.MODEL_PRICES.get(model_name, (0.0, 0.0))
+        engine = ResilientEngine(GeminiEngine(api_key, model_name, request_timeout=30.0), deadline=30.0)
+        tiers.append(ModelTier(model_name, engine, input_cost, output_cost))
+    return SchedulingEngine(ModelRouter(*tiers), limiter)
+
+
+@st.cache_resource
+def setup_tracing(enabled: bool, trace_file):
+    """Configure the process-wide tracer once; returns the in-memory sink"""
+    ring = RingBufferSink()
+    if enabled:
+        tracer.enabled = True
+        tracer.add_sink(ring)
+        tracer.add_sink(PrometheusSink(tracer))
+        if trace_file:
+            tracer.add_sink(JSONLSink(trace_file))
+    return ring
+
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'settings' not in st.session_state:
         st.session_state.settings = Settings()
     
+    get_template_registry(st.session_state.settings.get_roles_dir())
+    
+    service_url = st.session_state.settings.get_service_url()
+    if service_url and 'assistant' not in st.session_state:
+        # Thin client: conversations and replies live in the Aurion service
+        st.session_state.service = ServiceClient(service_url)
+        st.session_state.assistant = RemoteAssistant(st.session_state.service)
+        st.session_state.memory = st.session_state.assistant.memory
+    
     if 'api_key' not in st.session_state:
         try:
             st.session_state.api_key = st.session_state.settings.load_api_key()
         except:
             st.session_state.api_key = None
     
+    if 'trace_sink' not in st.session_state:
+        st.session_state.trace_sink = setup_tracing(
+            st.session_state.settings.is_tracing_enabled(),
+            st.session_state.settings.get_trace_file()
+        )
+    
     if 'memory' not in st.session_state:
-        st.session_state.memory = Memory()
+        backend = st.session_state.settings.get_memory_backend()
+        st.session_state.memory = get_shared_memory(backend)
+        st.session_state.retention = get_retention_sweeper(backend)
     
     if 'assistant' not in st.session_state and st.session_state.api_key:
-        engine = GeminiEngine(st.session_state.api_key)
+        settings = st.session_state.settings
+        model_tiers = settings.get_model_tiers() if settings.is_model_routing_enabled() else None
+        base_engine = get_shared_engine(st.session_state.api_key, *settings.get_rate_limits(),
+                                        model_tiers=model_tiers)
+        st.session_state.scheduling_engine = base_engine
+        engine = base_engine
+        if st.session_state.settings.is_response_cache_enabled():
+            engine = CachedEngine(engine, get_response_cache())
         prompt_controller = PromptController()
+        summarizer = get_shared_summarizer(settings.get_memory_backend(), st.session_state.api_key,
+                                           *settings.get_rate_limits(), model_tiers=model_tiers)
+        retriever = None
+        if settings.is_retrieval_enabled():
+            retriever = get_shared_retriever(settings.get_memory_backend())
         st.session_state.assistant = Assistant(
-            engine, prompt_controller, st.session_state.memory
+            engine, prompt_controller, st.session_state.memory,
+            summarizer=summarizer, retriever=retriever
         )
     
     if 'current_conversation_id' not in st.session_state:
@@ -92,20 +257,58 @@ def initialize_session_state():
     if 'streaming' not in st.session_state:
         st.session_state.streaming = True
     
-    if 'voice_handler' not in st.session_state:
-        st.session_state.voice_handler = VoiceHandler()
-    
     if 'voice_input_text' not in st.session_state:
         st.session_state.voice_input_text = None
+    
+    if 'history_window' not in st.session_state:
+        st.session_state.history_window = MESSAGES_PAGE_SIZE
+    
+    if 'conversation_page' not in st.session_state:
+        st.session_state.conversation_page = 0
+
+
+def listen_for_voice_input() -> Optional[str]:
+    """
+    Records and transcribes one utterance, showing the transcript as it
+    grows. Partial transcripts let the assistant prepare the reply's context
+    while the user is still speaking.
+    """
+    recognizer = SphinxRecognizer() if Settings.get_voice_recognizer() == "sphinx" else GoogleWebRecognizer()
+    assistant = st.session_state.assistant
+    conversation_id = st.session_state.current_conversation_id
+    pipeline = VoicePipeline(MicrophoneSource(), recognizer,
+                             on_partial=lambda text: assistant.prepare(text, conversation_id)).start()
+    transcript = st.empty()
+    while not pipeline.is_done():
+        partial = pipeline.partial()
+        if partial:
+            transcript.caption(f"🎤 {partial}…")
+        time.sleep(0.1)
+    transcript.empty()
+    return pipeline.result()
 
 
 def create_new_conversation():
     conv_id = str(uuid.uuid4())[:8]
     st.session_state.memory.create_conversation(conv_id)
     st.session_state.current_conversation_id = conv_id
+    st.session_state.history_window = MESSAGES_PAGE_SIZE
     return conv_id
 
 
+def select_conversation(conv_id):
+    st.session_state.memory.set_current_conversation(conv_id)
+    st.session_state.current_conversation_id = conv_id
+    st.session_state.history_window = MESSAGES_PAGE_SIZE
+
+
+def open_search_result(conv_id, position):
+    select_conversation(conv_id)
+    # Widen the history window so the matching message is rendered
+    count = st.session_state.memory.get_message_count(conv_id)
+    st.session_state.history_window = max(MESSAGES_PAGE_SIZE, count - position)
+
+
 def render_sidebar():
     with st.sidebar:
         st.markdown("### 🤖 Aurion Assistant")
@@ -117,9 +320,44 @@ def render_sidebar():
         
         st.markdown("---")
         
+        st.markdown("### 🔎 Search Messages")
+        
+        message_query = st.text_input("Search messages", key="message_search",
+                                      placeholder='Words or "exact phrase"...',
+                                      label_visibility="collapsed")
+        if message_query:
+            with tracer.span("ui.search"):
+                if 'service' in st.session_state:
+                    results = st.session_state.service.search(message_query, limit=10)
+                else:
+                    index = get_search_index(st.session_state.settings.get_memory_backend())
+                    results = index.search(message_query, limit=10)
+            if not results:
+                st.caption("No matching messages.")
+            for i, result in enumerate(results):
+                speaker = "You" if result['role'] == "user" else "Aurion"
+                if st.button(f"{speaker} · Chat {result['conversation_id'][:4]}: {result['snippet']}",
+                             key=f"search_result_{i}", use_container_width=True):
+                    open_search_result(result['conversation_id'], result['position'])
+                    st.rerun()
+        
+        st.markdown("---")
+        
         st.markdown("### 💬 Conversations")
         
-        conversation_ids = st.session_state.memory.get_conversation_ids()
+        search = st.text_input("Search conversations", key="conversation_search",
+                               placeholder="Filter by id...")
+        
+        memory = st.session_state.memory
+        total = memory.get_conversation_count(search or None)
+        page_count = max(1, -(-total // CONVERSATIONS_PAGE_SIZE))
+        page = min(st.session_state.conversation_page, page_count - 1)
+        
+        conversation_ids = memory.get_conversation_ids(
+            offset=page * CONVERSATIONS_PAGE_SIZE,
+            limit=CONVERSATIONS_PAGE_SIZE,
+            query=search or None
+        )
         
         if not conversation_ids:
             st.info("No conversations yet. Start a new one!")
@@ -135,8 +373,7 @@ def render_sidebar():
                         use_container_width=True,
                         type="primary" if is_current else "secondary"
                     ):
-                        st.session_state.memory.set_current_conversation(conv_id)
-                        st.session_state.current_conversation_id = conv_id
+                        select_conversation(conv_id)
                         st.rerun()
                 
                 with col2:
@@ -145,18 +382,34 @@ def render_sidebar():
                         if st.session_state.current_conversation_id == conv_id:
                             st.session_state.current_conversation_id = None
                         st.rerun()
+            
+            if page_count > 1:
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    if st.button("◀", key="conversations_prev", disabled=page == 0):
+                        st.session_state.conversation_page = page - 1
+                        st.rerun()
+                with col2:
+                    st.caption(f"Page {page + 1} of {page_count}")
+                with col3:
+                    if st.button("▶", key="conversations_next", disabled=page >= page_count - 1):
+                        st.session_state.conversation_page = page + 1
+                        st.rerun()
         
         st.markdown("---")
         
         st.markdown("### ⚙️ Settings")
         
+        if 'service' in st.session_state:
+            roles = st.session_state.assistant.get_available_roles()
+        else:
+            roles = PromptController.get_available_roles()
         role = st.selectbox(
             "Assistant Mode",
-            options=list(PromptController.get_available_roles().keys()),
-            format_func=lambda x: PromptController.get_available_roles()[x],
-            index=list(PromptController.get_available_roles().keys()).index(
-                st.session_state.assistant_role
-            )
+            options=list(roles.keys()),
+            format_func=lambda x: roles[x],
+            index=list(roles.keys()).index(st.session_state.assistant_role)
+            if st.session_state.assistant_role in roles else 0
         )
         
         if role != st.session_state.assistant_role:
@@ -169,6 +422,9 @@ def render_sidebar():
             value=st.session_state.streaming
         )
         
+        if tracer.enabled:
+            render_debug_panel()
+        
         st.markdown("---")
         
         if st.session_state.current_conversation_id:
@@ -180,6 +436,58 @@ def render_sidebar():
                 st.rerun()
 
 
+def render_debug_panel():
+    sink = st.session_state.trace_sink
+    with st.expander("🩺 Performance"):
+        ttft = sink.ttft_percentiles()
+        col1, col2 = st.columns(2)
+        col1.metric("TTFT p50", f"{ttft['p50_ms']:.0f} ms" if ttft['p50_ms'] is not None else "–")
+        col2.metric("TTFT p95", f"{ttft['p95_ms']:.0f} ms" if ttft['p95_ms'] is not None else "–")
+        
+        if 'scheduling_engine' in st.session_state:
+            stats = st.session_state.scheduling_engine.stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Queue depth", stats['queue_depth'])
+            col2.metric("Queue wait p95", f"{stats['wait_p95_ms']:.0f} ms")
+            col3.metric("Coalesced", stats['coalesced'])
+            
+            router = st.session_state.scheduling_engine.engine
+            if isinstance(router, ModelRouter):
+                for model_name, model_stats in router.stats().items():
+                    latency = model_stats['latency_ms']
+                    st.caption(f"{model_name}: {model_stats['calls']} calls, "
+                               f"{f'{latency:.0f} ms' if latency is not None else '–'} EWMA, "
+                               f"{model_stats['fallbacks']} fallbacks, ${model_stats['cost']:.4f}")
+        
+        archive = st.session_state.memory.archive_stats()
+        if archive.get('conversations'):
+            rehydrate_ms = archive['rehydrate_p95_ms']
+            st.caption(f"Archive: {archive['conversations']} conversations, "
+                       f"{archive['archived_bytes'] / 1024:.0f} KiB ({archive['savings']:.0%} saved), "
+                       f"rehydrate p95 {f'{rehydrate_ms:.1f} ms' if rehydrate_ms is not None else '–'}")
+        
+        retention = st.session_state.get('retention')
+        if retention is not None:
+            stats = retention.stats()
+            if stats['sweeps']:
+                st.caption(f"Memory: {stats['conversations']} conversations "
+                           f"({stats['resident_conversations']} in RAM), {stats['messages']} messages, "
+                           f"{stats['bytes'] / 1024:.0f} KiB ({stats['resident_bytes'] / 1024:.0f} KiB in RAM)")
+            st.caption(f"Retention: {stats['sweeps']} sweeps, {stats['expired']} expired, "
+                       f"{stats['trimmed_messages']} messages trimmed, {stats['deleted_for_bytes']} deleted for size, "
+                       f"{stats['evicted']} evicted, last sweep {stats['last_sweep_ms']:.1f} ms")
+        
+        turns = sink.recent_turns(10)
+        if not turns:
+            st.caption("No turns recorded yet.")
+        for turn in reversed(turns):
+            stages = ", ".join(f"{name} {ms:.1f}" for name, ms in sorted(
+                turn['stages_ms'].items(), key=lambda item: -item[1]))
+            ttft_ms = f"{turn['ttft_ms']:.0f}" if turn['ttft_ms'] is not None else "–"
+            st.caption(f"#{turn['turn_id']} {turn['kind']}: {turn['total_ms']:.0f} ms total, "
+                       f"TTFT {ttft_ms} ms — {stages}")
+
+
 def render_message(role, message, timestamp=None):
     if role == "user":
         st.markdown(f"""
@@ -199,20 +507,29 @@ def render_message(role, message, timestamp=None):
         """, unsafe_allow_html=True)
 
 
-def render_chat_interface():
+def render_header():
     st.markdown("""
     <div class="chat-header">
         <h1>🤖 Aurion AI Assistant</h1>
         <p>Your intelligent personal assistant powered by Gemini</p>
     </div>
     """, unsafe_allow_html=True)
-    
+
+
+def render_chat_interface():
     if st.session_state.current_conversation_id is None:
         create_new_conversation()
     
-    history = st.session_state.memory.get_history(
-        st.session_state.current_conversation_id
-    )
+    memory = st.session_state.memory
+    conv_id = st.session_state.current_conversation_id
+    total = memory.get_message_count(conv_id)
+    start = max(0, total - st.session_state.history_window)
+    history = memory.get_history_range(conv_id, start, total)
+    
+    if start > 0:
+        if st.button(f"⬆️ Load older messages ({start} more)", key="load_older"):
+            st.session_state.history_window += MESSAGES_PAGE_SIZE
+            st.rerun()
     
     if not history:
         st.markdown(f"""
@@ -222,14 +539,15 @@ def render_chat_interface():
         </div>
         """, unsafe_allow_html=True)
     else:
-        for msg in history:
-            try:
-                dt = datetime.fromisoformat(msg['timestamp'])
-                time_str = dt.strftime("%I:%M %p")
-            except:
-                time_str = None
-            
-            render_message(msg['role'], msg['message'], time_str)
+        with tracer.span("ui.render_history", messages=len(history)):
+            for msg in history:
+                try:
+                    dt = datetime.fromisoformat(msg['timestamp'])
+                    time_str = dt.strftime("%I:%M %p")
+                except:
+                    time_str = None
+                
+                render_message(msg['role'], msg['message'], time_str)
 
     st.markdown("---")
     
@@ -244,7 +562,7 @@ def render_chat_interface():
     # Handle voice input
     if voice_button:
         with st.spinner("🎤 Listening... Please speak now..."):
-            recognized_text = st.session_state.voice_handler.recognize_speech_from_mic()
+            recognized_text = listen_for_voice_input()
             
             if recognized_text:
                 st.session_state.voice_input_text = recognized_text
@@ -260,19 +578,25 @@ def render_chat_interface():
         with st.spinner("Aurion is thinking..."):
             if st.session_state.streaming:
                 response_placeholder = st.empty()
-                full_response = ""
+                buffer = StreamBuffer()
                 
-                for chunk in st.session_state.assistant.respond_stream(
+                def redraw():
+                    with tracer.span("ui.render_chunk"):
+                        response_placeholder.markdown(f"""
+                        <div class="assistant-message">
+                            <strong>Aurion</strong>
+                            <p>{buffer.text()}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                for _ in st.session_state.assistant.respond_stream(
                     user_input, 
-                    st.session_state.current_conversation_id
+                    st.session_state.current_conversation_id,
+                    buffer=buffer
                 ):
-                    full_response += chunk
-                    response_placeholder.markdown(f"""
-                    <div class="assistant-message">
-                        <strong>Aurion</strong>
-                        <p>{full_response}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    if buffer.should_flush():
+                        redraw()
+                redraw()
             else:
                 response = st.session_state.assistant.respond(
                     user_input, 
@@ -285,10 +609,15 @@ def render_chat_interface():
 
 
 def main():
+    settings = Settings()
+    if not settings.get_service_url():
+        # Start parsing the history, then paint the header while it loads
+        start_memory_load(settings.get_memory_backend())
+    render_header()
     initialize_session_state()
     
-    # Check for API key
-    if not st.session_state.api_key:
+    # Check for API key (the service has its own when the app is a thin client)
+    if 'assistant' not in st.session_state:
         st.error("⚠️ Gemini API Key not found!")
         st.markdown("""
         Please set your Gemini API key in the `.env` file:
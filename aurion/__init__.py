@@ -1,8 +1,30 @@
-from .gemini_engine import GeminiEngine
-from .prompt_controller import PromptController
-from .memory import Memory
-from .assistant import Assistant
-from .voice_handler import VoiceHandler
+import importlib
+
+# Module of each public class. They are imported on first access, so importing
+# the package (or one light class) does not load the Gemini SDK or speech
+# recognition.
+_EXPORTS = {
+    'GeminiEngine': 'gemini_engine',
+    'AsyncGeminiEngine': 'async_engine',
+    'PromptController': 'prompt_controller',
+    'Memory': 'memory',
+    'SQLiteMemory': 'sqlite_memory',
+    'Assistant': 'assistant',
+    'VoiceHandler': 'voice_handler',
+}
 
 # Dunder variable
-__all__ = ['GeminiEngine', 'PromptController', 'Memory', 'JarvisAssistant', 'VoiceHandler']
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
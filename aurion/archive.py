@@ -0,0 +1,255 @@
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+MAGIC = b"AUR1"
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+_EPOCH = datetime(1970, 1, 1)
+_KNOWN_FIELDS = ('role', 'message', 'timestamp', 'tokens', 'error')
+
+
+def _pack_array(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _timestamp_to_int(timestamp: str) -> Optional[int]:
+    """Microseconds since 1970 for a naive ISO timestamp, or None if it is not one"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != timestamp:
+        return None
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+
+def _last_message_at(messages: List[Dict[str, Any]]) -> Optional[float]:
+    """Epoch seconds of the last message's local timestamp, or None if it has none"""
+    try:
+        return datetime.fromisoformat(messages[-1]['timestamp']).timestamp()
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def encode_messages(messages: List[Dict[str, Any]]) -> bytes:
+    """
+    Columnar encoding of a conversation: an interned role table with one
+    byte per message, delta-encoded integer timestamps, token counts, error
+    flags and the concatenated UTF-8 texts with their lengths. Anything that
+    does not fit a column (odd timestamps, extra keys) is kept as JSON, so
+    decoding returns the messages unchanged. The block is zstd-compressed
+    when ``zstandard`` is installed, zlib otherwise.
+    """
+    roles: List[str] = []
+    role_index: Dict[str, int] = {}
+    role_codes = bytearray()
+    deltas = array('q')
+    lengths = array('I')
+    tokens = array('i')
+    errors = bytearray()
+    texts = []
+    extras: Dict[int, Dict[str, Any]] = {}
+    previous = 0
+
+    for i, msg in enumerate(messages):
+        code = role_index.get(msg['role'])
+        if code is None:
+            code = role_index[msg['role']] = len(roles)
+            roles.append(msg['role'])
+        role_codes.append(code)
+
+        micros = _timestamp_to_int(msg.get('timestamp'))
+        extra = {key: value for key, value in msg.items() if key not in _KNOWN_FIELDS}
+        if micros is None:
+            extra['timestamp'] = msg.get('timestamp')
+            micros = previous
+        deltas.append(micros - previous)
+        previous = micros
+
+        text = msg['message'].encode('utf-8')
+        lengths.append(len(text))
+        texts.append(text)
+        tokens.append(msg['tokens'] if msg.get('tokens') is not None else -1)
+        errors.append(1 if msg.get('error') else 0)
+        if extra:
+            extras[i] = extra
+
+    header = json.dumps({'count': len(messages), 'roles': roles,
+                         'extras': {str(i): extra for i, extra in extras.items()}}, ensure_ascii=False)
+    sections = [header.encode('utf-8'), bytes(role_codes), _pack_array(deltas), _pack_array(lengths),
+                _pack_array(tokens), bytes(errors), b"".join(texts)]
+    body = b"".join(struct.pack("<I", len(section)) + section for section in sections)
+
+    if zstandard is not None:
+        return MAGIC + bytes([CODEC_ZSTD]) + zstandard.ZstdCompressor(level=6).compress(body)
+    return MAGIC + bytes([CODEC_ZLIB]) + zlib.compress(body, 6)
+
+
+def decode_messages(data: bytes) -> List[Dict[str, Any]]:
+    if data[:4] != MAGIC:
+        raise ValueError("Not an Aurion archive block")
+    codec = data[4]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ImportError("This archive block is zstd-compressed: pip install zstandard")
+        body = zstandard.ZstdDecompressor().decompress(data[5:])
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(data[5:])
+    else:
+        raise ValueError(f"Unknown archive codec {codec}")
+
+    sections = []
+    offset = 0
+    while offset < len(body):
+        (size,) = struct.unpack_from("<I", body, offset)
+        sections.append(body[offset + 4:offset + 4 + size])
+        offset += 4 + size
+    header_bytes, role_codes, delta_bytes, length_bytes, token_bytes, errors, texts = sections
+
+    header = json.loads(header_bytes.decode('utf-8'))
+    roles = header['roles']
+    extras = header['extras']
+    deltas = _unpack_array('q', delta_bytes)
+    lengths = _unpack_array('I', length_bytes)
+    tokens = _unpack_array('i', token_bytes)
+
+    messages = []
+    micros = 0
+    position = 0
+    for i in range(header['count']):
+        micros += deltas[i]
+        end = position + lengths[i]
+        msg = {
+            'role': roles[role_codes[i]],
+            'message': texts[position:end].decode('utf-8'),
+            'timestamp': (_EPOCH + timedelta(microseconds=micros)).isoformat()
+        }
+        position = end
+        if tokens[i] >= 0:
+            msg['tokens'] = tokens[i]
+        if errors[i]:
+            msg['error'] = True
+        extra = extras.get(str(i))
+        if extra:
+            msg.update(extra)
+        messages.append(msg)
+    return messages
+
+
+class ConversationArchive:
+    """
+    Cold tier for idle conversations: one compressed columnar block per
+    conversation in a SQLite file, with the size it would take as
+    pretty-printed JSON for the space-savings report
+    """
+
+    def __init__(self, path: str = "data/memory_archive.db", max_samples: int = 1000):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archive (conversation_id TEXT PRIMARY KEY, data BLOB NOT NULL, "
+            "messages INTEGER NOT NULL, raw_bytes INTEGER NOT NULL, archived_at REAL NOT NULL, "
+            "last_message_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(archive)")}
+        if 'last_message_at' not in columns:
+            self._conn.execute("ALTER TABLE archive ADD COLUMN last_message_at REAL")
+        self._lock = threading.Lock()
+        self._rehydrations: deque = deque(maxlen=max_samples)
+
+    def put(self, conversation_id: str, messages: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Archive ``messages``; returns (JSON size, archived size) in bytes"""
+        data = encode_messages(messages)
+        raw_bytes = len(json.dumps([dict(msg) for msg in messages], indent=2, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archive (conversation_id, data, messages, raw_bytes, archived_at, "
+                "last_message_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (conversation_id, data, len(messages), raw_bytes, time.time(), _last_message_at(messages))
+            )
+        return raw_bytes, len(data)
+
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, Any]]]:
+        started = time.perf_counter()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM archive WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        messages = decode_messages(row[0])
+        self._rehydrations.append(time.perf_counter() - started)
+        return messages
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM archive WHERE conversation_id = ?", (conversation_id,))
+
+    def index(self) -> Dict[str, Tuple[int, float, Optional[float]]]:
+        """
+        Conversation id -> (JSON size, archived_at, last_message_at) without
+        decoding anything; last_message_at is None for blocks archived before
+        it was recorded
+        """
+        with self._lock:
+            return {conv_id: (raw_bytes, archived_at, last_message_at)
+                    for conv_id, raw_bytes, archived_at, last_message_at in self._conn.execute(
+                        "SELECT conversation_id, raw_bytes, archived_at, last_message_at FROM archive")}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, messages, raw_bytes, archived_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(messages), 0), COALESCE(SUM(raw_bytes), 0), "
+                "COALESCE(SUM(LENGTH(data)), 0) FROM archive"
+            ).fetchone()
+            latencies = sorted(self._rehydrations)
+
+        def pick(pct: float) -> Optional[float]:
+            return latencies[min(len(latencies) - 1, int(round((len(latencies) - 1) * pct)))] * 1000 \
+                if latencies else None
+
+        return {
+            'conversations': count,
+            'messages': messages,
+            'raw_bytes': raw_bytes,
+            'archived_bytes': archived_bytes,
+            'savings': 1 - archived_bytes / raw_bytes if raw_bytes else 0.0,
+            'rehydrations': len(latencies),
+            'rehydrate_p50_ms': pick(0.50),
+            'rehydrate_p95_ms': pick(0.95)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,17 @@
-from typing import Optional, Generator
+import asyncio
+from typing import List, Optional, Generator, AsyncGenerator, Tuple
 from .gemini_engine import GeminiEngine
 from .prompt_controller import PromptController
-from .memory import Memory
+from .memory import Memory, format_message
+from .context_builder import ContextBuilder
+from .instrumentation import tracer
+from .streaming import StreamBuffer
+from .errors import EngineError
+from .scheduler import conversation_scope
 
 class Assistant:
     def __init__(self, engine: GeminiEngine, prompt_controller: PromptController, 
-                 memory: Memory):
+                 memory: Memory, async_engine=None, summarizer=None, retriever=None):
         """
         Initialize Assistant
         
@@ -13,57 +19,195 @@ class Assistant:
             engine: GeminiEngine instance for AI generation
             prompt_controller: PromptController for managing prompts
             memory: Memory instance for conversation history
+            async_engine: Optional AsyncGeminiEngine used by arespond/arespond_stream
+            summarizer: Optional ConversationSummarizer folding old turns into a running summary
+            retriever: Optional Retriever recalling similar messages from older or other conversations
         """
         self.engine = engine
         self.prompt_controller = prompt_controller
         self.memory = memory
-        self._context_window = 10  # Number of previous messages to include
+        self.async_engine = async_engine
+        self.summarizer = summarizer
+        self.retriever = retriever
+        self.retrieval_k = 3  # Recalled messages added to the prompt
+        self._context_window = 10  # Maximum number of previous messages to include
+        self.last_error: Optional[Exception] = None  # Failure of the most recent turn, if any
+        self.context_builder = ContextBuilder(memory)
+        # (conversation, partial input, message count, packed context, recall) from prepare()
+        self._prepared: Optional[Tuple[Optional[str], str, int, List[Tuple[int, str, int]], Optional[List[str]]]] = None
         
     def respond(self, user_input: str, conversation_id: Optional[str] = None) -> str:
-        try:
-            self.memory.add("user", user_input, conversation_id)
-            
-            context = self.memory.get_formatted_history(
-                conversation_id=conversation_id, 
-                limit=self._context_window
-            )
-            
-            prompt = self.prompt_controller.build_prompt(user_input, context)
+        with tracer.turn(conversation_id, "respond") as turn:
+            try:
+                prompt = self._prepare_prompt(user_input, conversation_id)
+
+                with tracer.span("engine.generate"), self._scope(conversation_id):
+                    response = self.engine.generate(prompt)
+                tracer.first_token()
+
+                self._store_reply(response, conversation_id)
+                
+                return response
+                
+            except Exception as e:
+                return self._handle_error(e, conversation_id, turn)
+    
+    def respond_stream(self, user_input: str, conversation_id: Optional[str] = None,
+                       buffer: Optional[StreamBuffer] = None) -> Generator[str, None, None]:
+        """
+        Stream the reply chunk by chunk. Chunks are collected in ``buffer``
+        (a fresh StreamBuffer if none is given), so a UI can share the same
+        buffer for throttled redraws instead of keeping its own copy.
+        """
+        buffer = buffer if buffer is not None else StreamBuffer()
+        with tracer.turn(conversation_id, "respond_stream") as turn:
+            try:
+                prompt = self._prepare_prompt(user_input, conversation_id)
+                
+                with tracer.span("engine.stream"), self._scope(conversation_id):
+                    for chunk in self.engine.generate_stream(prompt):
+                        if not buffer.chunks:
+                            tracer.first_token()
+                        buffer.append(chunk)
+                        yield chunk
+                
+                self._store_reply(buffer.text(), conversation_id)
+                
+            except Exception as e:
+                error_message = self._handle_error(e, conversation_id, turn)
+                buffer.append(error_message)
+                yield error_message
+    
+    def _scope(self, conversation_id: Optional[str]):
+        """Tag engine calls with the conversation and role for scheduling and model routing"""
+        return conversation_scope(conversation_id or self.memory.current_conversation_id,
+                                  self.prompt_controller.role)
+    
+    def prepare(self, partial_input: str, conversation_id: Optional[str] = None) -> None:
+        """
+        Start building the next prompt from a partial input, e.g. the
+        transcript of a user who is still speaking: pack the conversation's
+        context and run recall on the partial text. The next turn reuses both
+        if no message was added in between and its input extends
+        ``partial_input``, and only adds its own message to the context.
+        """
+        conv_id = conversation_id or self.memory.current_conversation_id
+        with tracer.span("prompt.prepare"):
+            count = self.memory.get_message_count(conv_id)
+            packed = self.context_builder.pack(conv_id, self._context_window)
+            retrieved = self._recall(partial_input, conv_id)
+        self._prepared = (conv_id, partial_input, count, packed, retrieved)
+    
+    def _recall(self, user_input: str, conversation_id: Optional[str]) -> Optional[List[str]]:
+        if self.retriever is None:
+            return None
+        with tracer.span("retrieval.search"):
+            hits = self.retriever.search(user_input, self.retrieval_k, conversation_id,
+                                         exclude_recent=self._context_window)
+        return [format_message(hit) for hit in hits]
+    
+    def _take_prepared(self, user_input: str, conversation_id: Optional[str]):
+        prepared, self._prepared = self._prepared, None
+        if prepared is None:
+            return None
+        conv_id, partial_input, count, _, _ = prepared
+        if (conv_id != conversation_id or not user_input.startswith(partial_input)
+                or self.memory.get_message_count(conv_id) != count):
+            return None
+        tracer.incr("prompt.prepared_hits")
+        return prepared
+    
+    def _prepare_prompt(self, user_input: str, conversation_id: Optional[str]) -> str:
+        conv_id = conversation_id or self.memory.current_conversation_id
+        prepared = self._take_prepared(user_input, conv_id)
+        self.memory.add("user", user_input, conversation_id)
 
-            response = self.engine.generate(prompt)
+        with tracer.span("context.build"):
+            if prepared is not None:
+                packed = self.context_builder.extend(prepared[3], {'role': 'user', 'message': user_input},
+                                                     self._context_window)
+                context = self.context_builder.render(packed)
+            else:
+                context = self.context_builder.build(conversation_id, self._context_window)
+            summary = self.memory.get_summary(conversation_id)
 
-            self.memory.add("assistant", response, conversation_id)
-            
-            return response
-            
-        except Exception as e:
-            error_message = f"I apologize, but I encountered an error: {str(e)}"
-            self.memory.add("assistant", error_message, conversation_id)
-            return error_message
-    
-    def respond_stream(self, user_input: str, conversation_id: Optional[str] = None) -> Generator[str, None, None]:
-        try:
-            self.memory.add("user", user_input, conversation_id)
+        retrieved = prepared[4] if prepared is not None else self._recall(user_input, conv_id)
 
-            context = self.memory.get_formatted_history(
-                conversation_id=conversation_id,
-                limit=self._context_window
+        with tracer.span("prompt.build"):
+            return self.prompt_controller.build_prompt(
+                user_input, context, summary=summary['text'] if summary else None, retrieved=retrieved
             )
-            
-            prompt = self.prompt_controller.build_prompt(user_input, context)
-            
-            full_response = []
-            for chunk in self.engine.generate_stream(prompt):
-                full_response.append(chunk)
-                yield chunk
-            
-            complete_response = "".join(full_response)
-            self.memory.add("assistant", complete_response, conversation_id)
-            
-        except Exception as e:
-            error_message = f"I apologize, but I encountered an error: {str(e)}"
-            self.memory.add("assistant", error_message, conversation_id)
-            yield error_message
+    
+    def _store_reply(self, response: str, conversation_id: Optional[str]) -> None:
+        self.last_error = None
+        self.memory.add("assistant", response, conversation_id)
+        if self.summarizer is not None:
+            self.summarizer.schedule(conversation_id, keep_recent=self._context_window,
+                                     context_builder=self.context_builder)
+    
+    def _handle_error(self, error: Exception, conversation_id: Optional[str], turn) -> str:
+        """
+        Record a failed turn. The apology is stored flagged as an error so it
+        is shown to the user but never fed back to the model as context.
+        """
+        self.last_error = error
+        turn.set('error', type(error).__name__)
+        if not isinstance(error, EngineError):
+            print(f"Unexpected error while responding: {error!r}")
+        error_message = f"I apologize, but I encountered an error: {str(error) or type(error).__name__}"
+        self.memory.add("assistant", error_message, conversation_id, error=True)
+        return error_message
+    
+    async def arespond(self, user_input: str, conversation_id: Optional[str] = None,
+                       timeout: Optional[float] = None) -> str:
+        with tracer.turn(conversation_id, "arespond") as turn:
+            try:
+                # Context building, recall and the history write are blocking
+                # work; keep them off the event loop
+                prompt = await asyncio.to_thread(self._prepare_prompt, user_input, conversation_id)
+
+                with tracer.span("engine.generate"), self._scope(conversation_id):
+                    if self.async_engine is not None:
+                        response = await self.async_engine.generate(prompt, timeout=timeout)
+                    else:
+                        response = await asyncio.wait_for(
+                            asyncio.to_thread(self.engine.generate, prompt), timeout
+                        )
+                tracer.first_token()
+
+                await asyncio.to_thread(self._store_reply, response, conversation_id)
+                return response
+                
+            except Exception as e:
+                return await asyncio.to_thread(self._handle_error, e, conversation_id, turn)
+    
+    async def arespond_stream(self, user_input: str, conversation_id: Optional[str] = None,
+                              timeout: Optional[float] = None) -> AsyncGenerator[str, None]:
+        with tracer.turn(conversation_id, "arespond_stream") as turn:
+            try:
+                prompt = await asyncio.to_thread(self._prepare_prompt, user_input, conversation_id)
+
+                full_response = []
+                with tracer.span("engine.stream"), self._scope(conversation_id):
+                    if self.async_engine is not None:
+                        async for chunk in self.async_engine.generate_stream(prompt, timeout=timeout):
+                            if not full_response:
+                                tracer.first_token()
+                            full_response.append(chunk)
+                            yield chunk
+                    else:
+                        # Without an async engine the whole reply is produced off-loop
+                        response = await asyncio.wait_for(
+                            asyncio.to_thread(self.engine.generate, prompt), timeout
+                        )
+                        tracer.first_token()
+                        full_response.append(response)
+                        yield response
+
+                await asyncio.to_thread(self._store_reply, "".join(full_response), conversation_id)
+                
+            except Exception as e:
+                yield await asyncio.to_thread(self._handle_error, e, conversation_id, turn)
     
     def set_role(self, role: str) -> bool:
         return self.prompt_controller.set_role(role)
@@ -81,4 +225,11 @@ class Assistant:
         return self.memory.get_message_count(conversation_id)
     
     def set_context_window(self, size: int) -> None:
-        self._context_window = max(1, min(size, 50))  # Limit between 1 and 50
\ No newline at end of file
+        self._context_window = max(1, min(size, 50))  # Limit between 1 and 50
+        self._prepared = None
+    
+    def set_context_budget(self, max_tokens: int, max_message_tokens: Optional[int] = None) -> None:
+        self.context_builder.max_tokens = max(1, max_tokens)
+        if max_message_tokens is not None:
+            self.context_builder.max_message_tokens = max(1, max_message_tokens)
+        self._prepared = None
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from .errors import EngineTimeoutError, to_engine_error
+from .gemini_engine import load_genai
+
+
+class AsyncGeminiEngine:
+    """
+    Asyncio counterpart of GeminiEngine.
+
+    A single GenerativeModel (and therefore a single underlying client and
+    connection pool) is reused for every request. A semaphore caps the number
+    of requests in flight and every request carries its own deadline, so one
+    worker can multiplex many conversations without unbounded fan-out.
+    """
+
+    def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash",
+                 max_concurrency: int = 8, timeout: float = 60.0):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._model = None
+
+    @property
+    def model(self):
+        # Created on first request; the event loop is single-threaded, so no lock
+        if self._model is None:
+            genai = load_genai()
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        return asyncio.get_running_loop().time() + (timeout if timeout is not None else self.timeout)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return remaining
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        deadline = self._deadline(timeout)
+        try:
+            async with self._semaphore:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt), self._remaining(deadline)
+                )
+                return response.text
+        except asyncio.TimeoutError as e:
+            raise EngineTimeoutError("Gemini API Error: request timed out") from e
+        except Exception as e:
+            raise to_engine_error(e) from e
+
+    async def generate_stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        deadline = self._deadline(timeout)
+        try:
+            async with self._semaphore:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt, stream=True), self._remaining(deadline)
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self._remaining(deadline))
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        yield chunk.text
+        except asyncio.TimeoutError as e:
+            raise EngineTimeoutError("Gemini API Error: request timed out") from e
+        except Exception as e:
+            raise to_engine_error(e) from e
+
+    async def is_api_available(self) -> bool:
+        try:
+            await self.generate("This is working.", timeout=10.0)
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,330 @@
+"""
+Batch runner: answer every prompt of a JSONL file through Assistant.
+
+Each input line is a JSON object with a ``prompt`` and optionally an
+``id`` (defaults to the line number), a ``role`` (PromptController mode)
+and a ``conversation_id``. Lines sharing a conversation id are answered in
+order with their earlier turns as context; other lines are independent.
+One JSON result per line is appended to the output file as soon as it is
+ready, which doubles as the checkpoint: rerunning the same command skips
+the ids already answered and retries those that failed (the output then
+holds several lines for such an id; the last one counts). A failed turn is
+taken back out of its conversation, so the retry does not see its prompt twice.
+
+    python -m aurion.batch prompts.jsonl results.jsonl --workers 8 --role tutor
+    python -m aurion.batch prompts.jsonl results.jsonl --engine fake --fake-latency 0.2
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .assistant import Assistant
+from .memory import Memory
+from .prompt_controller import PromptController
+from .storage import NullStorage, create_storage
+
+HISTOGRAM_BOUNDS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def read_items(path: str) -> Iterator[Dict[str, Any]]:
+    """Input items in file order, with ``id`` filled in from the line number"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping line {line_number}: {e}")
+                continue
+            if not isinstance(item, dict) or not isinstance(item.get('prompt'), str):
+                print(f"Skipping line {line_number}: expected an object with a \"prompt\"")
+                continue
+            item.setdefault('id', line_number)
+            yield item
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Successful results already written to ``path`` by id; failed ones are
+    left out so they are retried. A partial last line left by an interrupted
+    run is cut off so new results start on a clean line.
+    """
+    done: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return done
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            if result.get('error'):
+                done.pop(str(result['id']), None)
+            else:
+                done[str(result['id'])] = result
+            valid_bytes += len(line)
+    if valid_bytes < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+def latency_histogram(latencies: List[float], bounds_ms=HISTOGRAM_BOUNDS_MS) -> Dict[str, int]:
+    counts = {f"<={bound}ms": 0 for bound in bounds_ms}
+    counts[f">{bounds_ms[-1]}ms"] = 0
+    for latency in latencies:
+        ms = latency * 1000
+        for bound in bounds_ms:
+            if ms <= bound:
+                counts[f"<={bound}ms"] += 1
+                break
+        else:
+            counts[f">{bounds_ms[-1]}ms"] += 1
+    return counts
+
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct)))] * 1000
+
+
+class BatchRunner:
+    """
+    Runs input items through a pool of Assistants that share one Memory.
+
+    Args:
+        assistant_factory: Builds one Assistant per worker (each has its own
+            PromptController, so workers can use different roles)
+        memory: The Memory the assistants use; stand-alone conversations are
+            deleted from it once answered so it does not grow with the batch
+        workers: Number of worker threads
+        queue_size: Items buffered per worker before reading the input blocks
+        fsync_every: Results between fsyncs of the output file (0 = never)
+        progress_every: Results between progress lines (0 = quiet)
+    """
+
+    def __init__(self, assistant_factory: Callable[[], Assistant], memory: Memory, workers: int = 4,
+                 queue_size: int = 16, fsync_every: int = 100, progress_every: int = 1000):
+        self.assistant_factory = assistant_factory
+        self.memory = memory
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.fsync_every = fsync_every
+        self.progress_every = progress_every
+        self._lock = threading.Lock()
+
+    def _shard(self, item: Dict[str, Any], index: int) -> int:
+        # Turns of one conversation always go to the same worker, in order
+        if item.get('conversation_id') is None:
+            return index % self.workers
+        return zlib.crc32(str(item['conversation_id']).encode('utf-8')) % self.workers
+
+    def run(self, input_path: str, output_path: str, default_role: str = "general") -> Dict[str, Any]:
+        """Answer every item not already in ``output_path``; returns the run's statistics"""
+        done = load_checkpoint(output_path)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._written = 0
+        self._started = time.perf_counter()
+
+        assistants = [self.assistant_factory() for _ in queues]
+
+        with open(output_path, "a", encoding="utf-8") as output:
+            threads = [threading.Thread(target=self._work, args=(assistant, q, output, default_role),
+                                        name=f"aurion-batch-{i}", daemon=True)
+                       for i, (assistant, q) in enumerate(zip(assistants, queues))]
+            for thread in threads:
+                thread.start()
+            skipped = 0
+            stored: Dict[str, bool] = {}  # Conversation id -> already had messages before this run
+            try:
+                for index, item in enumerate(read_items(input_path)):
+                    conv_id = item.get('conversation_id')
+                    if conv_id is not None and str(conv_id) not in stored:
+                        # None of its items is queued yet, so this counts only earlier runs
+                        stored[str(conv_id)] = self.memory.get_message_count(str(conv_id)) > 0
+                    previous = done.get(str(item['id']))
+                    if previous is not None:
+                        skipped += 1
+                        if conv_id is None or stored[str(conv_id)]:
+                            continue
+                        # Restore the answered turn so later turns keep their context
+                        item = dict(item, _replay=previous)
+                    queues[self._shard(item, index)].put(item)
+            finally:
+                for q in queues:
+                    q.put(None)
+                for thread in threads:
+                    thread.join()
+                output.flush()
+                os.fsync(output.fileno())
+
+        return self._stats(skipped)
+
+    def _work(self, assistant: Assistant, items: queue.Queue, output, default_role: str) -> None:
+        while True:
+            item = items.get()
+            if item is None:
+                return
+            try:
+                result = self._answer(assistant, item, default_role)
+            except Exception as e:
+                print(f"Error answering item {item['id']}: {e!r}")
+                result = {'id': item['id'], 'response': None, 'error': type(e).__name__}
+            if result is not None:
+                self._write(output, result)
+
+    def _answer(self, assistant: Assistant, item: Dict[str, Any], default_role: str) -> Optional[Dict[str, Any]]:
+        conversation_id = item.get('conversation_id')
+        standalone = conversation_id is None
+        conv_id = f"batch-{item['id']}" if standalone else str(conversation_id)
+
+        previous = item.get('_replay')
+        if previous is not None:
+            self.memory.add("user", item['prompt'], conv_id)
+            self.memory.add("assistant", previous.get('response') or "", conv_id)
+            return None
+
+        role = item.get('role') or default_role
+        if not assistant.set_role(role):
+            return {'id': item['id'], 'response': None, 'error': f"Unknown role {role!r}"}
+
+        # Each conversation is answered by one worker, so nothing else adds to it meanwhile
+        before = 0 if standalone else self.memory.get_message_count(conv_id)
+        start = time.perf_counter()
+        response = assistant.respond(item['prompt'], conv_id)
+        latency = time.perf_counter() - start
+        error = assistant.last_error
+        if standalone:
+            self.memory.delete_conversation(conv_id)
+        elif error:
+            # Drop the prompt and the apology; the retry adds the prompt again
+            self.memory.truncate(conv_id, before)
+
+        result = {'id': item['id'], 'role': role, 'response': None if error else response,
+                  'error': type(error).__name__ if error else None, 'latency_ms': round(latency * 1000, 3)}
+        if not standalone:
+            result['conversation_id'] = conversation_id
+        with self._lock:
+            self._latencies.append(latency)
+            if error:
+                self._errors += 1
+        return result
+
+    def _write(self, output, result: Dict[str, Any]) -> None:
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self._lock:
+            output.write(line)
+            output.flush()
+            self._written += 1
+            if self.fsync_every and self._written % self.fsync_every == 0:
+                os.fsync(output.fileno())
+            if self.progress_every and self._written % self.progress_every == 0:
+                elapsed = time.perf_counter() - self._started
+                print(f"{self._written} answered, {self._written / elapsed:.1f}/s", file=sys.stderr)
+
+    def _stats(self, skipped: int) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        ordered = sorted(self._latencies)
+        return {
+            'answered': len(ordered),
+            'errors': self._errors,
+            'skipped': skipped,
+            'workers': self.workers,
+            'elapsed_s': elapsed,
+            'throughput_per_s': len(ordered) / elapsed if elapsed else 0.0,
+            'latency_p50_ms': _percentile(ordered, 0.50),
+            'latency_p90_ms': _percentile(ordered, 0.90),
+            'latency_p99_ms': _percentile(ordered, 0.99),
+            'latency_max_ms': ordered[-1] * 1000 if ordered else None,
+            'histogram': latency_histogram(ordered)
+        }
+
+
+def build_engine(args: argparse.Namespace):
+    if args.engine == "fake":
+        from .testing import FakeGeminiEngine
+        return FakeGeminiEngine(latency=args.fake_latency)
+
+    from config.settings import Settings
+    from .gemini_engine import GeminiEngine
+    from .resilience import ResilientEngine
+    from .scheduler import RateLimiter, SchedulingEngine
+
+    settings = Settings()
+    rps, tpm = settings.get_rate_limits()
+    return SchedulingEngine(ResilientEngine(GeminiEngine(settings.load_api_key(), args.model, request_timeout=60.0)),
+                            RateLimiter(rps, tpm))
+
+
+def build_memory(args: argparse.Namespace) -> Memory:
+    if args.memory is None:
+        # Answers live in the output file; nothing is persisted per message
+        return Memory(storage=NullStorage())
+    return Memory(args.memory, storage=create_storage("journal", args.memory), background_writes=True)
+
+
+def print_stats(stats: Dict[str, Any]) -> None:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:.0f} ms" if value is not None else "–"
+
+    print(f"answered {stats['answered']} ({stats['errors']} errors, {stats['skipped']} already done) "
+          f"in {stats['elapsed_s']:.1f} s with {stats['workers']} workers: "
+          f"{stats['throughput_per_s']:.1f} prompts/s")
+    print(f"latency p50 {ms(stats['latency_p50_ms'])}, p90 {ms(stats['latency_p90_ms'])}, "
+          f"p99 {ms(stats['latency_p99_ms'])}, max {ms(stats['latency_max_ms'])}")
+    peak = max(stats['histogram'].values()) or 1
+    for bucket, count in stats['histogram'].items():
+        print(f"  {bucket:>10} {count:>8} {'#' * round(40 * count / peak)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Answer the prompts of a JSONL file with Aurion")
+    parser.add_argument("input", help="JSONL file of {\"prompt\", \"id\"?, \"role\"?, \"conversation_id\"?}")
+    parser.add_argument("output", help="JSONL results file; also the checkpoint for resuming")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--role", default="general", choices=sorted(PromptController.get_available_roles()))
+    parser.add_argument("--context-window", type=int, default=10)
+    parser.add_argument("--engine", choices=("gemini", "fake"), default="gemini")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Seconds per reply for --engine fake")
+    parser.add_argument("--memory", help="Also keep the conversations in this journal-backed memory file")
+    parser.add_argument("--fsync-every", type=int, default=100)
+    parser.add_argument("--report", help="Write the run statistics as JSON to this path")
+    args = parser.parse_args(argv)
+
+    engine = build_engine(args)
+    memory = build_memory(args)
+
+    def make_assistant() -> Assistant:
+        assistant = Assistant(engine, PromptController(args.role), memory)
+        assistant.set_context_window(args.context_window)
+        return assistant
+
+    runner = BatchRunner(make_assistant, memory, workers=args.workers, fsync_every=args.fsync_every)
+    try:
+        stats = runner.run(args.input, args.output, default_role=args.role)
+    finally:
+        memory.close()
+
+    print_stats(stats)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
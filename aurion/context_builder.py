@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional, Tuple
+from .memory import Memory, format_message
+from .tokens import truncate_to_tokens
+
+
+class ContextBuilder:
+    """
+    Builds the conversation context for a prompt under a token budget.
+
+    Walks the history from the newest message backwards and packs messages
+    until the budget is spent; single messages larger than
+    ``max_message_tokens`` are truncated instead of crowding everything else out.
+    Token counts come from Memory, which caches them next to each message.
+    """
+
+    def __init__(self, memory: Memory, max_tokens: int = 2000, max_message_tokens: int = 600):
+        self.memory = memory
+        self.max_tokens = max_tokens
+        self.max_message_tokens = max_message_tokens
+
+    def build(self, conversation_id: Optional[str] = None, max_messages: Optional[int] = None) -> str:
+        return self.render(self.pack(conversation_id, max_messages))
+
+    def pack(self, conversation_id: Optional[str] = None,
+             max_messages: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        """
+        The messages ``build`` would include, newest first, as (position from
+        the end of the history, line, token cost); ``render`` turns them into
+        the context text and ``extend`` adds a newer message without walking
+        the history again.
+        """
+        # Messages come paired with their pre-rendered lines from Memory's
+        # cache; only oversized messages are rendered again
+        entries = self.memory.get_formatted_lines(conversation_id, max_messages)
+        packed = []
+        used = 0
+
+        for age, (msg, line) in enumerate(reversed(entries)):
+            if msg.get('error'):
+                # Failure notices are for the user, not for the model
+                continue
+            line, cost = self._cost(msg, line)
+            if used + cost > self.max_tokens:
+                break
+
+            packed.append((age, line, cost))
+            used += cost
+
+        return packed
+
+    def extend(self, packed: List[Tuple[int, str, int]], msg: Dict,
+               max_messages: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        """
+        What ``pack`` returns once ``msg`` has been added after the messages
+        ``packed`` was built from, provided the budget did not change since
+        """
+        line, cost = self._cost(msg, format_message(msg))
+        if cost > self.max_tokens:
+            return []
+        result = [(0, line, cost)]
+        used = cost
+        for age, line, cost in packed:
+            if (max_messages and age + 1 >= max_messages) or used + cost > self.max_tokens:
+                break
+            result.append((age + 1, line, cost))
+            used += cost
+        return result
+
+    def covered(self, conversation_id: Optional[str] = None, max_messages: Optional[int] = None) -> int:
+        """How many of the latest messages the context reaches back over; older ones are left out"""
+        packed = self.pack(conversation_id, max_messages)
+        return packed[-1][0] + 1 if packed else 0
+
+    @staticmethod
+    def render(packed: List[Tuple[int, str, int]]) -> str:
+        return "\n".join(line for _, line, _ in reversed(packed))
+
+    def _cost(self, msg: Dict, line: str) -> Tuple[str, int]:
+        tokens = self.memory.get_message_tokens(msg)
+        if tokens > self.max_message_tokens:
+            role = "User" if msg['role'] == 'user' else "Assistant"
+            line = f"{role}: {truncate_to_tokens(msg['message'], self.max_message_tokens)}"
+            tokens = self.max_message_tokens
+        return line, tokens + 2  # role label and newline
@@ -0,0 +1,38 @@
+class EngineError(Exception):
+    """
+    Raised by model engines when a request fails, so callers can tell a
+    failure apart from model output
+    """
+    retryable = False
+
+
+class RetryableEngineError(EngineError):
+    """Transient failure (rate limit, overload, network); the request may be retried"""
+    retryable = True
+
+
+class EngineTimeoutError(RetryableEngineError):
+    """The request did not finish before its deadline"""
+
+
+class CircuitOpenError(EngineError):
+    """The circuit breaker is open and the request was rejected without being sent"""
+
+
+# google.api_core exception names that indicate a transient failure
+_RETRYABLE_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "RetryError"
+}
+
+
+def to_engine_error(error: Exception, prefix: str = "Gemini API Error") -> EngineError:
+    """Wrap a backend exception in the matching EngineError subclass"""
+    if isinstance(error, EngineError):
+        return error
+    message = f"{prefix}: {str(error) or type(error).__name__}"
+    if isinstance(error, TimeoutError) or type(error).__name__ == "DeadlineExceeded":
+        return EngineTimeoutError(message)
+    if isinstance(error, ConnectionError) or type(error).__name__ in _RETRYABLE_NAMES:
+        return RetryableEngineError(message)
+    return EngineError(message)
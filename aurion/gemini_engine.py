@@ -1,37 +1,69 @@
-import google.generativeai as genai
+import importlib
+import threading
+from typing import Optional
+from .errors import to_engine_error
+
+genai = None  # google.generativeai, imported on first use since it is slow to import
+
+
+def load_genai():
+    """The Gemini SDK module, imported on first call"""
+    global genai
+    if genai is None:
+        genai = importlib.import_module("google.generativeai")
+    return genai
+
 
 class GeminiEngine:
     """
     Manages communication with Gemini API
+
+    The SDK is imported and configured, and the model created, on the first
+    request rather than in the constructor, to keep app start-up fast.
+    ``request_timeout`` (seconds) is passed to the SDK so a hung call fails
+    instead of blocking its thread indefinitely.
     """
-    def __init__(self, api_key: str, model_name: str="gemini-2.5-flash"):
+    def __init__(self, api_key: str, model_name: str="gemini-2.5-flash", request_timeout: Optional[float]=None):
         self.api_key = api_key
         self.model_name = model_name
-        self._configure_api()
-        self.model = genai.GenerativeModel(model_name)
+        self.request_timeout = request_timeout
+        self._model = None
+        self._model_lock = threading.Lock()
 
     def _configure_api(self):
-        genai.configure(api_key = self.api_key)
+        load_genai().configure(api_key = self.api_key)
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._configure_api()
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _request_options(self) -> dict:
+        return {'timeout': self.request_timeout} if self.request_timeout is not None else {}
 
     def generate(self, prompt: str, stream: bool=False) -> str:
         try:
             if stream:
-                response = self.model.generate_content(prompt, stream = True)
+                response = self.model.generate_content(prompt, stream = True, request_options = self._request_options())
                 return response.text
             else:
-                response = self.model.generate_content(prompt)
+                response = self.model.generate_content(prompt, request_options = self._request_options())
                 return response.text
         except Exception as e:
-            raise Exception(f"Gemini API Error: {str(e)}")
+            raise to_engine_error(e) from e
     
     def generate_stream(self, prompt: str):
         try:
-            response = self.model.generate_content(prompt, stream = True)
+            response = self.model.generate_content(prompt, stream = True, request_options = self._request_options())
             for chunk in response:
                 if chunk.text:
                     yield chunk.text
         except Exception as e:
-            yield f"Error: {str(e)}"
+            raise to_engine_error(e) from e
 
     def is_api_available(self) -> bool:
         try:
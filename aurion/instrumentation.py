@@ -0,0 +1,265 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class _NoopSpan:
+    """Returned by a disabled tracer; entering and leaving it costs nothing"""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current_turn: "contextvars.ContextVar[Optional[Turn]]" = contextvars.ContextVar("aurion_turn", default=None)
+
+
+class Span:
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._finish_span(self.name, duration, self.attrs)
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+
+class Turn:
+    """
+    Groups the spans of one Assistant turn and records time-to-first-token
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, tracer: "Tracer", conversation_id: Optional[str], kind: str):
+        self.tracer = tracer
+        self.turn_id = next(self._ids)
+        self.conversation_id = conversation_id
+        self.kind = kind
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.ttft: Optional[float] = None
+        self.error: Optional[str] = None
+        self.start = 0.0
+        self._token = None
+
+    def __enter__(self) -> "Turn":
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self._token = _current_turn.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        total = time.perf_counter() - self.start
+        try:
+            _current_turn.reset(self._token)
+        except ValueError:
+            # Closed from another context (e.g. an abandoned stream)
+            pass
+        if exc_type is not None and self.error is None:
+            self.error = exc_type.__name__
+        self.tracer._finish_turn(self, total)
+
+    def first_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.start
+
+    def set(self, key: str, value: Any) -> None:
+        if key == 'error':
+            self.error = value
+
+
+class Tracer:
+    """
+    Lightweight spans, counters and per-turn breakdowns.
+
+    Disabled by default: ``span()`` then returns a shared no-op object, so
+    instrumented code pays one attribute check. Finished spans and turns are
+    fanned out to sinks (see RingBufferSink, JSONLSink, PrometheusSink).
+    """
+
+    def __init__(self, enabled: bool = False, sinks: Optional[List] = None):
+        self.enabled = enabled
+        self.sinks = list(sinks or [])
+        self.counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink) -> None:
+        self.sinks.append(sink)
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, attrs)
+
+    def turn(self, conversation_id: Optional[str] = None, kind: str = "respond"):
+        if not self.enabled:
+            return _NOOP
+        return Turn(self, conversation_id, kind)
+
+    def first_token(self) -> None:
+        if self.enabled:
+            turn = _current_turn.get()
+            if turn is not None:
+                turn.first_token()
+
+    def incr(self, name: str, value: float = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                print(f"Error in trace sink {type(sink).__name__}: {e}")
+
+    def _finish_span(self, name: str, duration: float, attrs: Dict[str, Any]) -> None:
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.stages[name] += duration
+        self._emit({
+            'type': 'span',
+            'name': name,
+            'duration_ms': duration * 1000,
+            'turn_id': turn.turn_id if turn is not None else None,
+            'attrs': attrs
+        })
+
+    def _finish_turn(self, turn: Turn, total: float) -> None:
+        self._emit({
+            'type': 'turn',
+            'turn_id': turn.turn_id,
+            'conversation_id': turn.conversation_id,
+            'kind': turn.kind,
+            'started_at': turn.started_at,
+            'total_ms': total * 1000,
+            'ttft_ms': turn.ttft * 1000 if turn.ttft is not None else None,
+            'stages_ms': {name: value * 1000 for name, value in turn.stages.items()},
+            'error': turn.error
+        })
+
+
+class RingBufferSink:
+    """Keeps the most recent turns and spans in memory (for the debug panel)"""
+
+    def __init__(self, capacity: int = 200):
+        self.turns: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=capacity * 10)
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        (self.turns if event['type'] == 'turn' else self.spans).append(event)
+
+    def recent_turns(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return list(self.turns)[-limit:]
+
+    def ttft_percentiles(self) -> Dict[str, Optional[float]]:
+        values = sorted(turn['ttft_ms'] for turn in self.turns if turn['ttft_ms'] is not None)
+        if not values:
+            return {'p50_ms': None, 'p95_ms': None}
+
+        def pick(pct: float) -> float:
+            return values[min(len(values) - 1, int(round((len(values) - 1) * pct)))]
+
+        return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95)}
+
+
+class JSONLSink:
+    """Appends every event as one JSON line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PrometheusSink:
+    """
+    Aggregates span durations into histograms and renders them in the
+    Prometheus text exposition format
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, List[float]] = {}
+        self._sums: Dict[str, float] = defaultdict(float)
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    def _observe(self, name: str, seconds: float) -> None:
+        buckets = self._histograms.setdefault(name, [0] * len(self.BUCKETS))
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        self._sums[name] += seconds
+        self._counts[name] += 1
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            if event['type'] == 'span':
+                self._observe(event['name'], event['duration_ms'] / 1000)
+            else:
+                self._observe('turn', event['total_ms'] / 1000)
+                if event['ttft_ms'] is not None:
+                    self._observe('time_to_first_token', event['ttft_ms'] / 1000)
+
+    def render(self) -> str:
+        lines = ["# TYPE aurion_duration_seconds histogram"]
+        with self._lock:
+            for name in sorted(self._histograms):
+                label = name.replace('"', '')
+                for bound, count in zip(self.BUCKETS, self._histograms[name]):
+                    lines.append(f'aurion_duration_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+                lines.append(f'aurion_duration_seconds_bucket{{stage="{label}",le="+Inf"}} {self._counts[name]}')
+                lines.append(f'aurion_duration_seconds_sum{{stage="{label}"}} {self._sums[name]}')
+                lines.append(f'aurion_duration_seconds_count{{stage="{label}"}} {self._counts[name]}')
+
+        if self.tracer is not None:
+            lines.append("# TYPE aurion_events_total counter")
+            for name, value in sorted(self.tracer.counters.items()):
+                lines.append(f'aurion_events_total{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide tracer used by the instrumented modules
+tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return tracer
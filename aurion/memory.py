@@ -1,77 +1,228 @@
-import json
 import os
-from typing import List, Dict, Optional
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, List, Dict, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from .storage import MemoryStorage, JSONFileStorage, BackgroundWriter
+from .archive import ConversationArchive
+from .message import Message
+from .tokens import estimate_tokens
+from .instrumentation import tracer
+
+
+# Role, timestamp, token count and JSON punctuation of one stored message
+MESSAGE_OVERHEAD_BYTES = 100
+
+
+def format_message(msg: Dict) -> str:
+    role = "User" if msg['role'] == 'user' else "Assistant"
+    return f"{role}: {msg['message']}"
+
+
+def message_bytes(msg: Dict) -> int:
+    """Approximate stored size of a message"""
+    return len(msg['message'].encode('utf-8')) + MESSAGE_OVERHEAD_BYTES
 
 
 class Memory:
     """
-    Manages conversation memory using a single JSON file
+    Manages conversation memory on top of a pluggable storage backend
+    (a single JSON file by default).
+
+    Safe to share between threads: structural changes take a global lock and
+    appends take a per-conversation lock. With ``background_writes`` enabled
+    a single writer thread batches and coalesces pending saves.
+
+    Messages are held as compact ``Message`` records that read like the
+    stored dicts; they are converted to plain dicts only when persisted.
+
+    Listeners registered with ``add_listener`` are told about every change;
+    see ``add_listener`` for the callbacks.
+
+    ``archive_idle`` moves idle conversations into a compressed
+    ConversationArchive; they keep their place in ``conversations`` (as
+    ``None``) and are rehydrated on first access, e.g. when
+    ``set_current_conversation`` selects them. ``evict`` does the same for
+    one conversation regardless of idleness, and ``trim`` drops the oldest
+    messages of one; see aurion.retention for policies built on them.
     """
     
-    def __init__(self, memory_file: str = "data/memory.json"):
+    # Latest messages of each conversation paired with their pre-rendered
+    # "Role: message" lines; covers the largest context window Assistant allows
+    FORMATTED_CACHE_SIZE = 50
+    
+    def __init__(self, memory_file: str = "data/memory.json", storage: Optional[MemoryStorage] = None,
+                 background_writes: bool = False, archive: Optional[ConversationArchive] = None):
         self.memory_file = memory_file
+        self.archive = archive
+        self.storage = storage or JSONFileStorage(memory_file)
         self.conversations: Dict[str, List[Dict]] = {}
         self.current_conversation_id: Optional[str] = None
+        self._init_state()
         self._load_memory()
+        self._writer = BackgroundWriter(self.storage, self._snapshot) if background_writes else None
+    
+    def _init_state(self) -> None:
+        """In-process state every backend shares: caches, bookkeeping, locks and listeners"""
+        self.summaries: Dict[str, Dict] = {}
+        self._archived: Dict[str, int] = {}  # Conversation id -> leading messages held in the archive
+        self._bytes: Dict[str, int] = {}  # Conversation id -> approximate size of its messages
+        self._used: Dict[str, float] = {}  # Conversation id -> monotonic time of the last access
+        self._lock = threading.RLock()
+        self._conversation_locks: Dict[str, threading.RLock] = {}
+        self._formatted: Dict[str, deque] = {}
+        self._listeners: List[Any] = []
+        self._writer: Optional[BackgroundWriter] = None
         
     def _load_memory(self) -> None:
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.conversations = data.get('conversations', {})
-                    self.current_conversation_id = data.get('current_conversation_id')
-            except Exception as e:
-                print(f"Error loading memory: {e}")
-                self.conversations = {}
-        else:
-            self.conversations = {}
-            
-    def _save_memory(self) -> None:
         try:
-            os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
-            
-            data = {
-                'conversations': self.conversations,
+            data = self.storage.load()
+            self.conversations = {conv_id: [Message.from_dict(msg) for msg in messages]
+                                  for conv_id, messages in data.get('conversations', {}).items()}
+            self.summaries = data.get('summaries', {})
+            self.current_conversation_id = data.get('current_conversation_id')
+            self._archived = data.get('archived', {})
+            for conv_id in self._archived:
+                tail = self.conversations.get(conv_id)
+                self.conversations[conv_id] = None
+                if tail:
+                    # Messages were added after archiving; load the whole conversation
+                    self._rehydrate(conv_id, tail)
+            self._bytes = {conv_id: sum(message_bytes(msg) for msg in messages)
+                           for conv_id, messages in self.conversations.items() if messages is not None}
+        except Exception as e:
+            print(f"Error loading memory: {e}")
+            self.conversations = {}
+            self.summaries = {}
+            self._archived = {}
+            self._bytes = {}
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the state that can be serialised outside the lock"""
+        with self._lock:
+            conversations = {}
+            for conv_id, messages in self.conversations.items():
+                # Archived leading messages are persisted in the archive only
+                conversations[conv_id] = [msg.to_dict() for msg in messages[self._archived.get(conv_id, 0):]] \
+                    if messages else []
+            return {
+                'conversations': conversations,
                 'current_conversation_id': self.current_conversation_id,
-                'last_updated': datetime.now().isoformat()
+                'summaries': dict(self.summaries),
+                'archived': dict(self._archived)
             }
             
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+    def _save_memory(self) -> None:
+        try:
+            self.storage.save(self._snapshot())
         except Exception as e:
             print(f"Error saving memory: {e}")
     
+    def _record(self, op: str, conversation_id: Optional[str], **fields) -> None:
+        record = {'op': op, 'conversation_id': conversation_id}
+        record.update(fields)
+        with tracer.span("memory.save", op=op):
+            if self._writer is not None:
+                self._writer.submit(record)
+                return
+            try:
+                self.storage.append(record, self._snapshot)
+            except Exception as e:
+                tracer.incr("memory.save_errors")
+                print(f"Error saving memory: {e}")
+    
+    def _conversation_lock(self, conversation_id: str) -> threading.RLock:
+        with self._lock:
+            lock = self._conversation_locks.get(conversation_id)
+            if lock is None:
+                lock = self._conversation_locks[conversation_id] = threading.RLock()
+            return lock
+    
+    def add_listener(self, listener: Any) -> None:
+        """
+        Register an observer. It may define any of ``on_add(conversation_id,
+        message)``, ``on_clear(conversation_id)``, ``on_delete(conversation_id)``
+        ``on_trim(conversation_id, dropped_messages)`` and
+        ``on_truncate(conversation_id, keep)``; they are called
+        after the change, outside the memory locks.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Any) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+    
+    def _notify(self, event: str, *args) -> None:
+        for listener in list(self._listeners):
+            handler = getattr(listener, event, None)
+            if handler is None:
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Error in memory listener {event}: {e}")
+    
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self.storage.close()
+    
     def create_conversation(self, conversation_id: str) -> None:
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-        self.current_conversation_id = conversation_id
-        self._save_memory()
+        with self._lock:
+            if conversation_id not in self.conversations:
+                self.conversations[conversation_id] = []
+            self._used[conversation_id] = time.monotonic()
+            self.current_conversation_id = conversation_id
+            self._record('create', conversation_id)
     
     def set_current_conversation(self, conversation_id: str) -> bool:
-        if conversation_id in self.conversations:
-            self.current_conversation_id = conversation_id
-            self._save_memory()
-            return True
-        return False
+        self._messages(conversation_id)
+        with self._lock:
+            if conversation_id in self.conversations:
+                self.current_conversation_id = conversation_id
+                self._record('current', conversation_id)
+                return True
+            return False
     
-    def add(self, role: str, message: str, conversation_id: Optional[str] = None) -> None:
-        conv_id = conversation_id or self.current_conversation_id
-        
-        if conv_id is None:
-            conv_id = "default"
-            self.create_conversation(conv_id)
-        
-        if conv_id not in self.conversations:
-            self.conversations[conv_id] = []
+    def add(self, role: str, message: str, conversation_id: Optional[str] = None, error: bool = False) -> None:
+        with tracer.span("memory.add"):
+            self._add(role, message, conversation_id, error)
+    
+    def _add(self, role: str, message: str, conversation_id: Optional[str], error: bool) -> None:
+        with self._lock:
+            conv_id = conversation_id or self.current_conversation_id
+            
+            if conv_id is None:
+                conv_id = "default"
+                self.create_conversation(conv_id)
+            
+            if conv_id not in self.conversations:
+                self.conversations[conv_id] = []
         
-        self.conversations[conv_id].append({
-            'role': role,
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        self._save_memory()
+        entry = Message(role, message, tokens=estimate_tokens(message), error=error)
+        size = message_bytes(entry)
+        with self._conversation_lock(conv_id):
+            messages = self._messages(conv_id)
+            if messages is None:
+                # Deleted concurrently; recreate it like an unknown id would be
+                with self._lock:
+                    messages = self.conversations.setdefault(conv_id, [])
+            messages.append(entry)
+            self._bytes[conv_id] = self._bytes.get(conv_id, 0) + size
+            ring = self._formatted.get(conv_id)
+            if ring is not None:
+                ring.append((entry, format_message(entry)))
+            self._record('add', conv_id, message=entry.to_dict())
+        self._notify('on_add', conv_id, entry)
         
     def get_history(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
         conv_id = conversation_id or self.current_conversation_id
@@ -79,47 +230,359 @@ class Memory:
         if conv_id is None or conv_id not in self.conversations:
             return []
         
-        history = self.conversations[conv_id]
+        history = self._messages(conv_id) or []
         
         if limit:
             return history[-limit:]
         return history
     
-    def get_formatted_history(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> str:
-        history = self.get_history(conversation_id, limit)
-        formatted = []
+    @staticmethod
+    def get_message_tokens(msg: Dict) -> int:
+        """Token estimate for a stored message, computed once and cached on it"""
+        tokens = msg.get('tokens')
+        if tokens is None:
+            tokens = msg['tokens'] = estimate_tokens(msg['message'])
+        return tokens
+    
+    def _formatted_ring(self, conv_id: str) -> deque:
+        with self._conversation_lock(conv_id):
+            ring = self._formatted.get(conv_id)
+            if ring is None:
+                recent = (self._messages(conv_id) or [])[-self.FORMATTED_CACHE_SIZE:]
+                ring = deque(((msg, format_message(msg)) for msg in recent), maxlen=self.FORMATTED_CACHE_SIZE)
+                self._formatted[conv_id] = ring
+            return ring
+    
+    def get_formatted_lines(self, conversation_id: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[Tuple[Dict, str]]:
+        """The latest ``limit`` messages, oldest first, each with its "Role: message" line"""
+        conv_id = conversation_id or self.current_conversation_id
         
-        for msg in history:
-            role = "User" if msg['role'] == 'user' else "Assistant"
-            formatted.append(f"{role}: {msg['message']}")
-            
-        return "\n".join(formatted)
+        if conv_id is None or conv_id not in self.conversations:
+            return []
+        
+        if limit and limit <= self.FORMATTED_CACHE_SIZE:
+            ring = self._formatted_ring(conv_id)
+            entries = list(islice(reversed(ring), limit))
+            entries.reverse()
+            return entries
+        
+        return [(msg, format_message(msg)) for msg in self.get_history(conv_id, limit)]
+    
+    def get_formatted_history(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> str:
+        return "\n".join(line for _, line in self.get_formatted_lines(conversation_id, limit))
     
     def clear(self, conversation_id: Optional[str] = None) -> None:
         conv_id = conversation_id or self.current_conversation_id
         
         if conv_id and conv_id in self.conversations:
-            self.conversations[conv_id] = []
-            self._save_memory()
+            with self._conversation_lock(conv_id), self._lock:
+                if conv_id not in self.conversations:
+                    return
+                self.conversations[conv_id] = []
+                self.summaries.pop(conv_id, None)
+                self._formatted.pop(conv_id, None)
+                self._bytes[conv_id] = 0
+                self._drop_archived(conv_id)
+                self._record('clear', conv_id)
+            self._notify('on_clear', conv_id)
     
     def delete_conversation(self, conversation_id: str) -> None:
-        if conversation_id in self.conversations:
+        with self._conversation_lock(conversation_id), self._lock:
+            if conversation_id not in self.conversations:
+                return
             del self.conversations[conversation_id]
+            self.summaries.pop(conversation_id, None)
+            self._formatted.pop(conversation_id, None)
+            self._bytes.pop(conversation_id, None)
+            self._used.pop(conversation_id, None)
+            self._drop_archived(conversation_id)
+            self._conversation_locks.pop(conversation_id, None)
             
             if self.current_conversation_id == conversation_id:
                 self.current_conversation_id = None
                 
-            self._save_memory()
+            self._record('delete', conversation_id)
+        self._notify('on_delete', conversation_id)
+    
+    def get_summary(self, conversation_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Running summary of the oldest messages, as
+        ``{'text': str, 'covered': number of leading messages folded in}``
+        """
+        conv_id = conversation_id or self.current_conversation_id
+        return self.summaries.get(conv_id) if conv_id else None
+    
+    def set_summary(self, conversation_id: str, text: str, covered: int) -> bool:
+        with self._conversation_lock(conversation_id):
+            if conversation_id not in self.conversations or covered > self.get_message_count(conversation_id):
+                # Cleared or deleted while the summary was being produced
+                return False
+            summary = {'text': text, 'covered': covered}
+            self.summaries[conversation_id] = summary
+            self._record('summary', conversation_id, summary=summary)
+            return True
     
     def get_all_conversations(self) -> Dict[str, List[Dict]]:
-        return self.conversations
+        # Rehydrates archived conversations; only meant for exports
+        return {conv_id: self._messages(conv_id) for conv_id in list(self.conversations)}
     
-    def get_conversation_ids(self) -> List[str]:
-        return list(self.conversations.keys())
+    def get_conversation_ids(self, offset: int = 0, limit: Optional[int] = None,
+                             query: Optional[str] = None) -> List[str]:
+        with self._lock:
+            ids = iter(list(self.conversations.keys()))
+        if query:
+            needle = query.lower()
+            ids = (conv_id for conv_id in ids if needle in conv_id.lower())
+        stop = offset + limit if limit is not None else None
+        return list(islice(ids, offset, stop))
+    
+    def get_conversation_count(self, query: Optional[str] = None) -> int:
+        if query:
+            needle = query.lower()
+            with self._lock:
+                return sum(1 for conv_id in self.conversations if needle in conv_id.lower())
+        return len(self.conversations)
+    
+    def get_history_range(self, conversation_id: Optional[str] = None, start: int = 0,
+                          end: Optional[int] = None) -> List[Dict[str, str]]:
+        """Messages ``start`` (inclusive) to ``end`` (exclusive), oldest first"""
+        conv_id = conversation_id or self.current_conversation_id
+        
+        if conv_id is None or conv_id not in self.conversations:
+            return []
+        return (self._messages(conv_id) or [])[max(0, start):end]
     
     def get_message_count(self, conversation_id: Optional[str] = None) -> int:
         conv_id = conversation_id or self.current_conversation_id
         
         if conv_id and conv_id in self.conversations:
-            return len(self.conversations[conv_id])
-        return 0    
\ No newline at end of file
+            messages = self.conversations[conv_id]
+            return len(messages) if messages is not None else self._archived.get(conv_id, 0)
+        return 0
+    
+    def is_archived(self, conversation_id: str) -> bool:
+        """Whether the conversation's messages are only in the archive right now"""
+        return self.conversations.get(conversation_id) is None and conversation_id in self._archived
+    
+    def scan_history(self, conversation_id: str) -> List[Dict]:
+        """
+        All messages of a conversation for bulk indexing; archived
+        conversations are decoded without being kept in memory
+        """
+        messages = self.conversations.get(conversation_id)
+        if messages is None and conversation_id in self._archived:
+            return self._archive_store().get(conversation_id) or []
+        return list(messages or [])
+    
+    def _archive_store(self) -> ConversationArchive:
+        if self.archive is None:
+            self.archive = ConversationArchive(os.path.splitext(self.memory_file)[0] + "_archive.db")
+        return self.archive
+    
+    def _messages(self, conversation_id: Optional[str]) -> Optional[List[Dict]]:
+        """Messages of a conversation, rehydrated from the archive if needed"""
+        if conversation_id is not None:
+            self._used[conversation_id] = time.monotonic()
+        messages = self.conversations.get(conversation_id)
+        if messages is None and conversation_id in self._archived:
+            with self._conversation_lock(conversation_id):
+                messages = self.conversations.get(conversation_id)
+                if messages is None and conversation_id in self.conversations:
+                    messages = self._rehydrate(conversation_id)
+        return messages
+    
+    def _rehydrate(self, conversation_id: str, tail: Optional[List[Dict]] = None) -> List[Dict]:
+        with tracer.span("memory.rehydrate"):
+            try:
+                archived = self._archive_store().get(conversation_id)
+            except Exception as e:
+                print(f"Error reading archived conversation {conversation_id}: {e}")
+                archived = None
+        if archived is None:
+            # Nothing to restore; persist whatever is left as a plain conversation
+            archived = []
+            self._archived.pop(conversation_id, None)
+        messages = [Message.from_dict(msg) for msg in archived] + list(tail or [])
+        self.conversations[conversation_id] = messages
+        self._bytes[conversation_id] = sum(message_bytes(msg) for msg in messages)
+        return messages
+    
+    def _drop_archived(self, conversation_id: str) -> None:
+        if self._archived.pop(conversation_id, None) is not None:
+            try:
+                self._archive_store().delete(conversation_id)
+            except Exception as e:
+                print(f"Error removing archived conversation {conversation_id}: {e}")
+    
+    @staticmethod
+    def _last_activity(messages: List[Dict]) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(messages[-1]['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _archive_conversation(self, conv_id: str, idle_before: Optional[datetime] = None) -> Optional[Tuple[int, int]]:
+        """
+        Move one resident conversation (never the current one) to the archive,
+        if its last message is older than ``idle_before`` when given. Returns
+        its size as JSON and archived (0, 0 if already archived), or None if
+        it was not moved.
+        """
+        with self._conversation_lock(conv_id):
+            messages = self.conversations.get(conv_id)
+            if not messages or conv_id == self.current_conversation_id:
+                return None
+            if idle_before is not None:
+                last = self._last_activity(messages)
+                if last is None or last > idle_before:
+                    return None
+            
+            sizes = (0, 0)
+            changed = self._archived.get(conv_id) != len(messages)
+            if changed:
+                # Rehydrated conversations that got no new messages are already archived
+                with tracer.span("memory.archive"):
+                    sizes = self._archive_store().put(conv_id, messages)
+            
+            with self._lock:
+                if conv_id not in self.conversations:
+                    return None
+                self.conversations[conv_id] = None
+                self._archived[conv_id] = len(messages)
+                self._formatted.pop(conv_id, None)
+                if changed:
+                    self._record('archive', conv_id, count=len(messages))
+            return sizes
+    
+    def archive_idle(self, idle_seconds: float, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Move conversations whose last message is older than ``idle_seconds``
+        (except the current one) to the archive and release their messages
+        from memory. Returns how many were archived and their size as JSON
+        versus archived.
+        """
+        idle_before = (now or datetime.now()) - timedelta(seconds=idle_seconds)
+        result = {'archived': 0, 'raw_bytes': 0, 'archived_bytes': 0}
+        with self._lock:
+            candidates = [conv_id for conv_id, messages in self.conversations.items()
+                          if messages and conv_id != self.current_conversation_id]
+        
+        for conv_id in candidates:
+            sizes = self._archive_conversation(conv_id, idle_before)
+            if sizes is None:
+                continue
+            result['raw_bytes'] += sizes[0]
+            result['archived_bytes'] += sizes[1]
+            result['archived'] += 1
+        return result
+    
+    def evict(self, conversation_id: str) -> bool:
+        """Release a conversation's messages to the archive; it is rehydrated on next use"""
+        return self._archive_conversation(conversation_id) is not None
+    
+    def trim(self, conversation_id: str, keep: int) -> int:
+        """
+        Permanently drop the oldest messages of a conversation so at most
+        ``keep`` remain; returns how many were dropped. The summary keeps
+        covering what it already folded in.
+        """
+        with self._conversation_lock(conversation_id):
+            used = self._used.get(conversation_id)
+            messages = self._messages(conversation_id)
+            # Trimming is housekeeping, not use: keep the conversation's recency
+            if used is not None:
+                self._used[conversation_id] = used
+            dropped = len(messages) - max(0, keep) if messages else 0
+            if dropped <= 0:
+                return 0
+            removed, survivors = messages[:dropped], messages[dropped:]
+            with self._lock:
+                if conversation_id not in self.conversations:
+                    return 0
+                self.conversations[conversation_id] = survivors
+                self._bytes[conversation_id] = sum(message_bytes(msg) for msg in survivors)
+                self._formatted.pop(conversation_id, None)
+                self._drop_archived(conversation_id)
+                summary = self.summaries.get(conversation_id)
+                if summary is not None:
+                    summary = self.summaries[conversation_id] = {
+                        'text': summary['text'], 'covered': max(0, summary['covered'] - dropped)}
+                self._record('trim', conversation_id, messages=[msg.to_dict() for msg in survivors],
+                             summary=summary)
+        self._notify('on_trim', conversation_id, removed)
+        return dropped
+    
+    def truncate(self, conversation_id: str, keep: int) -> int:
+        """
+        Drop the newest messages of a conversation so the first ``keep``
+        remain, e.g. to take back a failed turn; returns how many were dropped
+        """
+        with self._conversation_lock(conversation_id):
+            messages = self._messages(conversation_id)
+            keep = max(0, keep)
+            dropped = len(messages) - keep if messages else 0
+            if dropped <= 0:
+                return 0
+            survivors = messages[:keep]
+            with self._lock:
+                if conversation_id not in self.conversations:
+                    return 0
+                self.conversations[conversation_id] = survivors
+                self._bytes[conversation_id] = sum(message_bytes(msg) for msg in survivors)
+                self._formatted.pop(conversation_id, None)
+                self._drop_archived(conversation_id)
+                summary = self.summaries.get(conversation_id)
+                if summary is not None and summary['covered'] > keep:
+                    summary = self.summaries[conversation_id] = {'text': summary['text'], 'covered': keep}
+                # Replays like a trim: the survivors replace the conversation
+                self._record('trim', conversation_id, messages=[msg.to_dict() for msg in survivors],
+                             summary=summary)
+        self._notify('on_truncate', conversation_id, keep)
+        return dropped
+    
+    def recently_used(self, seconds: float) -> Set[str]:
+        """Ids of the conversations read or written in the last ``seconds``, e.g. open in a live session"""
+        since = time.monotonic() - seconds
+        with self._lock:
+            return {conv_id for conv_id, used in self._used.items() if used >= since}
+    
+    def resident_conversations(self) -> List[str]:
+        """Ids of the conversations whose messages are in memory, least recently used first"""
+        with self._lock:
+            resident = [conv_id for conv_id, messages in self.conversations.items() if messages is not None]
+            return sorted(resident, key=lambda conv_id: self._used.get(conv_id, 0.0))
+    
+    def footprint(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per conversation: ``messages``, approximate ``bytes``, whether it is
+        ``resident`` and its ``last_activity`` (the time of its latest message).
+        Does not load archived conversations.
+        """
+        index = self._archive_store().index() if self._archived else {}
+        with self._lock:
+            result = {}
+            for conv_id, messages in self.conversations.items():
+                if messages is not None:
+                    result[conv_id] = {'messages': len(messages), 'bytes': self._bytes.get(conv_id, 0),
+                                       'resident': True,
+                                       'last_activity': self._last_activity(messages) if messages else None}
+                    continue
+                raw_bytes, archived_at, last_message_at = index.get(conv_id, (0, None, None))
+                # Archives written before last_message_at was recorded only know when they were archived
+                last = last_message_at or archived_at
+                result[conv_id] = {'messages': self._archived.get(conv_id, 0),
+                                   'bytes': self._bytes.get(conv_id, raw_bytes), 'resident': False,
+                                   'last_activity': datetime.fromtimestamp(last) if last else None}
+            return result
+    
+    def archive_stats(self) -> Dict[str, Any]:
+        """Archive size and savings, rehydration latency and resident/archived counts"""
+        if self.archive is None and not self._archived:
+            return {}
+        stats = self._archive_store().stats()
+        with self._lock:
+            stats['resident_conversations'] = sum(1 for messages in self.conversations.values()
+                                                  if messages is not None)
+            stats['archived_conversations'] = len(self.conversations) - stats['resident_conversations']
+        return stats    
\ No newline at end of file
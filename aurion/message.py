@@ -0,0 +1,162 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FIELDS = ('role', 'message', 'timestamp', 'tokens', 'error')
+_FIELD_SET = frozenset(FIELDS)
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+_ROLES: List[str] = ['user', 'assistant']
+_ROLE_CODES: Dict[str, int] = {role: code for code, role in enumerate(_ROLES)}
+_roles_lock = threading.Lock()
+_MISSING = object()
+
+
+def now() -> float:
+    """Current local wall-clock time in epoch seconds (see ``Message``)"""
+    return (datetime.now() - _EPOCH) / _SECOND
+
+
+def role_code(role: str) -> int:
+    """Small integer shared by every message with this role"""
+    code = _ROLE_CODES.get(role)
+    if code is None:
+        with _roles_lock:
+            code = _ROLE_CODES.get(role)
+            if code is None:
+                _ROLES.append(role)
+                code = _ROLE_CODES[role] = len(_ROLES) - 1
+    return code
+
+
+class Message:
+    """
+    A stored chat message. Slotted, with the role as an interned code and the
+    timestamp as epoch seconds, so it takes a fraction of the memory of the
+    dict it replaces. It still reads like that dict (``msg['timestamp']``,
+    ``msg.get('tokens')``, ``dict(msg)``): the ISO timestamp is only
+    formatted when asked for, and ``to_dict()`` gives the JSON form.
+
+    ``created`` counts seconds since 1970-01-01 on the local wall clock, the
+    same naive time the ISO strings carry, so converting between the two is
+    exact and needs no time-zone lookups.
+    """
+
+    __slots__ = ('_role', 'message', 'created', 'tokens', 'error', '_iso', 'extra')
+
+    def __init__(self, role: str, message: str, created: Optional[float] = None,
+                 tokens: Optional[int] = None, error: Optional[bool] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self._role = role_code(role)
+        self.message = message
+        self.created = now() if created is None else created
+        self.tokens = tokens
+        self.error = error or None
+        self._iso: Optional[str] = None  # Timestamps that do not survive the float round trip
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        if isinstance(data, Message):
+            return data
+        extra = None
+        if not data.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        msg = cls(data['role'], data['message'], 0.0, data.get('tokens'), data.get('error'), extra)
+        msg._set_timestamp(data.get('timestamp'))
+        return msg
+
+    @property
+    def role(self) -> str:
+        return _ROLES[self._role]
+
+    @property
+    def timestamp(self) -> Optional[str]:
+        if self.created is None:
+            return self._iso
+        return (_EPOCH + timedelta(microseconds=round(self.created * 1e6))).isoformat()
+
+    def _set_timestamp(self, timestamp: Optional[str]) -> None:
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+            if parsed.tzinfo is None and parsed.isoformat() == timestamp:
+                self.created, self._iso = (parsed - _EPOCH) / _SECOND, None
+                return
+        except (TypeError, ValueError):
+            pass
+        # Time-zone aware, non-canonical or malformed: keep the original text
+        self.created, self._iso = None, timestamp
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'message':
+            return self.message
+        if key == 'role':
+            return _ROLES[self._role]
+        if key == 'timestamp':
+            value = self.timestamp
+        elif key == 'tokens':
+            value = self.tokens
+        elif key == 'error':
+            value = self.error
+        else:
+            return self.extra.get(key, default) if self.extra else default
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'role':
+            self._role = role_code(value)
+        elif key == 'timestamp':
+            self._set_timestamp(value)
+        elif key in ('message', 'tokens', 'error'):
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'role': _ROLES[self._role], 'message': self.message}
+        timestamp = self.timestamp
+        if timestamp is not None:
+            data['timestamp'] = timestamp
+        if self.tokens is not None:
+            data['tokens'] = self.tokens
+        if self.error is not None:
+            data['error'] = self.error
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return list(self.to_dict().items())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Message):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
@@ -1,62 +1,100 @@
-from typing import Dict, Optional
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Optional
+from .templates import RoleTemplate, TemplateRegistry, default_registry
+from .tokens import truncate_to_tokens
+
+class _RolesView(Mapping):
+    """
+    Read-only ``{key: {"name", "system_prompt"}}`` view of the default
+    registry, the shape ``PromptController.ROLES`` had before roles moved
+    to files; it follows reloads and ``set_default_registry``
+    """
+
+    def __getitem__(self, key: str) -> Mapping:
+        template = default_registry().get(key)
+        if template is None:
+            raise KeyError(key)
+        return MappingProxyType({"name": template.name, "system_prompt": template.system_prompt})
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(default_registry().roles())
+
+    def __len__(self) -> int:
+        return len(default_registry().roles())
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and key in default_registry()
+
 
 class PromptController:
     """
     Manages prompt engineering and assistant personality
+
+    Roles are loaded from ``config/roles/*.json`` by a TemplateRegistry
+    (see aurion.templates); pass ``registry`` to use another set.
+    ``ROLES`` is kept for existing callers as a read-only view of the
+    default registry; edit the role files to change roles.
     """
     
-    ROLES = {
-        "general": {
-            "name": "General Assistant",
-            "system_prompt": """You are Aurion, an advanced AI personal assistant inspired by Iron Man's AI. 
-You are helpful, intelligent, professional yet friendly, and slightly witty. 
-You provide accurate and concise information while maintaining an engaging conversation style.
-Always be respectful and professional."""
-        },
-        "tutor": {
-            "name": "Learning Tutor",
-            "system_prompt": """You are Aurion in tutor mode. You are an expert educator and mentor.
-Explain concepts clearly with examples, break down complex topics into digestible parts,
-ask questions to ensure understanding, and provide practice problems when appropriate.
-Be patient, encouraging, and adapt your teaching style to the student's level."""
-        },
-        "coder": {
-            "name": "Coding Assistant",
-            "system_prompt": """You are Aurion in coding assistant mode. You are a 10 years experienced software engineer and an expert programmer
-proficient in multiple languages and frameworks. Provide clean, well-commented code,
-explain programming concepts, help debug issues, suggest best practices,
-and discuss architecture patterns. Focus on writing efficient and maintainable code."""
-        },
-        "mentor": {
-            "name": "Career Mentor",
-            "system_prompt": """You are Aurion in career mentor mode. You provide guidance on
-career development, job searching, interview preparation, skill development,
-and professional growth. Give practical advice, share industry insights,
-and help users make informed career decisions."""
-        }
-    }
+    ROLES: Mapping = _RolesView()
     
-    def __init__(self, role: str = "general"):
-        self.role = role if role in self.ROLES else "general"
+    def __init__(self, role: str = "general", registry: Optional[TemplateRegistry] = None):
+        self.registry = registry or default_registry()
+        self.role = role if role in self.registry else self.registry.get_or_default(role).key
         
     def set_role(self, role: str) -> bool:
-        if role in self.ROLES:
+        if role in self.registry:
             self.role = role
             return True
         return False
     
+    def get_template(self) -> RoleTemplate:
+        """The compiled template of the current role (the default role's if it was removed)"""
+        return self.registry.get_or_default(self.role)
+    
     def get_role_name(self) -> str:
-        return self.ROLES[self.role]["name"]
+        return self.get_template().name
     
     def get_system_prompt(self) -> str:
-        return self.ROLES[self.role]["system_prompt"]
+        return self.get_template().system_prompt
+    
+    def get_prompt_prefix(self) -> str:
+        return self.get_template().prefix
+    
+    def get_prefix_hash(self) -> str:
+        """SHA-256 of the static prompt prefix; changes only when the role is edited"""
+        return self.get_template().prefix_hash
     
     def build_prompt(self, user_input: str, memory_context: Optional[str] = None, 
-                    max_context_length: int = 10) -> str:
+                    max_context_length: int = 10, max_context_tokens: Optional[int] = None,
+                    summary: Optional[str] = None, retrieved: Optional[List[str]] = None) -> str:
+        """
+        Assemble the full prompt.
+        
+        ``max_context_length`` is kept for backward compatibility; message
+        windowing and token budgeting happen in ContextBuilder. Pass
+        ``max_context_tokens`` to additionally cap an externally built context,
+        keeping its most recent part. ``summary`` is the running summary of
+        turns that already left the context window; ``retrieved`` holds
+        "Role: message" lines recalled from older or other conversations.
+        """
+        if memory_context and max_context_tokens is not None:
+            memory_context = truncate_to_tokens(memory_context, max_context_tokens, keep_tail=True)
+        
         prompt_parts = []
 
-        prompt_parts.append(self.get_system_prompt())
-        prompt_parts.append("\n\n")
+        prompt_parts.append(self.get_prompt_prefix())
+        
+        if summary:
+            prompt_parts.append("Summary of the earlier conversation:\n")
+            prompt_parts.append(summary)
+            prompt_parts.append("\n\n")
+        
+        if retrieved:
+            prompt_parts.append("Relevant messages from earlier conversations:\n")
+            prompt_parts.append("\n".join(retrieved))
+            prompt_parts.append("\n\n")
         
         if memory_context:
             prompt_parts.append("Previous conversation context:")
@@ -69,14 +107,8 @@ and help users make informed career decisions."""
         return "".join(prompt_parts)
     
     @staticmethod
-    def get_available_roles() -> Dict[str, str]:
-        return {key: value["name"] for key, value in PromptController.ROLES.items()}
+    def get_available_roles(registry: Optional[TemplateRegistry] = None) -> Dict[str, str]:
+        return (registry or default_registry()).roles()
     
     def get_greeting(self) -> str:
-        greetings = {
-            "general": "Hello! I'm Aurion, your personal AI assistant. How may I help you today?",
-            "tutor": "Hello! I'm Aurion in tutor mode. Ready to learn something new? What would you like to study today?",
-            "coder": "Hello! I'm Aurion, your coding assistant. What programming challenge can I help you with?",
-            "mentor": "Hello! I'm Aurion, your career mentor. Let's discuss your professional goals and development."
-        }
-        return greetings.get(self.role, greetings["general"])
\ No newline at end of file
+        return self.get_template().greeting
@@ -0,0 +1,264 @@
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Generator, Optional
+from .errors import CircuitOpenError, EngineError, EngineTimeoutError, to_engine_error
+from .instrumentation import tracer
+
+
+_END = object()  # Marks the end of a stream read by ResilientEngine._read_stream
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff: attempt ``n`` waits a random time between
+    0 and ``min(max_delay, base_delay * 2 ** n)`` ("full jitter")
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast after ``failure_threshold`` consecutive retryable failures.
+
+    After ``reset_timeout`` seconds one trial request is let through
+    (half-open); its success closes the circuit, its failure re-opens it.
+    Any other outcome (a non-retryable error, an abandoned stream) must
+    call ``release`` so the next request can be the trial.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a request without a verdict; frees the half-open trial slot"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    tracer.incr("engine.circuit_opened")
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+class ResilientEngine:
+    """
+    Wraps a GeminiEngine-compatible engine with deadline-aware retries,
+    optional hedged requests and a circuit breaker.
+
+    Only RetryableEngineError (rate limits, overload, timeouts, network) is
+    retried, and never past ``deadline`` seconds after the call started.
+    With ``hedge_after`` set, ``generate()`` sends a second identical request
+    if the first has not answered by then and returns whichever finishes
+    first. Streams are retried only until their first chunk has been yielded.
+
+    Each stream is read by its own thread, so a hung upstream call never
+    holds up ``generate()`` or other streams; at most ``max_streams`` reader
+    threads exist at a time. A reader blocked on the upstream call stays
+    until the call returns, so give the wrapped engine a request timeout
+    (GeminiEngine's ``request_timeout``) to bound that.
+    """
+
+    def __init__(self, engine, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, deadline: float = 60.0,
+                 hedge_after: Optional[float] = None, max_workers: int = 8,
+                 max_streams: int = 64, sleep: Callable[[float], None] = time.sleep):
+        self.engine = engine
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.sleep = sleep
+        self.model_name = getattr(engine, "model_name", "")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aurion-engine")
+        self._stream_slots = threading.BoundedSemaphore(max_streams)
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            tracer.incr("engine.circuit_rejected")
+            raise CircuitOpenError("Gemini API is temporarily unavailable; please try again shortly")
+
+    def _backoff(self, attempt: int, deadline_at: float, error: EngineError) -> None:
+        """Sleep before the next attempt, or re-raise when out of attempts or time"""
+        if not error.retryable or attempt + 1 >= self.retry.max_attempts:
+            raise error
+        delay = self.retry.delay(attempt)
+        if time.monotonic() + delay >= deadline_at:
+            raise error
+        tracer.incr("engine.retries")
+        self.sleep(delay)
+
+    def _call_generate(self, prompt: str, deadline_at: float) -> str:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise EngineTimeoutError("Gemini API Error: request timed out")
+
+        futures = {self._executor.submit(self.engine.generate, prompt)}
+        if self.hedge_after is not None and self.hedge_after < remaining:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                tracer.incr("engine.hedged")
+                futures.add(self._executor.submit(self.engine.generate, prompt))
+
+        last_error: Optional[Exception] = None
+        while futures:
+            remaining = deadline_at - time.monotonic()
+            done, futures = wait(futures, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+        if last_error is not None and not futures:
+            raise to_engine_error(last_error)
+        raise EngineTimeoutError("Gemini API Error: request timed out")
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            try:
+                response = self._call_generate(prompt, deadline_at)
+            except Exception as e:
+                error = to_engine_error(e)
+                if error.retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release()
+                self._backoff(attempt, deadline_at, error)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    def _read_stream(self, prompt: str, chunks: "queue.Queue", stop: threading.Event) -> None:
+        """Reader thread: move the upstream stream's chunks to ``chunks`` until it ends or ``stop`` is set"""
+        upstream = None
+        try:
+            upstream = iter(self.engine.generate_stream(prompt))
+            for chunk in upstream:
+                if stop.is_set():
+                    break
+                chunks.put(chunk)
+            chunks.put(_END)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            close = getattr(upstream, "close", None)
+            if close is not None:
+                close()
+            self._stream_slots.release()
+
+    def _start_stream(self, prompt: str, deadline_at: float):
+        """Start a reader thread for one attempt; returns its chunk queue and stop event"""
+        if not self._stream_slots.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+            # Local saturation, not an upstream failure: nothing to retry or report
+            self.breaker.release()
+            raise EngineTimeoutError("Gemini API Error: too many streams in flight")
+        chunks: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        threading.Thread(target=self._read_stream, args=(prompt, chunks, stop),
+                         name="aurion-stream", daemon=True).start()
+        return chunks, stop
+
+    @staticmethod
+    def _next_chunk(chunks: "queue.Queue", deadline_at: float) -> object:
+        """The stream's next chunk, or _END; raises once the deadline passes"""
+        remaining = deadline_at - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise queue.Empty
+            item = chunks.get(timeout=remaining)
+        except queue.Empty:
+            raise EngineTimeoutError("Gemini API Error: stream exceeded its deadline") from None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            chunks, stop = self._start_stream(prompt, deadline_at)
+            started = False
+            settled = False
+            try:
+                while True:
+                    chunk = self._next_chunk(chunks, deadline_at)
+                    if chunk is _END:
+                        break
+                    started = True
+                    yield chunk
+            except Exception as e:
+                error = to_engine_error(e)
+                if error.retryable:
+                    self.breaker.record_failure()
+                    settled = True
+                if started:
+                    # Chunks already reached the caller; a retry would duplicate them
+                    raise error
+                self._backoff(attempt, deadline_at, error)
+                attempt += 1
+                continue
+            else:
+                self.breaker.record_success()
+                settled = True
+                return
+            finally:
+                # Also reached when the caller stops reading; the reader then
+                # closes the upstream stream at its next chunk
+                stop.set()
+                if not settled:
+                    # Non-retryable error or a caller that stopped reading
+                    self.breaker.release()
+
+    def is_api_available(self) -> bool:
+        return self.engine.is_api_available()
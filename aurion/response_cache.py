@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generator, List, Optional, Tuple
+from .templates import TemplateRegistry, default_registry
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace; case is kept, since it can change what is asked"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_cache_key(model_name: str, *parts: str) -> str:
+    """Stable hash of the model name and the normalised prompt parts"""
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update(normalize_text(part or "").encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of model replies, stored as the list of streamed chunks.
+
+    Entries are capped both by count and by total size in bytes. An optional
+    on-disk tier (SQLite) keeps evicted and older entries across restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: Optional[float] = 3600.0, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, Tuple[Optional[float], List[str], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL, chunks TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def _size(chunks: List[str]) -> int:
+        return sum(len(chunk.encode('utf-8')) for chunk in chunks)
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at < time.time()
+
+    def _store(self, key: str, expires_at: Optional[float], chunks: List[str]) -> None:
+        size = self._size(chunks)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (expires_at, chunks, size)
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    self._bytes -= self._entries.pop(key)[2]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT expires_at, chunks FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if self._expired(row[0]):
+                        self._disk.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    else:
+                        chunks = json.loads(row[1])
+                        self._store(key, row[0], chunks)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return chunks
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, chunks: List[str]) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._store(key, expires_at, list(chunks))
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, chunks) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(chunks, ensure_ascii=False))
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+
+class CachedEngine:
+    """
+    Wraps a GeminiEngine-compatible engine with a ResponseCache.
+
+    The prompt handed to the engine is the deterministic composition of the
+    role's system prompt, the conversation context and the user input, so the
+    cache key is the hash of the model name and the normalised prompt. A
+    prompt that starts with a role template's prefix is keyed on the prefix's
+    content hash plus the rest, so the static prefix is not re-normalised
+    every turn. Streaming replies are cached chunk by chunk and replayed on a hit.
+
+    An engine that routes between models (``routes_models``, e.g. a
+    ModelRouter) may answer the same prompt with different models, so
+    nothing is cached in front of it and requests pass straight through.
+    """
+
+    def __init__(self, engine, cache: Optional[ResponseCache] = None,
+                 templates: Optional[TemplateRegistry] = None):
+        self.engine = engine
+        self.cache = cache or ResponseCache()
+        self.templates = templates or default_registry()
+        self.model_name = getattr(engine, "model_name", "")
+        self.enabled = not getattr(engine, "routes_models", False)
+
+    def _key(self, prompt: str) -> str:
+        template = self.templates.match_prefix(prompt)
+        if template is None:
+            return make_cache_key(self.model_name, prompt)
+        return make_cache_key(self.model_name, template.prefix_hash, prompt[len(template.prefix):])
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        if not self.enabled:
+            return self.engine.generate(prompt)
+        key = self._key(prompt)
+        chunks = self.cache.get(key)
+        if chunks is not None:
+            return "".join(chunks)
+
+        response = self.engine.generate(prompt)
+        self.cache.put(key, [response])
+        return response
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        if not self.enabled:
+            yield from self.engine.generate_stream(prompt)
+            return
+        key = self._key(prompt)
+        chunks = self.cache.get(key)
+        if chunks is not None:
+            yield from chunks
+            return
+
+        received = []
+        for chunk in self.engine.generate_stream(prompt):
+            received.append(chunk)
+            yield chunk
+
+        # Only reached when the stream completed without raising
+        if received:
+            self.cache.put(key, received)
+
+    def is_api_available(self) -> bool:
+        return self.engine.is_api_available()
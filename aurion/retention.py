@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional, Set
+from .instrumentation import tracer
+
+
+class RetentionPolicy(NamedTuple):
+    """
+    Limits enforced by RetentionSweeper; None disables a limit.
+
+    ``max_messages_per_conversation``, ``max_total_bytes`` (approximate size
+    of all messages) and ``idle_ttl_seconds`` delete history for good.
+    ``max_resident_conversations`` only moves the least recently used
+    conversations to the archive, from which they are loaded on next use.
+    """
+    max_messages_per_conversation: Optional[int] = None
+    max_total_bytes: Optional[int] = None
+    idle_ttl_seconds: Optional[float] = None
+    max_resident_conversations: Optional[int] = None
+
+    def is_enabled(self) -> bool:
+        return any(limit is not None for limit in self)
+
+
+class RetentionSweeper:
+    """
+    Applies a RetentionPolicy to a Memory, every ``interval`` seconds on a
+    background thread once started, or on demand with ``sweep``.
+
+    Each sweep, in order: deletes conversations idle longer than the TTL,
+    trims conversations over the message limit (oldest messages first),
+    deletes the least recently active conversations while the total size is
+    over the byte limit, then evicts the least recently used conversations
+    over the resident limit. Conversations used in the last
+    ``active_seconds`` (open in some session) are never deleted or evicted;
+    the idle TTL counts from a conversation's last message. Memory changes take only the affected conversation's lock, so
+    turns in other conversations are not held up.
+    """
+
+    def __init__(self, memory, policy: RetentionPolicy, interval: float = 60.0,
+                 active_seconds: float = 1800.0):
+        self.memory = memory
+        self.policy = policy
+        self.interval = interval
+        self.active_seconds = active_seconds
+        self.sweeps = 0
+        self.expired = 0
+        self.trimmed_messages = 0
+        self.deleted_for_bytes = 0
+        self.evicted = 0
+        self.last_sweep_ms = 0.0
+        self._footprint: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "RetentionSweeper":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="aurion-retention", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error applying retention policy: {e}")
+
+    def sweep(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Apply the policy once; returns what this sweep removed or evicted"""
+        start = time.perf_counter()
+        now = now or datetime.now()
+        policy = self.policy
+        # Every session shares this Memory, so "current" would protect only the latest one
+        active: Set[str] = self.memory.recently_used(self.active_seconds)
+        result = {'expired': 0, 'trimmed_messages': 0, 'deleted_for_bytes': 0, 'evicted': 0}
+
+        with tracer.span("retention.sweep"):
+            footprint = self.memory.footprint()
+
+            if policy.idle_ttl_seconds is not None:
+                cutoff = now - timedelta(seconds=policy.idle_ttl_seconds)
+                for conv_id, info in list(footprint.items()):
+                    last = info['last_activity']
+                    if conv_id not in active and last is not None and last < cutoff:
+                        self.memory.delete_conversation(conv_id)
+                        del footprint[conv_id]
+                        result['expired'] += 1
+
+            if policy.max_messages_per_conversation is not None:
+                limit = max(0, policy.max_messages_per_conversation)
+                over = [conv_id for conv_id, info in footprint.items() if info['messages'] > limit]
+                for conv_id in over:
+                    result['trimmed_messages'] += self.memory.trim(conv_id, limit)
+                if over:
+                    footprint = self.memory.footprint()
+
+            if policy.max_total_bytes is not None:
+                total = sum(info['bytes'] for info in footprint.values())
+                # Oldest activity first; conversations without messages free nothing
+                candidates = sorted((info['last_activity'], conv_id) for conv_id, info in footprint.items()
+                                    if conv_id not in active and info['last_activity'] is not None)
+                for _, conv_id in candidates:
+                    if total <= policy.max_total_bytes:
+                        break
+                    total -= footprint.pop(conv_id)['bytes']
+                    self.memory.delete_conversation(conv_id)
+                    result['deleted_for_bytes'] += 1
+
+            if policy.max_resident_conversations is not None:
+                resident = self.memory.resident_conversations()
+                excess = len(resident) - max(0, policy.max_resident_conversations)
+                for conv_id in resident:
+                    if excess <= 0:
+                        break
+                    if conv_id not in active and self.memory.evict(conv_id):
+                        excess -= 1
+                        result['evicted'] += 1
+
+            footprint = self.memory.footprint()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.sweeps += 1
+            self.expired += result['expired']
+            self.trimmed_messages += result['trimmed_messages']
+            self.deleted_for_bytes += result['deleted_for_bytes']
+            self.evicted += result['evicted']
+            self.last_sweep_ms = elapsed_ms
+            self._footprint = {
+                'conversations': len(footprint),
+                'resident_conversations': sum(1 for info in footprint.values() if info['resident']),
+                'messages': sum(info['messages'] for info in footprint.values()),
+                'bytes': sum(info['bytes'] for info in footprint.values()),
+                'resident_bytes': sum(info['bytes'] for info in footprint.values() if info['resident'])
+            }
+        for name, count in result.items():
+            if count:
+                tracer.incr(f"retention.{name}", count)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals since start plus the memory footprint after the last sweep"""
+        with self._lock:
+            return dict(self._footprint, sweeps=self.sweeps, expired=self.expired,
+                        trimmed_messages=self.trimmed_messages, deleted_for_bytes=self.deleted_for_bytes,
+                        evicted=self.evicted, last_sweep_ms=self.last_sweep_ms)
@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from bisect import insort
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from .tokens import truncate_to_tokens
+
+try:
+    import numpy as np
+except ImportError:  # Retrieval is optional; everything else works without NumPy
+    np = None
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Semantic recall needs NumPy: pip install numpy")
+
+
+class HashingEmbedder:
+    """
+    Local, dependency-free embedder for offline use and tests: words and
+    word bigrams are hashed into ``dim`` signed buckets and the vector is
+    L2-normalised, so the dot product is a cosine similarity.
+
+    Any object with a ``dim`` attribute and an ``embed(texts)`` method
+    returning a float32 array of shape (len(texts), dim) can replace it.
+    """
+
+    def __init__(self, dim: int = 256):
+        _require_numpy()
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = [word.casefold() for word in _WORD.findall(text)]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # blake2b rather than hash(): stable across processes
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                vectors[row, digest % self.dim] += 1.0 if (digest >> 63) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class VectorIndex:
+    """
+    Append-only vector store on disk.
+
+    ``<path>.vec`` is a raw float32 matrix opened as a NumPy memmap and grown
+    by doubling, so appends never rewrite existing rows. ``<path>.meta.jsonl``
+    holds one line per row (written after the vector, so a torn write only
+    loses the tail) plus tombstone lines that hide rows. Rows beyond the
+    metadata count are ignored on load.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: str, dim: int):
+        _require_numpy()
+        self.path = path
+        self.dim = dim
+        self.vector_file = f"{path}.vec"
+        self.meta_file = f"{path}.meta.jsonl"
+        self.meta: List[Dict[str, Any]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = None
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.meta)
+
+    def _load(self) -> None:
+        tombstones = []
+        if os.path.exists(self.meta_file):
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn tail
+                    if record.get('op') == 'hide':
+                        tombstones.append(record['rows'])
+                    else:
+                        self.meta.append(record)
+
+        rows = os.path.getsize(self.vector_file) // (4 * self.dim) if os.path.exists(self.vector_file) else 0
+        del self.meta[rows:]
+        self._map(max(rows, self.INITIAL_CAPACITY))
+        self._alive = np.zeros(len(self._vectors), dtype=bool)
+        self._alive[:len(self.meta)] = True
+        for hidden in tombstones:
+            self._alive[[row for row in hidden if row < len(self.meta)]] = False
+
+    def _map(self, capacity: int) -> None:
+        size = capacity * self.dim * 4
+        with open(self.vector_file, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(self.vector_file, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+
+    def append(self, vectors: "np.ndarray", meta: List[Dict[str, Any]]) -> List[int]:
+        """Store rows of ``vectors`` with their metadata; returns the new row ids"""
+        with self._lock:
+            start = len(self.meta)
+            end = start + len(meta)
+            if end > len(self._vectors):
+                capacity = len(self._vectors)
+                while capacity < end:
+                    capacity *= 2
+                self._map(capacity)
+                alive = np.zeros(capacity, dtype=bool)
+                alive[:start] = self._alive[:start]
+                self._alive = alive
+
+            self._vectors[start:end] = vectors
+            self._vectors.flush()
+            with open(self.meta_file, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in meta))
+            self.meta.extend(meta)
+            self._alive[start:end] = True
+            return list(range(start, end))
+
+    def hide(self, rows: List[int]) -> None:
+        """Exclude rows from future searches (their data stays until a rebuild)"""
+        if not rows:
+            return
+        with self._lock:
+            with open(self.meta_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'op': 'hide', 'rows': rows}) + "\n")
+            self._alive[rows] = False
+
+    def live_rows(self) -> List[tuple]:
+        """(row, metadata) for every row not hidden"""
+        with self._lock:
+            return [(row, record) for row, record in enumerate(self.meta) if self._alive[row]]
+
+    def search(self, query: "np.ndarray", k: int = 5, exclude: Sequence[int] = ()) -> List[tuple]:
+        """Top ``k`` live rows by dot product, as (row, score) pairs, best first"""
+        with self._lock:
+            count = len(self.meta)
+            if count == 0 or k <= 0:
+                return []
+            scores = self._vectors[:count] @ query
+            scores[~self._alive[:count]] = -np.inf
+            if exclude:
+                scores[list(exclude)] = -np.inf
+
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top if np.isfinite(scores[row])]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+
+class Retriever:
+    """
+    Semantic recall across conversations.
+
+    Registered as a Memory listener, it embeds every non-error message as it
+    is added and hides the rows of cleared, deleted or trimmed messages.
+    ``search`` returns the messages most similar to a query, skipping the
+    latest ``exclude_recent`` messages of the given conversation, which are
+    already in the prompt's context window.
+
+    Each row records its message's position in the conversation. The first
+    time a conversation is touched in a process its rows are checked against
+    the history (position and timestamp); a conversation that changed while
+    no Retriever was listening, or whose rows predate positions, is embedded
+    again.
+    """
+
+    def __init__(self, memory, embedder=None, index_path: str = "data/embeddings",
+                 min_score: float = 0.2, max_snippet_tokens: int = 200):
+        self.memory = memory
+        self.embedder = embedder or HashingEmbedder()
+        self.index = VectorIndex(index_path, self.embedder.dim)
+        self.min_score = min_score
+        self.max_snippet_tokens = max_snippet_tokens
+        # Per conversation: (message position, row), ordered by position
+        self._rows: Dict[str, List[Tuple[int, int]]] = {}
+        for row, record in self.index.live_rows():
+            self._rows.setdefault(record['conversation_id'], []).append((record.get('position', -1), row))
+        for rows in self._rows.values():
+            rows.sort()
+        self._verified: Set[str] = set()
+        self._lock = threading.Lock()
+        memory.add_listener(self)
+
+    @staticmethod
+    def _indexable(msg: Dict) -> bool:
+        return not msg.get('error') and bool(msg['message'].strip())
+
+    def _records(self, conversation_id: str, messages: List[Tuple[int, Dict]]) -> List[Dict[str, Any]]:
+        return [{
+            'conversation_id': conversation_id,
+            'position': position,
+            'role': msg['role'],
+            'message': truncate_to_tokens(msg['message'], self.max_snippet_tokens),
+            'timestamp': msg.get('timestamp')
+        } for position, msg in messages]
+
+    def _index(self, conversation_id: str, messages: List[Tuple[int, Dict]]) -> None:
+        """Embed (position, message) pairs, skipping positions that already have a row"""
+        with self._lock:
+            indexed = {position for position, _ in self._rows.get(conversation_id, [])}
+        messages = [(position, msg) for position, msg in messages
+                    if position not in indexed and self._indexable(msg)]
+        if not messages:
+            return
+        vectors = self.embedder.embed([msg['message'] for _, msg in messages])
+        with self._lock:
+            rows = self.index.append(vectors, self._records(conversation_id, messages))
+            for (position, _), row in zip(messages, rows):
+                insort(self._rows.setdefault(conversation_id, []), (position, row))
+
+    def _index_history(self, conversation_id: str, history: List[Dict], batch_size: int = 256) -> None:
+        for start in range(0, len(history), batch_size):
+            self._index(conversation_id, list(enumerate(history[start:start + batch_size], start)))
+
+    def _verify(self, conversation_id: str, history: List[Dict]) -> None:
+        """Re-embed ``history`` (a prefix of the conversation) unless its rows line up with it"""
+        with self._lock:
+            if conversation_id in self._verified:
+                return
+            rows = list(self._rows.get(conversation_id, []))
+        expected = [position for position, msg in enumerate(history) if self._indexable(msg)]
+        if [position for position, _ in rows] != expected or any(
+                self.index.meta[row].get('timestamp') != history[position].get('timestamp')
+                for position, row in rows):
+            with self._lock:
+                self.index.hide([row for _, row in self._rows.pop(conversation_id, [])])
+            self._index_history(conversation_id, history)
+        with self._lock:
+            self._verified.add(conversation_id)
+
+    def backfill(self, batch_size: int = 256) -> int:
+        """Embed all stored history when the index is empty; returns the number of rows added"""
+        if len(self.index):
+            return 0
+        for conversation_id in self.memory.get_conversation_ids():
+            self._index_history(conversation_id, self.memory.scan_history(conversation_id), batch_size)
+            with self._lock:
+                self._verified.add(conversation_id)
+        return len(self.index)
+
+    def _position(self, conversation_id: str, message: Dict, tail: int = 16) -> Optional[int]:
+        """Position of a just-added message, looked up among the conversation's latest ones"""
+        while True:
+            count = self.memory.get_message_count(conversation_id)
+            latest = self.memory.get_history(conversation_id, tail)
+            if self.memory.get_message_count(conversation_id) == count:
+                break
+        for i in range(len(latest) - 1, -1, -1):
+            candidate = latest[i]
+            if candidate is message or (candidate.get('timestamp') == message.get('timestamp')
+                                        and candidate['message'] == message['message']):
+                return count - len(latest) + i
+        return None
+
+    def on_add(self, conversation_id: str, message: Dict) -> None:
+        position = self._position(conversation_id, message)
+        if position is None:
+            return  # Already trimmed, cleared or deleted again
+        if conversation_id not in self._verified:
+            self._verify(conversation_id, self.memory.get_history(conversation_id)[:position])
+        self._index(conversation_id, [(position, message)])
+
+    def on_clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self.index.hide([row for _, row in self._rows.pop(conversation_id, [])])
+
+    on_delete = on_clear
+
+    def on_trim(self, conversation_id: str, dropped: List[Dict]) -> None:
+        # The dropped messages were the oldest; the rest move up by as many positions
+        count = len(dropped)
+        with self._lock:
+            rows = self._rows.get(conversation_id, [])
+            self.index.hide([row for position, row in rows if position < count])
+            self._rows[conversation_id] = [(position - count, row) for position, row in rows if position >= count]
+
+    def on_truncate(self, conversation_id: str, keep: int) -> None:
+        with self._lock:
+            rows = self._rows.get(conversation_id, [])
+            self.index.hide([row for position, row in rows if position >= keep])
+            self._rows[conversation_id] = [(position, row) for position, row in rows if position < keep]
+
+    def search(self, query: str, k: int = 3, conversation_id: Optional[str] = None,
+               exclude_recent: int = 0) -> List[Dict[str, Any]]:
+        """Stored messages most similar to ``query``, each with its ``score``"""
+        if not query.strip():
+            return []
+        exclude = []
+        if conversation_id and exclude_recent > 0:
+            if conversation_id not in self._verified:
+                self._verify(conversation_id, self.memory.get_history(conversation_id))
+            first = self.memory.get_message_count(conversation_id) - exclude_recent
+            with self._lock:
+                exclude = [row for position, row in self._rows.get(conversation_id, []) if position >= first]
+        vector = self.embedder.embed([query])[0]
+        hits = []
+        for row, score in self.index.search(vector, k, exclude):
+            if score < self.min_score:
+                break
+            hit = dict(self.index.meta[row])
+            hit['score'] = score
+            hits.append(hit)
+        return hits
+
+    def close(self) -> None:
+        self.memory.remove_listener(self)
+        self.index.close()
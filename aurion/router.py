@@ -0,0 +1,216 @@
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
+from .errors import CircuitOpenError, EngineError, to_engine_error
+from .instrumentation import tracer
+from .scheduler import current_role
+from .tokens import estimate_tokens
+
+FAST = "fast"
+SLOW = "slow"
+
+# Signals that a request needs the stronger (slower, pricier) model
+_COMPLEX_WORDS = re.compile(
+    r"\b(explain|why|design|architecture|implement|refactor|debug|optimi[sz]e|compare|analy[sz]e|"
+    r"prove|derive|algorithm|trade-?offs?|step[- ]by[- ]step|review|plan|strategy)\b",
+    re.IGNORECASE
+)
+_SIMPLE_WORDS = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|cool|great|bye|good (morning|night|evening))\b",
+    re.IGNORECASE
+)
+_CODE = re.compile(r"```|\bdef |\bclass |\bfunction\b|\breturn\b|[{};]\s*$", re.MULTILINE)
+
+
+def extract_user_input(prompt: str) -> str:
+    """The latest user turn of a prompt built by PromptController"""
+    user_input = prompt.rsplit("User: ", 1)[-1]
+    return user_input.rsplit("\n\nAssistant:", 1)[0]
+
+
+def classify_prompt(user_input: str) -> float:
+    """
+    Cheap local complexity score in [0, 1]; higher means the request is
+    more likely to benefit from the slow tier
+    """
+    if _SIMPLE_WORDS.match(user_input) and len(user_input) < 40:
+        return 0.0
+    score = 0.0
+    score += min(0.4, 0.1 * len(_COMPLEX_WORDS.findall(user_input)))
+    if _CODE.search(user_input):
+        score += 0.3
+    score += min(0.2, len(user_input) / 2000)
+    if user_input.count("?") > 1:
+        score += 0.1
+    return min(1.0, score)
+
+
+class ModelTier:
+    """
+    One routable model: an engine plus its price per million input/output
+    tokens, used for the cost estimate
+    """
+
+    def __init__(self, name: str, engine, input_cost: float = 0.0, output_cost: float = 0.0):
+        self.name = name
+        self.engine = engine
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+
+    def cost(self, prompt_tokens: int, output_tokens: int) -> float:
+        return (prompt_tokens * self.input_cost + output_tokens * self.output_cost) / 1_000_000
+
+
+class ModelStats:
+    """Exponentially weighted latency and error rate plus running totals for one tier"""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.calls = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.cost = 0.0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.updated_at = 0.0
+
+    def record(self, latency: Optional[float], failed: bool, cost: float = 0.0) -> None:
+        self.calls += 1
+        self.cost += cost
+        self.updated_at = time.monotonic()
+        if failed:
+            self.failures += 1
+        else:
+            self.latency = latency if self.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * self.latency
+            )
+        self.error_rate = self.alpha * float(failed) + (1 - self.alpha) * self.error_rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'fallbacks': self.fallbacks,
+            'latency_ms': self.latency * 1000 if self.latency is not None else None,
+            'error_rate': self.error_rate,
+            'cost': self.cost
+        }
+
+
+class ModelRouter:
+    """
+    Routes each request to a fast or a slow model tier with the
+    GeminiEngine interface, so it can be dropped in under Assistant.
+
+    The slow tier is preferred for ``slow_roles`` (read from
+    ``role_provider``, by default the role set by ``conversation_scope``),
+    for prompts above ``slow_prompt_tokens`` and for user input that
+    ``classify_prompt`` scores at or above ``threshold``. Observed stats
+    feed back: a tier whose EWMA error rate exceeds ``max_error_rate``, or
+    whose EWMA latency exceeds ``latency_budget``, yields to the other one
+    until its stats are ``recovery_after`` seconds old and it is tried again.
+    A retryable failure (including timeouts and an open circuit) falls
+    back to the other tier; streams only before their first chunk.
+    """
+
+    def __init__(self, fast: ModelTier, slow: ModelTier,
+                 role_provider: Optional[Callable[[], Optional[str]]] = None,
+                 slow_roles: Iterable[str] = ("coder",), slow_prompt_tokens: int = 1500,
+                 threshold: float = 0.4, latency_budget: Optional[float] = None,
+                 max_error_rate: float = 0.5, recovery_after: float = 30.0, alpha: float = 0.2):
+        self.tiers = {FAST: fast, SLOW: slow}
+        self.role_provider = role_provider or current_role.get
+        self.slow_roles = set(slow_roles)
+        self.slow_prompt_tokens = slow_prompt_tokens
+        self.threshold = threshold
+        self.latency_budget = latency_budget
+        self.max_error_rate = max_error_rate
+        self.recovery_after = recovery_after
+        self.model_name = fast.name
+        self.routes_models = True  # Which model answers depends on the prompt and tier health
+        self._stats = {FAST: ModelStats(alpha), SLOW: ModelStats(alpha)}
+        self._lock = threading.Lock()
+
+    def _healthy(self, tier: str) -> bool:
+        stats = self._stats[tier]
+        if time.monotonic() - stats.updated_at > self.recovery_after:
+            return True
+        if stats.error_rate > self.max_error_rate:
+            return False
+        return self.latency_budget is None or stats.latency is None or stats.latency <= self.latency_budget
+
+    def choose(self, prompt: str) -> str:
+        """Pick the tier for ``prompt`` (FAST or SLOW)"""
+        if self.role_provider() in self.slow_roles or estimate_tokens(prompt) >= self.slow_prompt_tokens:
+            tier = SLOW
+        else:
+            tier = SLOW if classify_prompt(extract_user_input(prompt)) >= self.threshold else FAST
+
+        other = FAST if tier == SLOW else SLOW
+        with self._lock:
+            if not self._healthy(tier) and self._healthy(other):
+                tier = other
+        return tier
+
+    def _order(self, prompt: str) -> List[str]:
+        tier = self.choose(prompt)
+        return [tier, FAST if tier == SLOW else SLOW]
+
+    def _record(self, tier: str, started: float, prompt: str, output: Optional[str],
+                fell_back: bool = False) -> None:
+        failed = output is None
+        cost = 0.0 if failed else self.tiers[tier].cost(estimate_tokens(prompt), estimate_tokens(output))
+        with self._lock:
+            self._stats[tier].record(None if failed else time.monotonic() - started, failed, cost)
+            if fell_back:
+                self._stats[tier].fallbacks += 1
+                tracer.incr("router.fallbacks")
+
+    @staticmethod
+    def _can_fall_back(error: EngineError) -> bool:
+        return error.retryable or isinstance(error, CircuitOpenError)
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        order = self._order(prompt)
+        for index, tier in enumerate(order):
+            started = time.monotonic()
+            try:
+                with tracer.span("router.generate", model=self.tiers[tier].name):
+                    response = self.tiers[tier].engine.generate(prompt)
+            except Exception as e:
+                error = to_engine_error(e)
+                fall_back = index + 1 < len(order) and self._can_fall_back(error)
+                self._record(tier, started, prompt, None, fell_back=fall_back)
+                if not fall_back:
+                    raise error
+                continue
+            self._record(tier, started, prompt, response)
+            return response
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        order = self._order(prompt)
+        for index, tier in enumerate(order):
+            started = time.monotonic()
+            received = []
+            try:
+                with tracer.span("router.stream", model=self.tiers[tier].name):
+                    for chunk in self.tiers[tier].engine.generate_stream(prompt):
+                        received.append(chunk)
+                        yield chunk
+            except Exception as e:
+                error = to_engine_error(e)
+                fall_back = not received and index + 1 < len(order) and self._can_fall_back(error)
+                self._record(tier, started, prompt, None, fell_back=fall_back)
+                if not fall_back:
+                    raise error
+                continue
+            self._record(tier, started, prompt, "".join(received))
+            return
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {self.tiers[tier].name: stats.to_dict() for tier, stats in self._stats.items()}
+
+    def is_api_available(self) -> bool:
+        return any(tier.engine.is_api_available() for tier in self.tiers.values())
@@ -0,0 +1,308 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Generator, Iterator, List, Optional
+from .errors import EngineError, EngineTimeoutError
+from .instrumentation import tracer
+from .tokens import estimate_tokens
+
+current_conversation: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "aurion_conversation", default=None
+)
+current_role: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "aurion_role", default=None
+)
+
+
+@contextmanager
+def conversation_scope(conversation_id: Optional[str], role: Optional[str] = None) -> Iterator[None]:
+    """
+    Tag engine calls made inside the block with a conversation id (for fair
+    queuing) and the assistant role (for model routing)
+    """
+    tokens = [(current_conversation, current_conversation.set(conversation_id)),
+              (current_role, current_role.set(role))]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            try:
+                var.reset(token)
+            except ValueError:
+                # Generator closed from another context
+                pass
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second up to ``capacity``
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Client-side quota: requests per second and prompt tokens per minute.
+    Not thread-safe on its own; FairScheduler serialises access.
+    """
+
+    def __init__(self, requests_per_second: float = 5.0, tokens_per_minute: Optional[float] = None,
+                 burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.requests = TokenBucket(requests_per_second, burst or max(1.0, requests_per_second), clock)
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute, clock) if tokens_per_minute else None
+
+    def try_acquire(self, cost: int) -> float:
+        """Take one request and ``cost`` tokens, or return how long to wait"""
+        wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(cost))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(cost)
+        return 0.0
+
+
+class _Ticket:
+    __slots__ = ('cost', 'granted', 'enqueued_at')
+
+    def __init__(self, cost: int):
+        self.cost = cost
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class FairScheduler:
+    """
+    Per-conversation FIFO queues served round-robin under a RateLimiter, so
+    one busy conversation cannot starve the others
+    """
+
+    def __init__(self, limiter: RateLimiter, max_samples: int = 1000):
+        self.limiter = limiter
+        self.granted = 0
+        self._queues: "OrderedDict[Optional[str], Deque[_Ticket]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=max_samples)
+        self._cond = threading.Condition()
+
+    def _dispatch(self) -> Optional[float]:
+        """Grant as many head-of-line tickets as the limiter allows; returns the next wait"""
+        while self._queues:
+            conv_id, queue = next(iter(self._queues.items()))
+            wait = self.limiter.try_acquire(queue[0].cost)
+            if wait > 0:
+                return wait
+            ticket = queue.popleft()
+            ticket.granted = True
+            self.granted += 1
+            # Rotate: this conversation goes to the back of the line
+            del self._queues[conv_id]
+            if queue:
+                self._queues[conv_id] = queue
+            self._cond.notify_all()
+        return None
+
+    def acquire(self, conversation_id: Optional[str], cost: int, timeout: Optional[float] = None) -> float:
+        """Block until this request may be sent; returns the time spent queued"""
+        ticket = _Ticket(cost)
+        deadline = ticket.enqueued_at + timeout if timeout is not None else None
+        with self._cond:
+            self._queues.setdefault(conversation_id, deque()).append(ticket)
+            while not ticket.granted:
+                wait = self._dispatch()
+                if ticket.granted:
+                    break
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._queues[conversation_id].remove(ticket)
+                        if not self._queues[conversation_id]:
+                            del self._queues[conversation_id]
+                        raise EngineTimeoutError("Request timed out waiting for rate limit capacity")
+                    wait = min(wait, remaining) if wait is not None else remaining
+                self._cond.wait(wait)
+
+            waited = time.monotonic() - ticket.enqueued_at
+            self._waits.append(waited)
+        return waited
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waits = sorted(self._waits)
+            depth = {conv_id: len(queue) for conv_id, queue in self._queues.items()}
+
+        def pick(pct: float) -> float:
+            return waits[min(len(waits) - 1, int(round((len(waits) - 1) * pct)))] * 1000 if waits else 0.0
+
+        return {
+            'queue_depth': sum(depth.values()),
+            'queued_conversations': len(depth),
+            'granted': self.granted,
+            'wait_p50_ms': pick(0.50),
+            'wait_p95_ms': pick(0.95),
+            'wait_max_ms': waits[-1] * 1000 if waits else 0.0
+        }
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.chunks: List[str] = []
+        self.finished = False
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller (the leader) does
+    the work, later callers with the same key share its result or stream
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                tracer.incr("scheduler.coalesced")
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        flight, leader = self._join(key)
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._leave(key, flight)
+            flight.done.set()
+
+    def stream(self, key: str, fn: Callable[[], Iterator[str]]) -> Generator[str, None, None]:
+        flight, leader = self._join(key)
+        if not leader:
+            index = 0
+            while True:
+                with flight.cond:
+                    while index >= len(flight.chunks) and not flight.finished:
+                        flight.cond.wait()
+                    pending = flight.chunks[index:]
+                    finished = flight.finished
+                index += len(pending)
+                yield from pending
+                if finished and index >= len(flight.chunks):
+                    break
+            if flight.error is not None:
+                raise flight.error
+            return
+
+        try:
+            for chunk in fn():
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+                yield chunk
+        except GeneratorExit:
+            flight.error = EngineError("The shared stream was abandoned by its leader")
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._leave(key, flight)
+            with flight.cond:
+                flight.finished = True
+                flight.cond.notify_all()
+
+
+class SchedulingEngine:
+    """
+    Scheduling layer in front of a GeminiEngine-compatible engine: fair
+    per-conversation queuing under a client-side rate limit, plus
+    single-flight coalescing of identical in-flight prompts (coalesced
+    callers do not consume quota). The conversation id is taken from
+    ``conversation_scope``.
+    """
+
+    def __init__(self, engine, limiter: Optional[RateLimiter] = None, queue_timeout: Optional[float] = 60.0):
+        self.engine = engine
+        self.scheduler = FairScheduler(limiter or RateLimiter())
+        self.single_flight = SingleFlight()
+        self.queue_timeout = queue_timeout
+        self.model_name = getattr(engine, "model_name", "")
+        self.routes_models = getattr(engine, "routes_models", False)
+
+    def _admit(self, prompt: str) -> None:
+        with tracer.span("scheduler.wait"):
+            self.scheduler.acquire(current_conversation.get(), estimate_tokens(prompt), self.queue_timeout)
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        def call() -> str:
+            self._admit(prompt)
+            return self.engine.generate(prompt)
+
+        return self.single_flight.do(prompt, call)
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        def call() -> Iterator[str]:
+            self._admit(prompt)
+            return self.engine.generate_stream(prompt)
+
+        return self.single_flight.stream(prompt, call)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.scheduler.stats()
+        stats['coalesced'] = self.single_flight.coalesced
+        return stats
+
+    def is_api_available(self) -> bool:
+        return self.engine.is_api_available()
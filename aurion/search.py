@@ -0,0 +1,290 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PHRASE = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.casefold() for token in _TOKEN.findall(text)]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a query into its distinct terms and its quoted phrases, e.g.
+    ``rust "borrow checker"`` -> (['rust', 'borrow', 'checker'], [['borrow', 'checker']])
+    """
+    phrases = [phrase for phrase in (tokenize(text) for text in _PHRASE.findall(query)) if phrase]
+    terms = tokenize(_PHRASE.sub(" ", query)) + [term for phrase in phrases for term in phrase]
+    return list(dict.fromkeys(terms)), phrases
+
+
+def _contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    width = len(phrase)
+    return any(tokens[i:i + width] == phrase for i in range(len(tokens) - width + 1)
+               if tokens[i] == phrase[0])
+
+
+def _snippet(text: str, terms: List[str], width: int = 80) -> str:
+    match = None
+    for term in terms:
+        match = re.search(rf"\b{re.escape(term)}\b", text, re.IGNORECASE)
+        if match:
+            break
+    start = max(0, match.start() - width) if match else 0
+    end = min(len(text), start + 2 * width + (match.end() - match.start() if match else 0))
+    return ("…" if start else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over every stored message, for ranked
+    full-text search.
+
+    Registered as a Memory listener, so ``add()``, ``clear()`` and
+    ``delete_conversation()`` keep it current; it is built from the stored
+    history once on creation (with ``listen=False`` it stays a snapshot of
+    that history). Postings are compact arrays of ascending
+    document ids with parallel term frequencies. All query terms must match
+    (quoted phrases must also appear in order) and results are ranked with
+    BM25. A query scores at most ``max_candidates`` documents from the
+    rarest term's postings, newest first, which bounds latency on very
+    large histories.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, memory, max_candidates: int = 10000, listen: bool = True):
+        self.memory = memory
+        self.max_candidates = max_candidates
+        self._lock = threading.RLock()
+        with self._lock:
+            # Listen before scanning so no message added meanwhile is missed
+            if listen:
+                memory.add_listener(self)
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        with self._lock:
+            self._postings: Dict[str, array] = {}
+            self._freqs: Dict[str, array] = {}
+            self._doc_conv = array('I')
+            self._doc_pos = array('I')
+            self._doc_len = array('I')
+            self._alive = bytearray()
+            self._conv_ids: List[str] = []
+            self._conv_index: Dict[str, int] = {}
+            self._conv_docs: Dict[str, List[int]] = {}
+            self._conv_counts: Dict[str, int] = {}
+            self._live = 0
+            self._dead = 0
+            self._total_len = 0
+
+            for conversation_id in self.memory.get_conversation_ids():
+                for message in self.memory.scan_history(conversation_id):
+                    self._append(conversation_id, message)
+            # Adds notified after the scan may already be part of it
+            self._scanned = set(self._conv_counts)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _index(self, conversation_id: str, position: int, message: Dict) -> None:
+        tokens = tokenize(message['message'])
+        if not tokens:
+            return
+        conv = self._conv_index.get(conversation_id)
+        if conv is None:
+            conv = self._conv_index[conversation_id] = len(self._conv_ids)
+            self._conv_ids.append(conversation_id)
+
+        doc = len(self._doc_conv)
+        self._doc_conv.append(conv)
+        self._doc_pos.append(position)
+        self._doc_len.append(len(tokens))
+        self._alive.append(1)
+        self._conv_docs.setdefault(conversation_id, []).append(doc)
+        self._live += 1
+        self._total_len += len(tokens)
+
+        for term, count in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = array('I')
+                self._freqs[term] = array('H')
+            postings.append(doc)
+            self._freqs[term].append(min(count, 65535))
+
+    def _append(self, conversation_id: str, message: Dict) -> None:
+        position = self._conv_counts.get(conversation_id, 0)
+        self._conv_counts[conversation_id] = position + 1
+        if not message.get('error'):
+            self._index(conversation_id, position, message)
+
+    def on_add(self, conversation_id: str, message: Dict) -> None:
+        with self._lock:
+            if conversation_id in self._scanned:
+                if self._conv_counts[conversation_id] >= self.memory.get_message_count(conversation_id):
+                    return  # Added before the rebuild read the conversation
+                self._scanned.discard(conversation_id)
+            self._append(conversation_id, message)
+
+    def _forget(self, conversation_id: str) -> None:
+        for doc in self._conv_docs.pop(conversation_id, []):
+            self._alive[doc] = 0
+            self._live -= 1
+            self._dead += 1
+            self._total_len -= self._doc_len[doc]
+        if self._dead > max(10000, self._live):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop postings of removed documents (document ids stay stable)"""
+        alive = self._alive
+        for term in list(self._postings):
+            postings, freqs = self._postings[term], self._freqs[term]
+            keep = [i for i, doc in enumerate(postings) if alive[doc]]
+            if not keep:
+                del self._postings[term], self._freqs[term]
+            elif len(keep) < len(postings):
+                self._postings[term] = array('I', (postings[i] for i in keep))
+                self._freqs[term] = array('H', (freqs[i] for i in keep))
+        self._dead = 0
+
+    def on_clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self._forget(conversation_id)
+            self._conv_counts[conversation_id] = 0
+
+    def on_delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._forget(conversation_id)
+            self._conv_counts.pop(conversation_id, None)
+            self._scanned.discard(conversation_id)
+
+    def on_trim(self, conversation_id: str, dropped: List[Dict]) -> None:
+        with self._lock:
+            docs = []
+            for doc in self._conv_docs.pop(conversation_id, []):
+                if self._doc_pos[doc] >= len(dropped):
+                    self._doc_pos[doc] -= len(dropped)
+                    docs.append(doc)
+                    continue
+                self._alive[doc] = 0
+                self._live -= 1
+                self._dead += 1
+                self._total_len -= self._doc_len[doc]
+            if docs:
+                self._conv_docs[conversation_id] = docs
+            self._conv_counts[conversation_id] = max(0, self._conv_counts.get(conversation_id, 0) - len(dropped))
+
+    def on_truncate(self, conversation_id: str, keep: int) -> None:
+        with self._lock:
+            docs = []
+            for doc in self._conv_docs.pop(conversation_id, []):
+                if self._doc_pos[doc] < keep:
+                    docs.append(doc)
+                    continue
+                self._alive[doc] = 0
+                self._live -= 1
+                self._dead += 1
+                self._total_len -= self._doc_len[doc]
+            if docs:
+                self._conv_docs[conversation_id] = docs
+            self._conv_counts[conversation_id] = min(keep, self._conv_counts.get(conversation_id, 0))
+
+    def _rank(self, terms: List[str], conversation_id: Optional[str]) -> List[Tuple[float, int]]:
+        with self._lock:
+            lists = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    return []
+                lists.append((postings, self._freqs[term]))
+            lists.sort(key=lambda item: len(item[0]))
+
+            total = max(1, self._live)
+            avg_len = self._total_len / total if self._live else 1.0
+            idf = [math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5)) for postings, _ in lists]
+            conv_filter = self._conv_index.get(conversation_id) if conversation_id else None
+            if conversation_id and conv_filter is None:
+                return []
+
+            rarest, rarest_freqs = lists[0]
+            scored = []
+            checked = 0
+            for i in range(len(rarest) - 1, -1, -1):
+                doc = rarest[i]
+                if not self._alive[doc] or (conv_filter is not None and self._doc_conv[doc] != conv_filter):
+                    continue
+                checked += 1
+                if checked > self.max_candidates:
+                    break
+
+                norm = self.K1 * (1 - self.B + self.B * self._doc_len[doc] / avg_len)
+                tf = rarest_freqs[i]
+                score = idf[0] * tf * (self.K1 + 1) / (tf + norm)
+                for (postings, freqs), term_idf in zip(lists[1:], idf[1:]):
+                    j = bisect_left(postings, doc)
+                    if j == len(postings) or postings[j] != doc:
+                        break
+                    tf = freqs[j]
+                    score += term_idf * tf * (self.K1 + 1) / (tf + norm)
+                else:
+                    scored.append((score, doc))
+            return scored
+
+    def search(self, query: str, limit: int = 20, conversation_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for ``query`` (optionally within one conversation), as
+        dicts with ``conversation_id``, ``position`` (index of the message in
+        its conversation), ``role``, ``score`` and a ``snippet``
+        """
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+
+        scored = self._rank(terms, conversation_id)
+        results = []
+        archived: Dict[str, List[Dict]] = {}
+        # Phrases are verified against the stored text, best-ranked first
+        for score, doc in heapq.nlargest(len(scored) if phrases else limit, scored):
+            with self._lock:
+                if not self._alive[doc]:
+                    continue
+                conv_id = self._conv_ids[self._doc_conv[doc]]
+                position = self._doc_pos[doc]
+            if self.memory.is_archived(conv_id):
+                # Decoded once per query and not kept, so the conversation stays archived
+                if conv_id not in archived:
+                    archived[conv_id] = self.memory.scan_history(conv_id)
+                messages = archived[conv_id][position:position + 1]
+            else:
+                messages = self.memory.get_history_range(conv_id, position, position + 1)
+            if not messages:
+                continue
+            text = messages[0]['message']
+            if phrases:
+                tokens = tokenize(text)
+                if not all(_contains_phrase(tokens, phrase) for phrase in phrases):
+                    continue
+            results.append({
+                'conversation_id': conv_id,
+                'position': position,
+                'role': messages[0]['role'],
+                'score': score,
+                'snippet': _snippet(text, terms)
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+    def close(self) -> None:
+        self.memory.remove_listener(self)
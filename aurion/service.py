@@ -0,0 +1,569 @@
+"""
+Headless Aurion service: Assistant behind a small JSON-over-HTTP API, served
+by several worker processes that share conversation state through a store
+(SQLiteMemory by default), so the Streamlit app can run as a thin client and
+the service can scale past one process.
+
+    python -m aurion.service --workers 4 --port 8765
+    python -m aurion.service --workers 4 --engine fake --fake-latency 0.2 --store sqlite:/tmp/aurion.db
+
+Endpoints (JSON bodies and replies):
+
+    GET    /health                              {"status", "pid"}
+    GET    /roles                               {role: display name}
+    GET    /roles/<role>                        {"key", "name", "greeting"}
+    GET    /stats                               Memory archive and per-worker engine stats
+    POST   /respond                             {"prompt", "conversation_id", "role"?, "context_window"?,
+                                                 "stream"?} -> {"response", "error", "conversation_id"},
+                                                or with "stream" NDJSON lines {"chunk"} then {"done", "error"}
+    GET    /conversations?offset=&limit=&query= {"ids", "total"}
+    POST   /conversations                       {"conversation_id"?} -> {"conversation_id"}
+    GET    /conversations/<id>/messages?start=&end=  {"messages", "total"}
+    POST   /conversations/<id>/clear
+    DELETE /conversations/<id>
+    GET    /search?q=&limit=                    {"results"}
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Generator, List, Optional
+
+from .assistant import Assistant
+from .memory import Memory
+from .prompt_controller import PromptController
+from .search import SearchIndex
+from .storage import MemoryStorage
+from .templates import default_registry
+from .streaming import StreamBuffer
+
+
+def open_store(spec: str) -> Memory:
+    """
+    The conversation store named by ``spec``:
+
+    - ``sqlite:<path>``: SQLiteMemory; safe to share between worker processes
+    - ``memory``: in-process Memory without persistence, a stand-in for tests
+      and single-worker runs
+    """
+    if spec == "memory":
+        return Memory(storage=MemoryStorage())
+    if spec.startswith("sqlite:"):
+        from .sqlite_memory import SQLiteMemory
+        return SQLiteMemory(spec[len("sqlite:"):])
+    raise ValueError(f"Unknown store {spec!r}, expected \"sqlite:<path>\" or \"memory\"")
+
+
+class ServiceError(Exception):
+    """A request the service rejects, with the HTTP status to answer"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AssistantService:
+    """
+    The operations behind the HTTP API, usable without HTTP.
+
+    Each request gets its own Assistant (and PromptController, so concurrent
+    requests can use different roles) over the shared engine and store.
+
+    Args:
+        memory: Conversation store shared by every worker
+        engine: GeminiEngine-compatible engine of this worker
+        summarizer: Optional ConversationSummarizer
+        search_ttl: Seconds before the message search index is rebuilt, so
+            it catches up with messages added by other workers. The rebuild
+            runs on a background thread while searches use the previous index.
+    """
+
+    def __init__(self, memory: Memory, engine, summarizer=None, search_ttl: float = 10.0):
+        self.memory = memory
+        self.engine = engine
+        self.summarizer = summarizer
+        self.search_ttl = search_ttl
+        self._search_index: Optional[SearchIndex] = None
+        self._search_built = 0.0
+        self._search_rebuilding = False
+        self._search_lock = threading.Lock()
+
+    def assistant(self, role: str = "general", context_window: Optional[int] = None) -> Assistant:
+        controller = PromptController()
+        if not controller.set_role(role):
+            raise ServiceError(400, f"Unknown role {role!r}")
+        assistant = Assistant(self.engine, controller, self.memory, summarizer=self.summarizer)
+        if context_window is not None:
+            assistant.set_context_window(int(context_window))
+        return assistant
+
+    def respond(self, prompt: str, conversation_id: str, role: str = "general",
+                context_window: Optional[int] = None) -> Dict[str, Any]:
+        # Always explicit: the store's current conversation is shared by every client
+        assistant = self.assistant(role, context_window)
+        response = assistant.respond(prompt, conversation_id)
+        error = assistant.last_error
+        return {'response': response, 'error': type(error).__name__ if error else None,
+                'conversation_id': conversation_id}
+
+    def respond_stream(self, prompt: str, conversation_id: str, role: str = "general",
+                       context_window: Optional[int] = None) -> Generator[Dict[str, Any], None, None]:
+        assistant = self.assistant(role, context_window)
+        for chunk in assistant.respond_stream(prompt, conversation_id):
+            yield {'chunk': chunk}
+        error = assistant.last_error
+        yield {'done': True, 'error': type(error).__name__ if error else None,
+               'conversation_id': conversation_id}
+
+    def role(self, key: str) -> Dict[str, str]:
+        template = default_registry().get(key)
+        if template is None:
+            raise ServiceError(404, f"Unknown role {key!r}")
+        return {'key': template.key, 'name': template.name, 'greeting': template.greeting}
+
+    def _rebuild_search_index(self) -> None:
+        try:
+            # Not a Memory listener: adds never wait on the index, which
+            # catches up on the next rebuild like it does for other workers
+            index = SearchIndex(self.memory, listen=False)
+        except Exception as e:
+            print(f"Error building the search index: {e}")
+            index = None
+        with self._search_lock:
+            if index is not None:
+                self._search_index = index
+                self._search_built = time.monotonic()
+            self._search_rebuilding = False
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._search_lock:
+            index = self._search_index
+            stale = index is None or time.monotonic() - self._search_built >= self.search_ttl
+            rebuild = stale and not self._search_rebuilding
+            if rebuild:
+                self._search_rebuilding = True
+        if rebuild and index is None:
+            # Only the first search waits for a build
+            self._rebuild_search_index()
+            index = self._search_index
+        elif rebuild:
+            threading.Thread(target=self._rebuild_search_index, name="aurion-search-rebuild",
+                             daemon=True).start()
+        if index is None:
+            raise ServiceError(503, "The search index is being built; try again shortly")
+        return index.search(query, limit=limit)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'pid': os.getpid(), 'archive': self.memory.archive_stats()}
+        if hasattr(self.engine, "stats"):
+            stats['engine'] = self.engine.stats()
+        return stats
+
+
+def _int(query: Dict[str, List[str]], name: str, default: Optional[int] = None) -> Optional[int]:
+    values = query.get(name)
+    if not values or values[0] == "":
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise ServiceError(400, f"{name} must be an integer")
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes the HTTP API to ``self.server.service``"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, and chunked replies for streaming
+    server_version = "AurionService"
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # One line per request is too much at load
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ServiceError(400, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "Body must be a JSON object")
+        return body
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, events) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            line = (json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8')
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _dispatch(self, method: str) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in url.path.split("/") if part]
+        query = urllib.parse.parse_qs(url.query)
+        service: AssistantService = self.server.service
+        try:
+            body = self._read_body() if method == "POST" else {}
+            route = (method, parts[0] if parts else "", len(parts))
+
+            if route == ("GET", "health", 1):
+                return self._send_json(200, {'status': "ok", 'pid': os.getpid()})
+            if route == ("GET", "roles", 1):
+                return self._send_json(200, PromptController.get_available_roles())
+            if route == ("GET", "roles", 2):
+                return self._send_json(200, service.role(parts[1]))
+            if route == ("GET", "stats", 1):
+                return self._send_json(200, service.stats())
+            if route == ("GET", "search", 1):
+                text = (query.get("q") or [""])[0]
+                return self._send_json(200, {'results': service.search(text, _int(query, "limit", 10))})
+            if route == ("POST", "respond", 1):
+                if not isinstance(body.get('prompt'), str) or not body['prompt'].strip():
+                    raise ServiceError(400, "\"prompt\" must be a non-empty string")
+                if not isinstance(body.get('conversation_id'), str) or not body['conversation_id']:
+                    raise ServiceError(400, "\"conversation_id\" must be a non-empty string")
+                args = (body['prompt'], body.get('conversation_id'), body.get('role') or "general",
+                        body.get('context_window'))
+                if body.get('stream'):
+                    service.assistant(args[2])  # Reject unknown roles before the 200 is sent
+                    return self._send_stream(service.respond_stream(*args))
+                return self._send_json(200, service.respond(*args))
+
+            if route == ("GET", "conversations", 1):
+                text = (query.get("query") or [None])[0]
+                ids = service.memory.get_conversation_ids(_int(query, "offset", 0), _int(query, "limit"), text)
+                return self._send_json(200, {'ids': ids, 'total': service.memory.get_conversation_count(text)})
+            if route == ("POST", "conversations", 1):
+                conversation_id = body.get('conversation_id') or str(uuid.uuid4())[:8]
+                service.memory.create_conversation(conversation_id)
+                return self._send_json(200, {'conversation_id': conversation_id})
+            if route == ("GET", "conversations", 3) and parts[2] == "messages":
+                total = service.memory.get_message_count(parts[1])
+                messages = service.memory.get_history_range(parts[1], _int(query, "start", 0),
+                                                            _int(query, "end", total))
+                return self._send_json(200, {'messages': [dict(msg) for msg in messages], 'total': total})
+            if route == ("POST", "conversations", 3) and parts[2] == "clear":
+                service.memory.clear(parts[1])
+                return self._send_json(200, {})
+            if route == ("DELETE", "conversations", 2):
+                service.memory.delete_conversation(parts[1])
+                return self._send_json(200, {})
+
+            raise ServiceError(404, f"No route for {method} {url.path}")
+        except ServiceError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-reply
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e!r}")
+            self._send_json(500, {'error': type(e).__name__})
+
+
+def build_engine(config: Dict[str, Any]):
+    if config['engine'] == "fake":
+        from .testing import FakeGeminiEngine
+        return FakeGeminiEngine(latency=config['fake_latency'], chunk_delay=config['fake_chunk_delay'])
+
+    from config.settings import Settings
+    from .gemini_engine import GeminiEngine
+    from .resilience import ResilientEngine
+    from .scheduler import RateLimiter, SchedulingEngine
+
+    settings = Settings()
+    rps, tpm = settings.get_rate_limits()
+    # The quota is shared, so each worker gets its part of it
+    workers = config['workers']
+    return SchedulingEngine(ResilientEngine(GeminiEngine(settings.load_api_key(), config['model'],
+                                                         request_timeout=60.0)),
+                            RateLimiter(rps / workers, tpm / workers if tpm else None))
+
+
+def _serve_worker(listener: socket.socket, config: Dict[str, Any]) -> None:
+    memory = open_store(config['store'])
+    engine = build_engine(config)
+    summarizer = None
+    if config['summarize']:
+        from .summarizer import ConversationSummarizer
+        summarizer = ConversationSummarizer(engine, memory)
+
+    server = ThreadingHTTPServer(listener.getsockname()[:2], ServiceHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener  # Every worker accepts from the same listening socket
+    server.daemon_threads = True
+    server.service = AssistantService(memory, engine, summarizer)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory.close()
+
+
+def serve(config: Dict[str, Any]) -> None:
+    """Bind ``host:port`` and run ``workers`` processes on it until interrupted"""
+    if config['store'] == "memory" and config['workers'] > 1:
+        raise ValueError("The \"memory\" store is per process; use a sqlite: store with several workers")
+
+    listener = socket.create_server((config['host'], config['port']), backlog=128)
+    processes = [multiprocessing.Process(target=_serve_worker, args=(listener, config),
+                                         name=f"aurion-service-{i}", daemon=True)
+                 for i in range(config['workers'])]
+    for process in processes:
+        process.start()
+    # Stop the workers too when the service itself is terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    host, port = listener.getsockname()[:2]
+    print(f"Aurion service on http://{host}:{port} with {len(processes)} workers", flush=True)
+    try:
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(timeout=0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        listener.close()
+
+
+class ServiceClient:
+    """
+    Client for the service API.
+
+    Args:
+        base_url: e.g. ``http://127.0.0.1:8765``
+        timeout: Seconds to wait for a reply (streams: between chunks)
+    """
+
+    def __init__(self, base_url: str, timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _open(self, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+              params: Optional[Dict[str, Any]] = None):
+        url = self.base_url + path
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(url, data=data, method=method,
+                                         headers={"Content-Type": "application/json"} if data else {})
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error')
+            except ValueError:
+                message = None
+            raise ServiceError(e.code, message or e.reason)
+
+    def _call(self, method: str, path: str, body: Optional[Dict[str, Any]] = None, **params) -> Any:
+        with self._open(method, path, body, params) as response:
+            return json.loads(response.read())
+
+    def health(self) -> Dict[str, Any]:
+        return self._call("GET", "/health")
+
+    def roles(self) -> Dict[str, str]:
+        return self._call("GET", "/roles")
+
+    def role(self, key: str) -> Dict[str, str]:
+        return self._call("GET", f"/roles/{urllib.parse.quote(key, safe='')}")
+
+    def stats(self) -> Dict[str, Any]:
+        return self._call("GET", "/stats")
+
+    def respond(self, prompt: str, conversation_id: str, role: str = "general",
+                context_window: Optional[int] = None) -> Dict[str, Any]:
+        return self._call("POST", "/respond", {'prompt': prompt, 'conversation_id': conversation_id,
+                                               'role': role, 'context_window': context_window})
+
+    def respond_stream(self, prompt: str, conversation_id: str, role: str = "general",
+                       context_window: Optional[int] = None) -> Generator[Dict[str, Any], None, None]:
+        """Yields ``{"chunk"}`` events, then one ``{"done", "error"}``"""
+        body = {'prompt': prompt, 'conversation_id': conversation_id, 'role': role,
+                'context_window': context_window, 'stream': True}
+        with self._open("POST", "/respond", body) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+    def conversations(self, offset: int = 0, limit: Optional[int] = None,
+                      query: Optional[str] = None) -> Dict[str, Any]:
+        return self._call("GET", "/conversations", offset=offset, limit=limit, query=query)
+
+    def create_conversation(self, conversation_id: Optional[str] = None) -> str:
+        return self._call("POST", "/conversations", {'conversation_id': conversation_id})['conversation_id']
+
+    def messages(self, conversation_id: str, start: int = 0, end: Optional[int] = None) -> Dict[str, Any]:
+        return self._call("GET", f"/conversations/{urllib.parse.quote(conversation_id, safe='')}/messages",
+                          start=start, end=end)
+
+    def clear(self, conversation_id: str) -> None:
+        self._call("POST", f"/conversations/{urllib.parse.quote(conversation_id, safe='')}/clear", {})
+
+    def delete_conversation(self, conversation_id: str) -> None:
+        self._call("DELETE", f"/conversations/{urllib.parse.quote(conversation_id, safe='')}")
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._call("GET", "/search", q=query, limit=limit)['results']
+
+
+class RemoteMemory:
+    """The part of the Memory interface app.py uses, backed by a ServiceClient"""
+
+    def __init__(self, client: ServiceClient):
+        self.client = client
+        self.current_conversation_id: Optional[str] = None
+
+    def create_conversation(self, conversation_id: str) -> None:
+        self.current_conversation_id = self.client.create_conversation(conversation_id)
+
+    def set_current_conversation(self, conversation_id: str) -> bool:
+        self.current_conversation_id = conversation_id
+        return True
+
+    def get_message_count(self, conversation_id: Optional[str] = None) -> int:
+        conv_id = conversation_id or self.current_conversation_id
+        return self.client.messages(conv_id, 0, 0)['total'] if conv_id else 0
+
+    def get_history_range(self, conversation_id: Optional[str] = None, start: int = 0,
+                          end: Optional[int] = None) -> List[Dict]:
+        conv_id = conversation_id or self.current_conversation_id
+        return self.client.messages(conv_id, start, end)['messages'] if conv_id else []
+
+    def get_conversation_ids(self, offset: int = 0, limit: Optional[int] = None,
+                             query: Optional[str] = None) -> List[str]:
+        return self.client.conversations(offset, limit, query)['ids']
+
+    def get_conversation_count(self, query: Optional[str] = None) -> int:
+        return self.client.conversations(0, 0, query)['total']
+
+    def delete_conversation(self, conversation_id: str) -> None:
+        self.client.delete_conversation(conversation_id)
+
+    def clear(self, conversation_id: Optional[str] = None) -> None:
+        conv_id = conversation_id or self.current_conversation_id
+        if conv_id:
+            self.client.clear(conv_id)
+
+    def archive_stats(self) -> Dict[str, Any]:
+        return self.client.stats().get('archive', {})
+
+
+class RemoteAssistant:
+    """The part of the Assistant interface app.py uses, answered by the service"""
+
+    def __init__(self, client: ServiceClient, role: str = "general"):
+        self.client = client
+        self.memory = RemoteMemory(client)
+        self.role = role
+        self.last_error: Optional[str] = None
+
+    def _conversation(self, conversation_id: Optional[str]) -> str:
+        if conversation_id is None and self.memory.current_conversation_id is None:
+            self.memory.create_conversation(str(uuid.uuid4())[:8])
+        return conversation_id or self.memory.current_conversation_id
+
+    def respond(self, user_input: str, conversation_id: Optional[str] = None) -> str:
+        result = self.client.respond(user_input, self._conversation(conversation_id), self.role)
+        self.last_error = result['error']
+        return result['response']
+
+    def respond_stream(self, user_input: str, conversation_id: Optional[str] = None,
+                       buffer: Optional[StreamBuffer] = None) -> Generator[str, None, None]:
+        buffer = buffer if buffer is not None else StreamBuffer()
+        for event in self.client.respond_stream(user_input, self._conversation(conversation_id), self.role):
+            if 'chunk' in event:
+                buffer.append(event['chunk'])
+                yield event['chunk']
+            else:
+                self.last_error = event['error']
+
+    def prepare(self, partial_input: str, conversation_id: Optional[str] = None) -> None:
+        pass  # Prompts are built by the service
+
+    def get_available_roles(self) -> Dict[str, str]:
+        """The service's roles, which may differ from this machine's config/roles"""
+        return self.client.roles()
+
+    def set_role(self, role: str) -> bool:
+        if role in self.client.roles():
+            self.role = role
+            return True
+        return False
+
+    def get_greeting(self) -> str:
+        try:
+            return self.client.role(self.role)['greeting']
+        except ServiceError:
+            # Removed on the service since it was selected
+            return self.client.role(next(iter(self.client.roles())))['greeting']
+
+    def clear_memory(self, conversation_id: Optional[str] = None) -> None:
+        self.memory.clear(conversation_id)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve Aurion over HTTP with several worker processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    parser.add_argument("--store", default="sqlite:data/memory.db",
+                        help="Shared conversation store: sqlite:<path>, or memory (one worker only)")
+    parser.add_argument("--engine", choices=("gemini", "fake"), default="gemini")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Seconds per reply for --engine fake")
+    parser.add_argument("--fake-chunk-delay", type=float, default=0.0)
+    parser.add_argument("--no-summary", action="store_true", help="Do not fold old turns into summaries")
+    args = parser.parse_args(argv)
+
+    config = {
+        'host': args.host, 'port': args.port, 'workers': max(1, args.workers), 'store': args.store,
+        'engine': args.engine, 'model': args.model, 'fake_latency': args.fake_latency,
+        'fake_chunk_delay': args.fake_chunk_delay, 'summarize': not args.no_summary
+    }
+    try:
+        serve(config)
+    except (OSError, ValueError) as e:
+        print(f"Error starting the service: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,537 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from .memory import MESSAGE_OVERHEAD_BYTES, Memory, format_message
+from .storage import JournalStorage, NullStorage
+from .tokens import estimate_tokens
+from .instrumentation import tracer
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    next_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    tokens INTEGER,
+    error INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_conversation_seq
+    ON messages (conversation_id, seq);
+CREATE TABLE IF NOT EXISTS summaries (
+    conversation_id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    covered INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SQLiteMemory(Memory):
+    """
+    Conversation memory stored in SQLite (WAL mode).
+
+    Nothing is loaded up front: history reads are indexed tail queries on
+    (conversation_id, seq), so startup time and RSS do not depend on how
+    much history has been stored.
+    """
+
+    def __init__(self, db_file: str = "data/memory.db"):
+        # Memory.__init__ would load a JSON file; only its in-process state applies
+        self.memory_file = db_file
+        self.archive = None
+        self.storage = NullStorage()  # Every mutation is committed to the database directly
+        self._init_state()
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate_schema()
+        self._load_memory()
+
+    def _migrate_schema(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        if 'tokens' not in columns:
+            self._conn.execute("ALTER TABLE messages ADD COLUMN tokens INTEGER")
+        if 'error' not in columns:
+            self._conn.execute("ALTER TABLE messages ADD COLUMN error INTEGER NOT NULL DEFAULT 0")
+
+    def _load_memory(self) -> None:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'current_conversation_id'"
+        ).fetchone()
+        self._current_id = row[0] if row else None
+
+    def _save_memory(self) -> None:
+        # Every mutation is committed immediately
+        pass
+
+    def _snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            conversations = {conv_id: [dict(msg) for msg in messages]
+                             for conv_id, messages in self.get_all_conversations().items()}
+            summaries = {}
+            for conv_id in conversations:
+                summary = self.get_summary(conv_id)
+                if summary:
+                    summaries[conv_id] = summary
+            return {
+                'conversations': conversations,
+                'current_conversation_id': self.current_conversation_id,
+                'summaries': summaries,
+                'archived': {}
+            }
+
+    def _messages(self, conversation_id: Optional[str]) -> Optional[List[Dict]]:
+        if conversation_id is None or not self._exists(conversation_id):
+            return None
+        return self.get_history(conversation_id)
+
+    @property
+    def current_conversation_id(self) -> Optional[str]:
+        return self._current_id
+
+    @current_conversation_id.setter
+    def current_conversation_id(self, conversation_id: Optional[str]) -> None:
+        self._current_id = conversation_id
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('current_conversation_id', ?)",
+            (conversation_id,)
+        )
+
+    @property
+    def conversations(self) -> Dict[str, List[Dict]]:
+        return self.get_all_conversations()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _exists(self, conversation_id: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone() is not None
+
+    def _ensure_conversation(self, conversation_id: str) -> None:
+        self._conn.execute(
+            "INSERT OR IGNORE INTO conversations (id, created_at) VALUES (?, ?)",
+            (conversation_id, datetime.now().isoformat())
+        )
+
+    def create_conversation(self, conversation_id: str) -> None:
+        with self._lock:
+            self._ensure_conversation(conversation_id)
+            self.current_conversation_id = conversation_id
+            self._used[conversation_id] = time.monotonic()
+
+    def set_current_conversation(self, conversation_id: str) -> bool:
+        with self._lock:
+            if self._exists(conversation_id):
+                self.current_conversation_id = conversation_id
+                return True
+            return False
+
+    def add(self, role: str, message: str, conversation_id: Optional[str] = None, error: bool = False) -> None:
+        with tracer.span("memory.add"), self._lock:
+            conv_id = conversation_id or self.current_conversation_id
+
+            if conv_id is None:
+                conv_id = "default"
+                self.create_conversation(conv_id)
+
+            self._used[conv_id] = time.monotonic()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ensure_conversation(conv_id)
+                seq = self._conn.execute(
+                    "UPDATE conversations SET next_seq = next_seq + 1 WHERE id = ? RETURNING next_seq - 1",
+                    (conv_id,)
+                ).fetchone()[0]
+                entry = {
+                    'role': role,
+                    'message': message,
+                    'timestamp': datetime.now().isoformat(),
+                    'tokens': estimate_tokens(message)
+                }
+                if error:
+                    entry['error'] = True
+                self._conn.execute(
+                    "INSERT INTO messages (conversation_id, seq, role, message, timestamp, tokens, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (conv_id, seq, role, message, entry['timestamp'], entry['tokens'], int(error))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._notify('on_add', conv_id, entry)
+
+    def get_history(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        conv_id = conversation_id or self.current_conversation_id
+
+        if conv_id is None:
+            return []
+
+        with self._lock:
+            self._used[conv_id] = time.monotonic()
+        return self._select_history(conv_id, limit)
+
+    def _select_history(self, conv_id: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        with self._lock:
+            if limit:
+                rows = self._conn.execute(
+                    "SELECT role, message, timestamp, tokens, error FROM messages WHERE conversation_id = ? "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (conv_id, limit)
+                ).fetchall()
+                rows.reverse()
+            else:
+                rows = self._conn.execute(
+                    "SELECT role, message, timestamp, tokens, error FROM messages WHERE conversation_id = ? ORDER BY seq",
+                    (conv_id,)
+                ).fetchall()
+
+        return [self._row_to_message(row) for row in rows]
+
+    def get_formatted_lines(self, conversation_id: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[Tuple[Dict, str]]:
+        # The indexed tail query already costs time proportional to ``limit``
+        return [(msg, format_message(msg)) for msg in self.get_history(conversation_id, limit)]
+
+    def get_formatted_history(self, conversation_id: Optional[str] = None, limit: Optional[int] = None) -> str:
+        return "\n".join(line for _, line in self.get_formatted_lines(conversation_id, limit))
+
+    @staticmethod
+    def _row_to_message(row) -> Dict:
+        role, message, timestamp, tokens, error = row
+        msg = {'role': role, 'message': message, 'timestamp': timestamp}
+        if tokens is not None:
+            msg['tokens'] = tokens
+        if error:
+            msg['error'] = True
+        return msg
+
+    def clear(self, conversation_id: Optional[str] = None) -> None:
+        conv_id = conversation_id or self.current_conversation_id
+
+        if conv_id:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conv_id,))
+                self._conn.execute("DELETE FROM summaries WHERE conversation_id = ?", (conv_id,))
+                self._conn.execute("COMMIT")
+            self._notify('on_clear', conv_id)
+
+    def delete_conversation(self, conversation_id: str) -> None:
+        with self._lock:
+            if not self._exists(conversation_id):
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            self._conn.execute("DELETE FROM summaries WHERE conversation_id = ?", (conversation_id,))
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self._conn.execute("COMMIT")
+            self._used.pop(conversation_id, None)
+
+            if self.current_conversation_id == conversation_id:
+                self.current_conversation_id = None
+        self._notify('on_delete', conversation_id)
+
+    def get_summary(self, conversation_id: Optional[str] = None) -> Optional[Dict]:
+        conv_id = conversation_id or self.current_conversation_id
+        if not conv_id:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, covered FROM summaries WHERE conversation_id = ?", (conv_id,)
+            ).fetchone()
+        return {'text': row[0], 'covered': row[1]} if row else None
+
+    def set_summary(self, conversation_id: str, text: str, covered: int) -> bool:
+        # Compare-and-swap in one statement: other processes share the database,
+        # and a summarizer holding an older summary must not overwrite a newer one
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO summaries (conversation_id, text, covered) "
+                "SELECT ?, ?, ? WHERE ? <= (SELECT COUNT(*) FROM messages WHERE conversation_id = ?) "
+                "ON CONFLICT (conversation_id) DO UPDATE SET text = excluded.text, covered = excluded.covered "
+                "WHERE excluded.covered > summaries.covered",
+                (conversation_id, text, covered, covered, conversation_id)
+            )
+            return cursor.rowcount > 0
+
+    def get_all_conversations(self) -> Dict[str, List[Dict]]:
+        # Materialises everything; only meant for exports and migrations
+        return {conv_id: self.get_history(conv_id) for conv_id in self.get_conversation_ids()}
+
+    def get_conversation_ids(self, offset: int = 0, limit: Optional[int] = None,
+                             query: Optional[str] = None) -> List[str]:
+        sql = "SELECT id FROM conversations"
+        params: list = []
+        if query:
+            sql += " WHERE id LIKE ? ESCAPE '\\'"
+            params.append(_like_pattern(query))
+        sql += " ORDER BY rowid LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row[0] for row in rows]
+
+    def get_conversation_count(self, query: Optional[str] = None) -> int:
+        with self._lock:
+            if query:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM conversations WHERE id LIKE ? ESCAPE '\\'", (_like_pattern(query),)
+                ).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def get_history_range(self, conversation_id: Optional[str] = None, start: int = 0,
+                          end: Optional[int] = None) -> List[Dict[str, str]]:
+        conv_id = conversation_id or self.current_conversation_id
+
+        if conv_id is None:
+            return []
+
+        with self._lock:
+            self._used[conv_id] = time.monotonic()
+            # Surviving seqs are contiguous, so positions map onto an indexed seq range
+            base = self._conn.execute(
+                "SELECT MIN(seq) FROM messages WHERE conversation_id = ?", (conv_id,)
+            ).fetchone()[0]
+            if base is None:
+                return []
+            sql = ("SELECT role, message, timestamp, tokens, error FROM messages "
+                   "WHERE conversation_id = ? AND seq >= ?")
+            params = [conv_id, base + max(0, start)]
+            if end is not None:
+                sql += " AND seq < ?"
+                params.append(base + end)
+            rows = self._conn.execute(sql + " ORDER BY seq", params).fetchall()
+
+        return [self._row_to_message(row) for row in rows]
+
+    def get_message_count(self, conversation_id: Optional[str] = None) -> int:
+        conv_id = conversation_id or self.current_conversation_id
+
+        if not conv_id:
+            return 0
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (conv_id,)
+            ).fetchone()[0]
+
+    def scan_history(self, conversation_id: str) -> List[Dict]:
+        # Background readers (indexes, the sweep) must not make a conversation look in use
+        return self._select_history(conversation_id)
+
+    def archive_idle(self, idle_seconds: float, now: Optional[datetime] = None) -> Dict[str, int]:
+        # Messages already live on disk and are queried on demand; nothing to archive
+        return {'archived': 0, 'raw_bytes': 0, 'archived_bytes': 0}
+
+    def archive_stats(self) -> Dict[str, Any]:
+        return {}
+
+    def is_archived(self, conversation_id: str) -> bool:
+        return False
+
+    def evict(self, conversation_id: str) -> bool:
+        return False  # Nothing is held in memory
+
+    def trim(self, conversation_id: str, keep: int) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT role, message, timestamp, tokens, error FROM messages WHERE conversation_id = ? "
+                    "ORDER BY seq LIMIT MAX(0, (SELECT COUNT(*) FROM messages WHERE conversation_id = ?) - ?)",
+                    (conversation_id, conversation_id, max(0, keep))
+                ).fetchall()
+                if rows:
+                    # Deleting the oldest seqs keeps the survivors contiguous
+                    self._conn.execute(
+                        "DELETE FROM messages WHERE conversation_id = ? AND seq < "
+                        "(SELECT MIN(seq) FROM messages WHERE conversation_id = ?) + ?",
+                        (conversation_id, conversation_id, len(rows))
+                    )
+                    self._conn.execute(
+                        "UPDATE summaries SET covered = MAX(0, covered - ?) WHERE conversation_id = ?",
+                        (len(rows), conversation_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if rows:
+            self._notify('on_trim', conversation_id, [self._row_to_message(row) for row in rows])
+        return len(rows)
+
+    def truncate(self, conversation_id: str, keep: int) -> int:
+        keep = max(0, keep)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                base = self._conn.execute(
+                    "SELECT MIN(seq) FROM messages WHERE conversation_id = ?", (conversation_id,)
+                ).fetchone()[0]
+                dropped = 0
+                if base is not None:
+                    dropped = self._conn.execute(
+                        "DELETE FROM messages WHERE conversation_id = ? AND seq >= ?", (conversation_id, base + keep)
+                    ).rowcount
+                if dropped:
+                    # Reuse the dropped seqs so the survivors and later messages stay contiguous
+                    self._conn.execute("UPDATE conversations SET next_seq = ? WHERE id = ?",
+                                       (base + keep, conversation_id))
+                    self._conn.execute(
+                        "UPDATE summaries SET covered = MIN(covered, ?) WHERE conversation_id = ?",
+                        (keep, conversation_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if dropped:
+            self._notify('on_truncate', conversation_id, keep)
+        return dropped
+
+    def resident_conversations(self) -> List[str]:
+        return []
+
+    def footprint(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.id, COUNT(m.id), COALESCE(SUM(LENGTH(CAST(m.message AS BLOB))), 0), MAX(m.timestamp) "
+                "FROM conversations c LEFT JOIN messages m ON m.conversation_id = c.id GROUP BY c.id"
+            ).fetchall()
+        return {conv_id: {'messages': count, 'bytes': size + count * MESSAGE_OVERHEAD_BYTES, 'resident': False,
+                          'last_activity': datetime.fromisoformat(last) if last else None}
+                for conv_id, count, size, last in rows}
+
+    def import_json(self, json_file: str) -> int:
+        """
+        Import conversations and summaries from a JSON memory file, including
+        records still in its journal log and conversations held in its
+        archive. Returns the number of messages imported; raises ValueError,
+        importing nothing, if any stored message cannot be read.
+        """
+        storage = JournalStorage(json_file)  # Reads a plain memory.json too
+        state = storage.load()
+        source = Memory(json_file, storage=storage)
+        try:
+            conversations = {}
+            incomplete = []
+            for conv_id in source.get_conversation_ids():
+                messages = source.scan_history(conv_id)
+                stored = len(state['conversations'].get(conv_id) or []) + state['archived'].get(conv_id, 0)
+                if len(messages) < stored:
+                    incomplete.append(conv_id)
+                conversations[conv_id] = messages
+            summaries = {conv_id: source.get_summary(conv_id) for conv_id in conversations}
+        finally:
+            source.close()
+        if incomplete:
+            raise ValueError(f"messages of {len(incomplete)} conversations could not be read "
+                             f"(first: {incomplete[0]}); is the archive missing?")
+
+        imported = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for conv_id, messages in conversations.items():
+                    self._ensure_conversation(conv_id)
+                    start = self._conn.execute(
+                        "SELECT next_seq FROM conversations WHERE id = ?", (conv_id,)
+                    ).fetchone()[0]
+                    self._conn.executemany(
+                        "INSERT INTO messages (conversation_id, seq, role, message, timestamp, tokens, error) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(conv_id, start + i, msg['role'], msg['message'],
+                          msg.get('timestamp') or datetime.now().isoformat(),
+                          msg.get('tokens', estimate_tokens(msg['message'])),
+                          int(bool(msg.get('error'))))
+                         for i, msg in enumerate(messages)]
+                    )
+                    self._conn.execute(
+                        "UPDATE conversations SET next_seq = ? WHERE id = ?",
+                        (start + len(messages), conv_id)
+                    )
+                    summary = summaries[conv_id]
+                    if summary is not None and start == 0:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO summaries (conversation_id, text, covered) VALUES (?, ?, ?)",
+                            (conv_id, summary['text'], min(summary['covered'], len(messages)))
+                        )
+                    imported += len(messages)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            if state.get('current_conversation_id'):
+                self.current_conversation_id = state['current_conversation_id']
+
+        return imported
+
+
+def migrate_json_to_sqlite(json_file: str = "data/memory.json", db_file: str = "data/memory.db") -> SQLiteMemory:
+    """
+    One-shot migration: imports ``json_file`` (with its journal log and
+    archive) into the database and renames the JSON file and log to
+    ``*.migrated`` so they are not imported twice. If anything cannot be
+    read, nothing is imported or renamed.
+    """
+    memory = SQLiteMemory(db_file)
+    log_file = f"{json_file}.log"
+    if os.path.exists(json_file) or os.path.exists(log_file):
+        try:
+            count = memory.import_json(json_file)
+        except ValueError as e:
+            print(f"Not migrating {json_file}: {e}")
+            return memory
+        for path in (json_file, log_file):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.migrated")
+        print(f"Migrated {count} messages from {json_file} to {db_file}")
+    return memory
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from config.settings import Settings
+
+    parser = argparse.ArgumentParser(description="Migrate a JSON or journal memory file into SQLite, once")
+    parser.add_argument("--json", default=Settings.get_memory_file(), help="Memory file to import")
+    parser.add_argument("--db", default=Settings.get_memory_db(), help="Database to import into")
+    args = parser.parse_args(argv)
+
+    migrate_json_to_sqlite(args.json, args.db).close()
+    # The source is renamed once imported; still there means it was refused
+    return 1 if os.path.exists(args.json) or os.path.exists(f"{args.json}.log") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
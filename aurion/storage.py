@@ -0,0 +1,407 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+StateProvider = Callable[[], Dict[str, Any]]
+
+
+def empty_state() -> Dict[str, Any]:
+    return {'conversations': {}, 'current_conversation_id': None, 'summaries': {}, 'archived': {}}
+
+
+def apply_record(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """
+    Apply a single journal record to an in-memory state dict
+    """
+    op = record.get('op')
+    conversations = state.setdefault('conversations', {})
+    conv_id = record.get('conversation_id')
+
+    summaries = state.setdefault('summaries', {})
+    archived = state.setdefault('archived', {})
+
+    if op == 'add':
+        conversations.setdefault(conv_id, []).append(record['message'])
+    elif op == 'create':
+        conversations.setdefault(conv_id, [])
+        state['current_conversation_id'] = conv_id
+    elif op == 'current':
+        state['current_conversation_id'] = conv_id
+    elif op == 'clear':
+        if conv_id in conversations:
+            conversations[conv_id] = []
+        summaries.pop(conv_id, None)
+        archived.pop(conv_id, None)
+    elif op == 'delete':
+        conversations.pop(conv_id, None)
+        summaries.pop(conv_id, None)
+        archived.pop(conv_id, None)
+        if state.get('current_conversation_id') == conv_id:
+            state['current_conversation_id'] = None
+    elif op == 'summary':
+        summaries[conv_id] = record['summary']
+    elif op == 'archive':
+        # The first ``count`` messages now live in the archive
+        conversations[conv_id] = []
+        archived[conv_id] = record['count']
+    elif op == 'trim':
+        # Oldest (trim) or newest (truncate) messages dropped; the survivors replace any archived part
+        conversations[conv_id] = record['messages']
+        archived.pop(conv_id, None)
+        if record.get('summary') is not None:
+            summaries[conv_id] = record['summary']
+
+
+class FileLock:
+    """
+    Exclusive lock shared by threads of this process and by other processes
+    (advisory ``flock`` on POSIX, ``msvcrt.locking`` on Windows)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth > 1:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class MemoryStorage:
+    """
+    Base class for Memory persistence backends.
+
+    Writers hand over mutation records together with a callable returning the
+    full state; backends without an incremental format just save that state.
+    """
+
+    def load(self) -> Dict[str, Any]:
+        return empty_state()
+
+    def save(self, state: Dict[str, Any]) -> None:
+        pass
+
+    def append_many(self, records: List[Dict[str, Any]], get_state: StateProvider) -> None:
+        # A whole batch of mutations coalesces into a single full save
+        self.save(get_state())
+
+    def append(self, record: Dict[str, Any], get_state: StateProvider) -> None:
+        self.append_many([record], get_state)
+
+    def close(self) -> None:
+        pass
+
+
+class NullStorage(MemoryStorage):
+    """Persists nothing and never builds the state; for benchmarks and throwaway runs"""
+
+    def append_many(self, records: List[Dict[str, Any]], get_state: StateProvider) -> None:
+        pass
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any], indent: Optional[int] = None,
+                       fsync: bool = False) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data.setdefault('conversations', {})
+    data.setdefault('current_conversation_id', None)
+    data.setdefault('summaries', {})
+    data.setdefault('archived', {})
+    return data
+
+
+class JSONFileStorage(MemoryStorage):
+    """
+    Stores the whole memory state in a single pretty-printed JSON file.
+    Writes are atomic but a full rewrite per save; with several processes the
+    last writer wins, so prefer the journal or SQLite backends there.
+    """
+
+    def __init__(self, memory_file: str = "data/memory.json"):
+        self.memory_file = memory_file
+        self._lock = FileLock(f"{memory_file}.lock")
+
+    def load(self) -> Dict[str, Any]:
+        return _read_json(self.memory_file)
+
+    def save(self, state: Dict[str, Any]) -> None:
+        data = dict(state)
+        data['last_updated'] = datetime.now().isoformat()
+        with self._lock:
+            _write_json_atomic(self.memory_file, data, indent=2)
+
+
+class JournalStorage(MemoryStorage):
+    """
+    Append-only JSONL journal on top of a periodically compacted snapshot.
+
+    Each mutation is written as one line to ``<snapshot>.log`` so the cost of a
+    turn does not depend on the size of the history. Every ``compact_every``
+    records the log is folded into the snapshot (same layout as
+    ``memory.json``) and truncated. Snapshot and log carry a matching epoch
+    so a crash between the two steps never replays a log twice. Appends and
+    compaction hold a file lock, so several processes can share one journal.
+    """
+
+    FSYNC_POLICIES = ("always", "interval", "never")
+
+    def __init__(self, snapshot_file: str = "data/memory.json", log_file: Optional[str] = None,
+                 fsync: str = "interval", fsync_interval: float = 1.0, compact_every: int = 1000):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {self.FSYNC_POLICIES}")
+
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or f"{snapshot_file}.log"
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compact_every = max(1, compact_every)
+
+        self._lock = FileLock(f"{snapshot_file}.lock")
+        self._last_fsync = time.monotonic()
+        self._records_written = 0
+        self._log = None
+
+    def _read_state(self) -> Dict[str, Any]:
+        """Snapshot plus every valid journal record; repairs a torn tail"""
+        state = _read_json(self.snapshot_file)
+        snapshot_epoch = state.pop('journal_epoch', None)
+
+        if not os.path.exists(self.log_file):
+            return state
+
+        good_offset = 0
+        records = []
+        log_epoch = None
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: drop it and everything after it
+                    break
+                good_offset += len(line)
+                if record.get('op') == 'epoch':
+                    log_epoch = record.get('epoch')
+                else:
+                    records.append(record)
+
+        if log_epoch == snapshot_epoch:
+            for record in records:
+                apply_record(state, record)
+        # Otherwise the log was already folded into the snapshot by an
+        # interrupted compaction and must not be replayed
+
+        if good_offset < os.path.getsize(self.log_file):
+            print(f"Recovered memory journal, truncating to {good_offset} bytes")
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(good_offset)
+
+        return state
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._read_state()
+
+    def _open_log(self):
+        if self._log is None:
+            directory = os.path.dirname(self.log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._log = open(self.log_file, 'ab')
+        return self._log
+
+    def _sync(self, force: bool = False) -> None:
+        if self._log is None or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or self.fsync == "always" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._log.fileno())
+            self._last_fsync = now
+
+    def append_many(self, records: List[Dict[str, Any]], get_state: StateProvider) -> None:
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+        with self._lock:
+            log = self._open_log()
+            log.write(payload.encode('utf-8'))
+            log.flush()
+            self._sync()
+
+            self._records_written += len(records)
+            if self._records_written >= self.compact_every:
+                self.compact()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and start a new, empty log"""
+        with self._lock:
+            self._write_snapshot(self._read_state())
+
+    def save(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write_snapshot(state)
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        epoch = uuid.uuid4().hex
+        data = dict(state)
+        data['journal_epoch'] = epoch
+        data['last_updated'] = datetime.now().isoformat()
+        _write_json_atomic(self.snapshot_file, data, fsync=self.fsync != "never")
+
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        with open(self.log_file, 'wb') as f:
+            f.write((json.dumps({'op': 'epoch', 'epoch': epoch}) + "\n").encode('utf-8'))
+        self._records_written = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+                self._sync(force=True)
+                self._log.close()
+                self._log = None
+
+
+class BackgroundWriter:
+    """
+    Single writer thread in front of a storage backend.
+
+    Callers enqueue records and return immediately; the thread drains
+    everything that queued up since its last flush and hands it to the
+    backend as one batch (one append + fsync for the journal, one full
+    rewrite for the JSON file).
+    """
+
+    def __init__(self, storage: MemoryStorage, get_state: StateProvider, max_batch: int = 1000):
+        self.storage = storage
+        self.get_state = get_state
+        self.max_batch = max_batch
+        self.batches_written = 0
+        self.records_written = 0
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="aurion-memory-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        if self._closed:
+            self.storage.append(record, self.get_state)
+            return
+        self._queue.put(record)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                self._queue.task_done()
+                return
+
+            batch = [record]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+
+            try:
+                self.storage.append_many(batch, self.get_state)
+                self.batches_written += 1
+                self.records_written += len(batch)
+            except Exception as e:
+                print(f"Error saving memory: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Block until everything submitted so far has been written"""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self.storage.close()
+
+
+def create_storage(backend: str = "json", memory_file: str = "data/memory.json") -> MemoryStorage:
+    if backend == "json":
+        return JSONFileStorage(memory_file)
+    if backend == "journal":
+        return JournalStorage(memory_file)
+    raise ValueError(f"Unknown memory backend '{backend}'")
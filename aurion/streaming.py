@@ -0,0 +1,70 @@
+import time
+from typing import List, Optional
+
+
+class StreamBuffer:
+    """
+    Collects streamed chunks and decides when a UI should redraw.
+
+    Chunks are only appended to a list; the joined text is built on demand
+    and cached until the next chunk arrives. ``should_flush()`` throttles
+    redraws by time and by the amount of new text, with the byte threshold
+    growing with the response so a long answer triggers O(log n) size-based
+    redraws instead of one per chunk.
+    """
+
+    def __init__(self, min_interval: float = 0.1, min_bytes: int = 512, growth: float = 0.5):
+        self.min_interval = min_interval
+        self.min_bytes = min_bytes
+        self.growth = growth
+        self.chunks: List[str] = []
+        self.size = 0
+        self.flushes = 0
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+
+        self._pending = 0
+        self._last_flush = self.started_at
+        self._text: Optional[str] = ""
+
+    def append(self, chunk: str) -> None:
+        if not chunk:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        self._pending += len(chunk)
+        self._text = None
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds from creation to the first chunk"""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self.chunks)
+            if len(self.chunks) > 1:
+                self.chunks = [self._text]
+        return self._text
+
+    def should_flush(self) -> bool:
+        """True when the UI should redraw now; marks the pending text as flushed"""
+        if not self._pending:
+            return False
+        now = time.perf_counter()
+        first = self.flushes == 0
+        due = now - self._last_flush >= self.min_interval
+        large = self._pending >= max(self.min_bytes, self.size * self.growth)
+        if first or due or large:
+            self._pending = 0
+            self._last_flush = now
+            self.flushes += 1
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return self.size
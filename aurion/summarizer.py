@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from .context_builder import ContextBuilder
+from .memory import Memory
+
+
+class ConversationSummarizer:
+    """
+    Folds turns that leave the context window into a per-conversation
+    running summary.
+
+    The summary is updated incrementally: the turns that dropped out of the
+    context since the last update are sent to the engine, together with the
+    previous summary, as soon as they drop out, so every message is always
+    either summarized or in the context. What is still in the context is
+    decided by a ContextBuilder, so messages dropped for the token budget
+    are summarized too, not just those beyond the message window. Updates
+    run on a single background thread so they never delay a reply. Any
+    object with ``generate(prompt)`` works as the engine, which keeps the
+    summarizer testable with a stub.
+    """
+
+    PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Update the summary with the new messages below. Keep names, facts, decisions, preferences
+and open questions; drop pleasantries. Answer with the updated summary only, in at most {max_words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+    def __init__(self, engine, memory: Memory, keep_recent: int = 10, max_words: int = 200,
+                 background: bool = True):
+        self.engine = engine
+        self.memory = memory
+        self.keep_recent = keep_recent
+        self.max_words = max_words
+        self.background = background
+        self.context_builder = ContextBuilder(memory)
+
+        self._executor = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="aurion-summarizer")
+                          if background else None)
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _format(messages: List[Dict]) -> str:
+        return "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['message']}"
+            for msg in messages if not msg.get('error')
+        )
+
+    def schedule(self, conversation_id: Optional[str] = None, keep_recent: Optional[int] = None,
+                 context_builder: Optional[ContextBuilder] = None) -> None:
+        conv_id = conversation_id or self.memory.current_conversation_id
+        if conv_id is None:
+            return
+        if self._executor is None:
+            self.update(conv_id, keep_recent, context_builder)
+            return
+
+        with self._lock:
+            if conv_id in self._pending:
+                return
+            self._pending.add(conv_id)
+        self._executor.submit(self._run, conv_id, keep_recent, context_builder)
+
+    def _run(self, conversation_id: str, keep_recent: Optional[int],
+             context_builder: Optional[ContextBuilder]) -> None:
+        with self._lock:
+            self._pending.discard(conversation_id)
+        try:
+            self.update(conversation_id, keep_recent, context_builder)
+        except Exception as e:
+            print(f"Error summarizing conversation {conversation_id}: {e}")
+
+    def update(self, conversation_id: str, keep_recent: Optional[int] = None,
+               context_builder: Optional[ContextBuilder] = None) -> bool:
+        """
+        Fold any turns that left the context; returns True if the summary
+        changed. ``keep_recent`` is the message window and
+        ``context_builder`` the builder (with its token budget) that the
+        prompts of this conversation use.
+        """
+        window = self.keep_recent if keep_recent is None else keep_recent
+        summary = self.memory.get_summary(conversation_id) or {'text': '', 'covered': 0}
+        # Count first: messages added meanwhile only make the context reach
+        # further back, so nothing can fall between summary and context
+        count = self.memory.get_message_count(conversation_id)
+        end = count - (context_builder or self.context_builder).covered(conversation_id, window)
+
+        if end <= summary['covered']:
+            return False
+
+        messages = self.memory.get_history_range(conversation_id, summary['covered'], end)
+        prompt = self.PROMPT.format(
+            max_words=self.max_words,
+            summary=summary['text'] or "(none yet)",
+            messages=self._format(messages)
+        )
+        text = self.engine.generate(prompt).strip()
+        return self.memory.set_summary(conversation_id, text, end)
+
+    def wait(self) -> None:
+        """Block until all scheduled updates have finished"""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
@@ -0,0 +1,172 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from .instrumentation import tracer
+from .tokens import estimate_tokens
+
+DEFAULT_ROLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "roles")
+DEFAULT_GREETING = "Hello! I'm Aurion, your personal AI assistant. How may I help you today?"
+
+
+class RoleTemplate(NamedTuple):
+    """
+    One compiled role. ``prefix`` is the static start of every prompt for
+    the role and ``prefix_hash`` its SHA-256, which stays the same until
+    the role's file changes, so caches can key on it instead of the text.
+    """
+    key: str
+    name: str
+    system_prompt: str
+    greeting: str
+    order: int
+    prefix: str
+    prefix_hash: str
+    prefix_tokens: int
+
+
+def compile_template(key: str, data: Dict) -> RoleTemplate:
+    """Validate a role definition and build its prompt prefix"""
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    for field in ("name", "system_prompt"):
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            raise ValueError(f"\"{field}\" must be a non-empty string")
+    prefix = data["system_prompt"] + "\n\n"
+    return RoleTemplate(
+        key=key,
+        name=data["name"],
+        system_prompt=data["system_prompt"],
+        greeting=data.get("greeting") or DEFAULT_GREETING,
+        order=int(data.get("order", 1000)),
+        prefix=prefix,
+        prefix_hash=hashlib.sha256(prefix.encode('utf-8')).hexdigest(),
+        prefix_tokens=estimate_tokens(prefix)
+    )
+
+
+# Used when the roles directory is missing or holds no valid role
+FALLBACK_TEMPLATE = compile_template("general", {
+    "name": "General Assistant",
+    "greeting": DEFAULT_GREETING,
+    "system_prompt": "You are Aurion, an advanced AI personal assistant. "
+                     "You are helpful, intelligent, professional yet friendly."
+})
+
+
+class TemplateRegistry:
+    """
+    Role templates loaded from ``<directory>/<role>.json``, each with a
+    ``name``, ``system_prompt`` and optionally a ``greeting`` and an
+    ``order`` (position in the role list).
+
+    Files are compiled once. Lookups check the directory for added, removed
+    or modified files at most every ``check_interval`` seconds and recompile
+    only what changed; a file that fails to parse keeps its previous version.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ROLES_DIR, check_interval: float = 2.0,
+                 default_role: str = "general"):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.default_role = default_role
+        self.reloads = 0
+        self._templates: Dict[str, RoleTemplate] = {}
+        self._mtimes: Optional[Dict[str, Tuple[int, int]]] = None  # Path -> (mtime, size) at the last load
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        mtimes = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            try:
+                stat = os.stat(path)
+                mtimes[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue  # Removed while scanning
+        return mtimes
+
+    def reload(self) -> bool:
+        """Recompile changed role files now; returns whether anything changed"""
+        with self._lock:
+            self._checked = time.monotonic()
+            mtimes = self._scan()
+            if mtimes == self._mtimes:
+                return False
+
+            templates = {}
+            for path, mtime in mtimes.items():
+                key = os.path.splitext(os.path.basename(path))[0]
+                if self._mtimes and self._mtimes.get(path) == mtime and key in self._templates:
+                    templates[key] = self._templates[key]
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        templates[key] = compile_template(key, json.load(f))
+                except (OSError, ValueError) as e:
+                    print(f"Error loading role template {path}: {e}")
+                    if key in self._templates:
+                        templates[key] = self._templates[key]
+
+            if not templates:
+                print(f"No role templates found in {self.directory}, using the built-in default")
+                templates = {FALLBACK_TEMPLATE.key: FALLBACK_TEMPLATE}
+
+            # Readers holding the old dict keep a consistent view
+            self._templates = dict(sorted(templates.items(), key=lambda item: (item[1].order, item[0])))
+            self._mtimes = mtimes
+            self.reloads += 1
+        tracer.incr("templates.reload")
+        return True
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+
+    def get(self, key: str) -> Optional[RoleTemplate]:
+        self._maybe_reload()
+        return self._templates.get(key)
+
+    def get_or_default(self, key: str) -> RoleTemplate:
+        """The role's template, else the default role's, else the first one"""
+        self._maybe_reload()
+        templates = self._templates
+        return templates.get(key) or templates.get(self.default_role) or next(iter(templates.values()))
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def roles(self) -> Dict[str, str]:
+        """Role key -> display name, in display order"""
+        self._maybe_reload()
+        return {key: template.name for key, template in self._templates.items()}
+
+    def match_prefix(self, prompt: str) -> Optional[RoleTemplate]:
+        """The template whose prefix starts ``prompt``, if any"""
+        for template in self._templates.values():
+            if prompt.startswith(template.prefix):
+                return template
+        return None
+
+
+_default_registry: Optional[TemplateRegistry] = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> TemplateRegistry:
+    """Process-wide registry over ``config/roles``, created on first use"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = TemplateRegistry()
+    return _default_registry
+
+
+def set_default_registry(registry: TemplateRegistry) -> None:
+    global _default_registry
+    _default_registry = registry
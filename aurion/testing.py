@@ -0,0 +1,168 @@
+import asyncio
+import random
+import threading
+import time
+from typing import AsyncIterator, Callable, Generator, List, Optional
+from .errors import RetryableEngineError
+
+
+def _default_reply(prompt: str) -> str:
+    user_input = prompt.rsplit("User: ", 1)[-1]
+    user_input = user_input.rsplit("\n\nAssistant:", 1)[0]
+    return f"Echo: {user_input}"
+
+
+class FakeGeminiEngine:
+    """
+    Deterministic, offline stand-in for GeminiEngine.
+
+    Args:
+        reply: Function mapping the prompt to the reply text (echoes the user input by default)
+        latency: Seconds before the first chunk / the full reply
+        chunk_size: Characters per streamed chunk
+        chunk_delay: Seconds between streamed chunks
+    """
+
+    def __init__(self, reply: Optional[Callable[[str], str]] = None, latency: float = 0.0,
+                 chunk_size: int = 16, chunk_delay: float = 0.0, model_name: str = "fake-model"):
+        self.reply = reply or _default_reply
+        self.latency = latency
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+        self.model_name = model_name
+        self.calls = 0
+        self.prompts: List[str] = []
+
+    def _respond(self, prompt: str) -> str:
+        self.calls += 1
+        self.prompts.append(prompt)
+        return self.reply(prompt)
+
+    def _chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        text = self._respond(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        return text
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        text = self._respond(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        for i, chunk in enumerate(self._chunks(text)):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    def is_api_available(self) -> bool:
+        return True
+
+
+class FakeAsyncGeminiEngine(FakeGeminiEngine):
+    """
+    Asyncio flavour of FakeGeminiEngine with the AsyncGeminiEngine interface
+    """
+
+    def __init__(self, *args, max_concurrency: int = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        async with self._semaphore:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                text = self._respond(prompt)
+                await asyncio.wait_for(asyncio.sleep(self.latency), timeout)
+                return text
+            finally:
+                self.in_flight -= 1
+
+    async def generate_stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        async with self._semaphore:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                text = self._respond(prompt)
+                await asyncio.wait_for(asyncio.sleep(self.latency), timeout)
+                for i, chunk in enumerate(self._chunks(text)):
+                    if i and self.chunk_delay:
+                        await asyncio.sleep(self.chunk_delay)
+                    yield chunk
+            finally:
+                self.in_flight -= 1
+
+    async def is_api_available(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class FaultyEngine:
+    """
+    Fault-injecting wrapper around another engine for resilience tests.
+
+    Args:
+        engine: Engine that produces the successful replies
+        failure_rate: Probability that a call raises ``error``
+        fail_first: Number of initial calls that always fail
+        error: Exception class to raise (retryable by default)
+        slow_rate: Probability that a call is delayed by ``slow_delay`` seconds
+        fail_mid_stream: Raise after the first chunk instead of before it
+        seed: Seed for the fault schedule, so runs are reproducible
+    """
+
+    def __init__(self, engine, failure_rate: float = 0.0, fail_first: int = 0,
+                 error: type = RetryableEngineError, slow_rate: float = 0.0, slow_delay: float = 1.0,
+                 fail_mid_stream: bool = False, seed: Optional[int] = 0):
+        self.engine = engine
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.error = error
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.fail_mid_stream = fail_mid_stream
+        self.model_name = getattr(engine, "model_name", "fake-model")
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _plan(self):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.fail_first or self._random.random() < self.failure_rate
+            slow = self._random.random() < self.slow_rate
+            if fail:
+                self.failures += 1
+        return fail, slow
+
+    def _raise(self) -> None:
+        raise self.error(f"Injected failure on call {self.calls}")
+
+    def generate(self, prompt: str, stream: bool = False) -> str:
+        fail, slow = self._plan()
+        if slow:
+            time.sleep(self.slow_delay)
+        if fail:
+            self._raise()
+        return self.engine.generate(prompt)
+
+    def generate_stream(self, prompt: str) -> Generator[str, None, None]:
+        fail, slow = self._plan()
+        if slow:
+            time.sleep(self.slow_delay)
+        if fail and not self.fail_mid_stream:
+            self._raise()
+        for i, chunk in enumerate(self.engine.generate_stream(prompt)):
+            yield chunk
+            if fail and i == 0:
+                self._raise()
+
+    def is_api_available(self) -> bool:
+        return True
@@ -0,0 +1,26 @@
+from typing import Optional
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Fast local token estimate: about four UTF-8 bytes per token, which tracks
+    Gemini's tokenizer closely enough for budgeting without a network call
+    """
+    if not text:
+        return 0
+    return (len(text.encode('utf-8')) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """Cut ``text`` down to roughly ``max_tokens`` tokens, keeping its head (or tail)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(0, max_tokens * 4 - len(TRUNCATION_MARKER.encode('utf-8')))
+    data = text.encode('utf-8')
+    if keep_tail:
+        tail = data[-budget:].decode('utf-8', errors='ignore') if budget else ""
+        return TRUNCATION_MARKER.strip() + " " + tail
+    return data[:budget].decode('utf-8', errors='ignore') + TRUNCATION_MARKER
@@ -1,15 +1,39 @@
-import speech_recognition as sr
+import importlib
 from typing import Optional
 
+sr = None  # speech_recognition, imported the first time voice input is used
+
+
+def load_speech_recognition():
+    global sr
+    if sr is None:
+        sr = importlib.import_module("speech_recognition")
+    return sr
+
+
 class VoiceHandler:
     """
     Handles voice input using speech recognition
+
+    speech_recognition is imported and the recognizer created on first use.
     """
     
     def __init__(self):
-        self.recognizer = sr.Recognizer()
+        self._recognizer = None
+    
+    @property
+    def recognizer(self):
+        if self._recognizer is None:
+            self._recognizer = load_speech_recognition().Recognizer()
+        return self._recognizer
         
     def recognize_speech_from_mic(self, timeout: int = 5, phrase_time_limit: int = 30) -> Optional[str]:
+        try:
+            load_speech_recognition()
+        except ImportError as e:
+            print(f"Speech recognition is not available: {e}")
+            return None
+        
         try:
             with sr.Microphone() as source:
                 print("I am Listening... Speak now!")
@@ -41,7 +65,7 @@ class VoiceHandler:
     
     def is_microphone_available(self) -> bool:
         try:
-            with sr.Microphone() as source:
+            with load_speech_recognition().Microphone() as source:
                 return True
         except Exception:
             return False
\ No newline at end of file
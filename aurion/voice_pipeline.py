@@ -0,0 +1,247 @@
+import queue
+import threading
+import time
+import wave
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from .voice_handler import load_speech_recognition
+
+
+class AudioChunk(NamedTuple):
+    """A piece of 16-bit PCM speech; ``final`` marks the end of the utterance"""
+    data: bytes
+    sample_rate: int
+    sample_width: int
+    final: bool
+
+    @property
+    def duration(self) -> float:
+        return len(self.data) / (self.sample_rate * self.sample_width)
+
+
+class MicrophoneSource:
+    """
+    Captures one utterance from a microphone in chunks of at most
+    ``chunk_seconds``, so recognition can start while the user is still
+    speaking. A chunk that ends on a pause is the last one.
+
+    Ambient-noise calibration runs once per device and is reused for
+    ``calibration_ttl`` seconds instead of costing 0.5 s on every call.
+    """
+
+    _calibration: Dict[Optional[int], Tuple[float, float]] = {}  # Device -> (energy threshold, measured at)
+    _calibration_lock = threading.Lock()
+
+    def __init__(self, device_index: Optional[int] = None, chunk_seconds: float = 2.0, timeout: float = 5.0,
+                 phrase_time_limit: float = 30.0, calibration_ttl: float = 300.0):
+        self.device_index = device_index
+        self.chunk_seconds = chunk_seconds
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.calibration_ttl = calibration_ttl
+
+    def _calibrate(self, recognizer, source) -> None:
+        with self._calibration_lock:
+            cached = self._calibration.get(self.device_index)
+            if cached is not None and time.monotonic() - cached[1] < self.calibration_ttl:
+                recognizer.energy_threshold = cached[0]
+                return
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            self._calibration[self.device_index] = (recognizer.energy_threshold, time.monotonic())
+
+    def chunks(self, stop: threading.Event) -> Iterator[AudioChunk]:
+        sr = load_speech_recognition()
+        recognizer = sr.Recognizer()
+        with sr.Microphone(device_index=self.device_index) as source:
+            self._calibrate(recognizer, source)
+            started = time.monotonic()
+            timeout = self.timeout
+            while not stop.is_set():
+                try:
+                    audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=self.chunk_seconds)
+                except sr.WaitTimeoutError:
+                    # Silence after the last chunk (or no speech at all)
+                    return
+                # Once speech started, a pause of this length ends the utterance
+                timeout = recognizer.pause_threshold
+                data = audio.get_raw_data()
+                duration = len(data) / (audio.sample_rate * audio.sample_width)
+                final = (duration < self.chunk_seconds - 0.1
+                         or time.monotonic() - started >= self.phrase_time_limit)
+                yield AudioChunk(data, audio.sample_rate, audio.sample_width, final)
+                if final:
+                    return
+
+
+class WaveFileSource:
+    """
+    Offline audio source reading a WAV file in chunks, for tests and
+    benchmarks. With ``realtime`` each chunk is delivered when it would have
+    been spoken, like a live microphone.
+    """
+
+    def __init__(self, path: str, chunk_seconds: float = 1.0, realtime: bool = False):
+        self.path = path
+        self.chunk_seconds = chunk_seconds
+        self.realtime = realtime
+
+    def chunks(self, stop: threading.Event) -> Iterator[AudioChunk]:
+        with wave.open(self.path, "rb") as f:
+            rate, width = f.getframerate(), f.getsampwidth()
+            frames_per_chunk = max(1, int(rate * self.chunk_seconds))
+            remaining = f.getnframes()
+            started = time.monotonic()
+            spoken = 0.0
+            while remaining > 0 and not stop.is_set():
+                frames = min(frames_per_chunk, remaining)
+                data = f.readframes(frames)
+                remaining -= frames
+                spoken += frames / rate
+                if self.realtime:
+                    time.sleep(max(0.0, started + spoken - time.monotonic()))
+                yield AudioChunk(data, rate, width, remaining <= 0)
+
+
+class SpeechRecognitionRecognizer:
+    """Recognizes each chunk with one of speech_recognition's ``recognize_*`` engines"""
+
+    method = "recognize_google"
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self._recognizer = None
+
+    def transcribe(self, chunk: AudioChunk) -> str:
+        sr = load_speech_recognition()
+        if self._recognizer is None:
+            self._recognizer = sr.Recognizer()
+        audio = sr.AudioData(chunk.data, chunk.sample_rate, chunk.sample_width)
+        try:
+            return getattr(self._recognizer, self.method)(audio, language=self.language)
+        except sr.UnknownValueError:
+            return ""
+
+
+class GoogleWebRecognizer(SpeechRecognitionRecognizer):
+    """Google Web Speech API (needs network)"""
+
+    method = "recognize_google"
+
+
+class SphinxRecognizer(SpeechRecognitionRecognizer):
+    """Local, offline CMU Sphinx (needs ``pocketsphinx``)"""
+
+    method = "recognize_sphinx"
+
+
+class ScriptedRecognizer:
+    """
+    Deterministic offline recognizer: returns ``transcripts`` in order, one
+    per chunk, after ``latency`` seconds plus ``seconds_per_audio_second``
+    for each second of audio (to model a real recognizer's cost).
+    """
+
+    def __init__(self, transcripts: List[str], latency: float = 0.0, seconds_per_audio_second: float = 0.0):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.calls = 0
+
+    def transcribe(self, chunk: AudioChunk) -> str:
+        delay = self.latency + self.seconds_per_audio_second * chunk.duration
+        if delay:
+            time.sleep(delay)
+        text = self.transcripts[self.calls] if self.calls < len(self.transcripts) else ""
+        self.calls += 1
+        return text
+
+
+class VoicePipeline:
+    """
+    Captures and recognizes one utterance on background threads.
+
+    The capture thread reads chunks from ``source`` while a recognition
+    thread transcribes the previous ones with ``recognizer`` (anything with
+    ``transcribe(chunk) -> str``), so recognition overlaps speaking. Each
+    partial transcript is passed to ``on_partial``, e.g. ``Assistant.prepare``
+    to build the prompt context before the user has finished.
+
+    Args:
+        source: MicrophoneSource, WaveFileSource or any object with ``chunks(stop_event)``
+        recognizer: GoogleWebRecognizer, SphinxRecognizer, ScriptedRecognizer, ...
+        on_partial: Called with the transcript so far after every chunk but the last
+    """
+
+    def __init__(self, source, recognizer, on_partial: Optional[Callable[[str], None]] = None):
+        self.source = source
+        self.recognizer = recognizer
+        self.on_partial = on_partial
+        self.error: Optional[Exception] = None
+        self.speech_ended_at: Optional[float] = None  # perf_counter() when the last chunk was captured
+        self.transcript_ready_at: Optional[float] = None
+        self._parts: List[str] = []
+        self._chunks: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "VoicePipeline":
+        self._threads = [
+            threading.Thread(target=self._capture, name="aurion-voice-capture", daemon=True),
+            threading.Thread(target=self._recognize, name="aurion-voice-recognize", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _capture(self) -> None:
+        try:
+            for chunk in self.source.chunks(self._stop):
+                if chunk.final:
+                    self.speech_ended_at = time.perf_counter()
+                self._chunks.put(chunk)
+        except Exception as e:
+            print(f"Error capturing audio: {e}")
+            self.error = e
+        finally:
+            if self.speech_ended_at is None:
+                self.speech_ended_at = time.perf_counter()
+            self._chunks.put(None)
+
+    def _recognize(self) -> None:
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None or self._stop.is_set():
+                    return
+                try:
+                    text = self.recognizer.transcribe(chunk)
+                except Exception as e:
+                    print(f"Error recognizing speech: {e}")
+                    self.error = e
+                    text = ""
+                if text:
+                    self._parts.append(text.strip())
+                    if not chunk.final and self.on_partial is not None:
+                        try:
+                            self.on_partial(self.partial())
+                        except Exception as e:
+                            print(f"Error handling partial transcript: {e}")
+        finally:
+            self.transcript_ready_at = time.perf_counter()
+            self._done.set()
+
+    def partial(self) -> str:
+        """Transcript recognized so far"""
+        return " ".join(self._parts)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Final transcript, or None if nothing was recognized (or ``timeout`` passed)"""
+        if not self._done.wait(timeout):
+            return None
+        return self.partial() or None
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def stop(self) -> None:
+        self._stop.set()
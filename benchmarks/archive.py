@@ -0,0 +1,117 @@
+"""
+Benchmark: space savings and rehydration latency of the conversation archive.
+
+Writes ``--conversations`` synthetic conversations to a JSON memory file,
+moves them all to the compressed archive with ``archive_idle`` and compares
+memory.json before and after, then times rehydrating each conversation
+through ``set_current_conversation`` and reloading the memory file.
+
+    python -m benchmarks.archive --conversations 500 --messages 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from aurion.archive import zstandard
+from aurion.memory import Memory
+from aurion.storage import create_storage, empty_state
+from benchmarks.common import environment, latency_summary, write_results
+
+PHRASES = [
+    "Can you explain how Python generators work?",
+    "Sure! A generator is a function that yields values lazily, one at a time.",
+    "What is the difference between a list and a tuple?",
+    "Lists are mutable while tuples are immutable, so tuples can be dictionary keys.",
+    "How should I prepare for a system design interview?",
+    "Start with the requirements, then sketch the data model and the main components.",
+    "Write a function that reverses a linked list.",
+    "Here is an iterative version that walks the list once and flips each pointer.",
+]
+
+
+def write_history(path: str, conversations: int, messages: int, seed: int = 0) -> None:
+    """Write the synthetic history in one save (a JSON-backed add() rewrites the whole file)"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=30)
+    state = empty_state()
+    for c in range(conversations):
+        history = state['conversations'][f"c{c}"] = []
+        for i in range(messages):
+            history.append({
+                'role': "user" if i % 2 == 0 else "assistant",
+                'message': " ".join(rng.choice(PHRASES) for _ in range(rng.randint(1, 4))),
+                'timestamp': (start + timedelta(seconds=c * 3600 + i * rng.randint(5, 90))).isoformat()
+            })
+    state['conversations']['current'] = []
+    state['current_conversation_id'] = "current"
+    create_storage("json", path).save(state)
+
+
+def timed_load(path: str) -> tuple:
+    start = time.perf_counter()
+    # Background writes, as in the app: archiving many conversations coalesces into few saves
+    memory = Memory(path, storage=create_storage("json", path), background_writes=True)
+    return memory, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.json")
+        write_history(path, args.conversations, args.messages)
+        json_bytes = os.path.getsize(path)
+        memory, load_before = timed_load(path)
+
+        start = time.perf_counter()
+        result = memory.archive_idle(7 * 86400)
+        memory.close()
+        archive_seconds = time.perf_counter() - start
+        memory.archive.close()
+
+        memory, load_after = timed_load(path)
+        json_after = os.path.getsize(path)
+        latencies = []
+        for c in range(args.conversations):
+            start = time.perf_counter()
+            memory.set_current_conversation(f"c{c}")
+            latencies.append(time.perf_counter() - start)
+        stats = memory.archive_stats()
+        memory.close()
+        memory.archive.close()
+
+    rehydrate = latency_summary(latencies)
+    codec = "zstd" if zstandard is not None else "zlib"
+    print(f"conversations: {args.conversations} x {args.messages} messages, codec: {codec}")
+    print(f"memory.json: {json_bytes / 1e6:.2f} MB -> {json_after / 1e6:.3f} MB; "
+          f"archive: {stats['archived_bytes'] / 1e6:.2f} MB ({stats['savings']:.1%} smaller than JSON)")
+    print(f"archiving: {archive_seconds:.2f} s; load: {load_before * 1000:.0f} ms -> {load_after * 1000:.0f} ms")
+    print(f"rehydrate: p50 {rehydrate['p50_ms']:.2f} ms, p95 {rehydrate['p95_ms']:.2f} ms, "
+          f"max {rehydrate['max_ms']:.2f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'codec': codec,
+            'conversations': args.conversations,
+            'messages_per_conversation': args.messages,
+            'json_bytes': json_bytes,
+            'json_bytes_after': json_after,
+            'archive': result,
+            'archive_stats': stats,
+            'load_ms': {'before': load_before * 1000, 'after': load_after * 1000},
+            'rehydrate': rehydrate
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
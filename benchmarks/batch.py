@@ -0,0 +1,81 @@
+"""
+Benchmark: batch runner throughput against the one-call-at-a-time baseline.
+
+Answers ``--prompts`` independent prompts with a fake engine of fixed
+latency, first with sequential Assistant.respond() calls on a JSON-backed
+Memory (one memory.json rewrite per message), then with BatchRunner at
+several worker counts (no per-message persistence).
+
+    python -m benchmarks.batch --prompts 2000 --latency 0.05 --workers 1 4 16
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from aurion.assistant import Assistant
+from aurion.batch import BatchRunner
+from aurion.memory import Memory
+from aurion.prompt_controller import PromptController
+from aurion.storage import NullStorage, create_storage
+from aurion.testing import FakeGeminiEngine
+from benchmarks.common import environment, write_results
+
+
+def sequential(prompts: list, latency: float, directory: str) -> float:
+    path = os.path.join(directory, "memory.json")
+    memory = Memory(path, storage=create_storage("json", path))
+    assistant = Assistant(FakeGeminiEngine(latency=latency), PromptController(), memory)
+    start = time.perf_counter()
+    for i, prompt in enumerate(prompts):
+        assistant.respond(prompt, f"seq-{i}")
+    return len(prompts) / (time.perf_counter() - start)
+
+
+def batched(input_path: str, latency: float, workers: int, directory: str) -> dict:
+    engine = FakeGeminiEngine(latency=latency)
+    memory = Memory(storage=NullStorage())
+    runner = BatchRunner(lambda: Assistant(engine, PromptController(), memory), memory,
+                         workers=workers, progress_every=0)
+    return runner.run(input_path, os.path.join(directory, f"results-{workers}.jsonl"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    prompts = [f"Question {i}: explain topic {i % 97} in two sentences" for i in range(args.prompts)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "prompts.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps({'prompt': prompt}) + "\n" for prompt in prompts)
+
+        baseline = sequential(prompts, args.latency, directory)
+        print(f"sequential respond() + memory.json: {baseline:.1f} prompts/s")
+        for workers in args.workers:
+            stats = batched(input_path, args.latency, workers, directory)
+            results[workers] = stats
+            print(f"batch, {workers:>3} workers: {stats['throughput_per_s']:.1f} prompts/s "
+                  f"({stats['throughput_per_s'] / baseline:.1f}x), p50 {stats['latency_p50_ms']:.0f} ms, "
+                  f"p99 {stats['latency_p99_ms']:.0f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'prompts': args.prompts,
+            'latency_s': args.latency,
+            'sequential_per_s': baseline,
+            'batch': results
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark: cold start — package import time and time to first paint.
+
+Imports what app.py imports in fresh interpreters and reports how long it
+takes, how long constructing the engine and voice handler takes, and which
+heavy optional modules (Gemini SDK, speech_recognition, NumPy) were pulled in.
+Then writes a synthetic history of ``--messages`` messages and compares how
+long the first paint is blocked when Memory is loaded before rendering
+versus on a background thread.
+
+Exits with status 1 when a heavy module is imported eagerly or the import
+exceeds ``--max-import-ms``, so it can guard against regressions.
+
+    python -m benchmarks.cold_start --messages 100000 --max-import-ms 500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aurion.memory import Memory
+from aurion.storage import create_storage
+from benchmarks.archive import write_history
+from benchmarks.common import environment, write_results
+
+HEAVY_MODULES = ("google.generativeai", "speech_recognition", "numpy")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from config.settings import Settings
+from aurion import GeminiEngine, PromptController, Memory, Assistant, VoiceHandler
+from aurion.storage import create_storage
+from aurion.sqlite_memory import migrate_json_to_sqlite
+from aurion.response_cache import CachedEngine, ResponseCache
+from aurion.summarizer import ConversationSummarizer
+from aurion.resilience import ResilientEngine
+from aurion.scheduler import RateLimiter, SchedulingEngine
+from aurion.router import ModelRouter, ModelTier
+from aurion.search import SearchIndex
+from aurion.instrumentation import tracer
+imported = time.perf_counter()
+GeminiEngine("unused-key")
+VoiceHandler()
+constructed = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'heavy': [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe_imports(runs: int) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'import_ms': statistics.median(sample['import_ms'] for sample in samples),
+        'construct_ms': statistics.median(sample['construct_ms'] for sample in samples),
+        'heavy': samples[-1]['heavy']
+    }
+
+
+def first_paint(path: str) -> dict:
+    start = time.perf_counter()
+    Memory(path, storage=create_storage("json", path))
+    eager = time.perf_counter() - start
+
+    start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(Memory, path, create_storage("json", path))
+    blocked = time.perf_counter() - start
+    future.result()
+    ready = time.perf_counter() - start
+    executor.shutdown()
+    return {'eager_ms': eager * 1000, 'background_blocked_ms': blocked * 1000, 'background_ready_ms': ready * 1000}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import is slower than this")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    imports = probe_imports(args.runs)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.json")
+        write_history(path, max(1, args.messages // 200), 200)
+        paint = first_paint(path)
+
+    print(f"import: {imports['import_ms']:.0f} ms (median of {args.runs}), "
+          f"engine + voice handler construction: {imports['construct_ms']:.2f} ms")
+    print(f"heavy modules imported eagerly: {', '.join(imports['heavy']) or 'none'}")
+    print(f"first paint blocked by memory load ({args.messages} messages): "
+          f"eager {paint['eager_ms']:.0f} ms, background {paint['background_blocked_ms']:.2f} ms "
+          f"(ready after {paint['background_ready_ms']:.0f} ms)")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'messages': args.messages,
+            'imports': imports,
+            'first_paint': paint
+        })
+
+    failed = bool(imports['heavy'])
+    if args.max_import_ms is not None and imports['import_ms'] > args.max_import_ms:
+        print(f"import exceeds {args.max_import_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
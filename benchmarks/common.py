@@ -0,0 +1,87 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import json
+import os
+import platform
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = (len(ordered) - 1) * pct / 100.0
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    ms = [value * 1000 for value in latencies]
+    return {
+        'count': len(ms),
+        'mean_ms': sum(ms) / len(ms) if ms else 0.0,
+        'p50_ms': percentile(ms, 50),
+        'p90_ms': percentile(ms, 90),
+        'p95_ms': percentile(ms, 95),
+        'p99_ms': percentile(ms, 99),
+        'max_ms': max(ms) if ms else 0.0
+    }
+
+
+def histogram(latencies: Iterable[float], bounds_ms: Iterable[float] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)) -> Dict[str, int]:
+    bounds = list(bounds_ms)
+    counts = {f"<={bound}ms": 0 for bound in bounds}
+    counts[f">{bounds[-1]}ms"] = 0
+    for value in latencies:
+        ms = value * 1000
+        for bound in bounds:
+            if ms <= bound:
+                counts[f"<={bound}ms"] += 1
+                break
+        else:
+            counts[f">{bounds[-1]}ms"] += 1
+    return counts
+
+
+def bytes_written() -> Optional[int]:
+    """Bytes this process has written through write() calls so far (Linux only)"""
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def write_results(path: str, results: Dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
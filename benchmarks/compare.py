@@ -0,0 +1,44 @@
+"""
+Compare two benchmark result files written with --output.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+
+def _flatten(prefix: str, value) -> Iterator[Tuple[str, float]]:
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            yield from _flatten(f"{prefix}.{key}" if prefix else key, inner)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+
+def load_metrics(path: str) -> Dict[str, float]:
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    return dict(_flatten("", results.get('scenarios', {})))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline = load_metrics(args.baseline)
+    candidate = load_metrics(args.candidate)
+
+    print(f"{'metric':<50} {'baseline':>14} {'candidate':>14} {'change':>9}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        change = f"{(after - before) / before * 100:+8.1f}%" if before else "       -"
+        print(f"{key:<50} {before:>14.3f} {after:>14.3f} {change}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Stress check for concurrent Memory.add() calls.
+
+Hammers one shared Memory from many threads (and, for the journal backend,
+from several processes), then reloads the data from disk and verifies that
+no message was lost or reordered within its conversation.
+
+    python -m benchmarks.memory_stress --backend journal --threads 16 --messages 500
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from aurion.memory import Memory
+from aurion.storage import create_storage
+
+
+def _hammer(memory: Memory, worker: int, messages: int, conversations: int) -> None:
+    for i in range(messages):
+        conv_id = f"conv-{i % conversations}"
+        memory.add("user", f"{worker}:{i}", conv_id)
+
+
+def run_threads(backend: str, path: str, threads: int, messages: int, conversations: int) -> float:
+    memory = Memory(storage=create_storage(backend, path), background_writes=True)
+    workers = [
+        threading.Thread(target=_hammer, args=(memory, worker, messages, conversations))
+        for worker in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    memory.close()
+    return time.perf_counter() - start
+
+
+def _process_main(backend: str, path: str, worker: int, threads: int, messages: int, conversations: int) -> None:
+    memory = Memory(storage=create_storage(backend, path), background_writes=True)
+    workers = [
+        threading.Thread(target=_hammer, args=(memory, worker * threads + t, messages, conversations))
+        for t in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    memory.close()
+
+
+def run_processes(backend: str, path: str, processes: int, threads: int, messages: int, conversations: int) -> float:
+    procs = [
+        multiprocessing.Process(target=_process_main, args=(backend, path, p, threads, messages, conversations))
+        for p in range(processes)
+    ]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    return time.perf_counter() - start
+
+
+def verify(backend: str, path: str, writers: int, messages: int, conversations: int) -> bool:
+    memory = Memory(storage=create_storage(backend, path))
+    expected = writers * messages
+    found = sum(memory.get_message_count(conv_id) for conv_id in memory.get_conversation_ids())
+
+    ordered = True
+    for conv_id in memory.get_conversation_ids():
+        last_seen = {}
+        for msg in memory.get_history(conv_id):
+            worker, i = (int(part) for part in msg['message'].split(":"))
+            if i <= last_seen.get(worker, -1):
+                ordered = False
+            last_seen[worker] = i
+
+    print(f"  expected {expected} messages, found {found}, per-writer order {'ok' if ordered else 'BROKEN'}")
+    return found == expected and ordered
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["json", "journal"], default="journal")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="also run this many writer processes (journal backend only)")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--conversations", type=int, default=8)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "threads.json")
+        elapsed = run_threads(args.backend, path, args.threads, args.messages, args.conversations)
+        print(f"{args.threads} threads x {args.messages} adds ({args.backend}): {elapsed:.2f}s")
+        ok &= verify(args.backend, path, args.threads, args.messages, args.conversations)
+
+        if args.processes and args.backend == "journal":
+            path = os.path.join(tmp, "processes.json")
+            elapsed = run_processes(args.backend, path, args.processes, args.threads,
+                                    args.messages, args.conversations)
+            print(f"{args.processes} processes x {args.threads} threads x {args.messages} adds: {elapsed:.2f}s")
+            ok &= verify(args.backend, path, args.processes * args.threads, args.messages, args.conversations)
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
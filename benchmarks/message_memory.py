@@ -0,0 +1,112 @@
+"""
+Benchmark: memory footprint of stored messages.
+
+Holds ``--size`` synthetic messages as the plain dicts Memory used to keep
+(ISO timestamp string, token count) and as Message records added through
+Memory, and reports the bytes allocated per message for each (tracemalloc),
+plus the cost of reading fields back and converting to dicts.
+
+    python -m benchmarks.message_memory --size 300000
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from aurion.memory import Memory
+from aurion.storage import NullStorage
+from aurion.tokens import estimate_tokens
+from benchmarks.common import environment, write_results
+
+
+def make_texts(size: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    words = ["python", "list", "error", "function", "thanks", "explain", "how", "the", "a", "why"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(3, 30))) for _ in range(size)]
+
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build()
+    seconds = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return kept, allocated, seconds
+
+
+def build_dicts(texts: list, conversations: int) -> dict:
+    store = {f"c{i}": [] for i in range(conversations)}
+    for i, text in enumerate(texts):
+        store[f"c{i % conversations}"].append({
+            'role': "user" if i % 2 == 0 else "assistant",
+            'message': text,
+            'timestamp': datetime.now().isoformat(),
+            'tokens': estimate_tokens(text)
+        })
+    return store
+
+
+def build_memory(texts: list, conversations: int) -> Memory:
+    memory = Memory(storage=NullStorage())
+    for i, text in enumerate(texts):
+        memory.add("user" if i % 2 == 0 else "assistant", text, f"c{i % conversations}")
+    return memory
+
+
+def read_all(conversations: dict) -> float:
+    start = time.perf_counter()
+    for messages in conversations.values():
+        for msg in messages:
+            msg['role'], msg['message'], msg.get('tokens'), msg.get('error')
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=300000)
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = make_texts(args.size)
+    text_bytes = sum(sys.getsizeof(text) for text in texts)  # Shared by both layouts, excluded below
+
+    dicts, dict_bytes, dict_build = measure(lambda: build_dicts(texts, args.conversations))
+    dict_read = read_all(dicts)
+    del dicts
+
+    memory, message_bytes, message_build = measure(lambda: build_memory(texts, args.conversations))
+    message_read = read_all(memory.conversations)
+    start = time.perf_counter()
+    memory._snapshot()
+    snapshot_seconds = time.perf_counter() - start
+
+    per_dict = dict_bytes / args.size
+    per_message = message_bytes / args.size
+    print(f"messages: {args.size} (texts: {text_bytes / 1e6:.1f} MB, not counted)")
+    print(f"dict:    {dict_bytes / 1e6:.1f} MB ({per_dict:.0f} B/message), "
+          f"build {dict_build:.2f} s, read {dict_read * 1000:.0f} ms")
+    print(f"Message: {message_bytes / 1e6:.1f} MB ({per_message:.0f} B/message), "
+          f"Memory.add {message_build:.2f} s, read {message_read * 1000:.0f} ms")
+    print(f"reduction: {1 - message_bytes / dict_bytes:.0%}; JSON snapshot (to_dict): {snapshot_seconds * 1000:.0f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'messages': args.size,
+            'dict_bytes': dict_bytes,
+            'message_bytes': message_bytes,
+            'dict_read_s': dict_read,
+            'message_read_s': message_read,
+            'snapshot_s': snapshot_seconds
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Microbenchmark: prompt assembly cost against history size.
+
+Times the context and prompt assembly of a real turn (ContextBuilder.build
+then PromptController.build_prompt) against the previous behaviour, which
+re-rendered every "User:/Assistant:" line of the window and re-concatenated
+the system prompt on every turn, for histories of increasing length.
+ContextBuilder reads the lines Memory pre-renders per conversation.
+
+    python -m benchmarks.prompt_assembly --sizes 100 1000 10000 --window 10
+"""
+import argparse
+import sys
+import time
+
+from aurion.context_builder import ContextBuilder
+from aurion.memory import Memory
+from aurion.prompt_controller import PromptController
+from aurion.storage import NullStorage
+from aurion.tokens import truncate_to_tokens
+
+
+def build_memory(size: int) -> Memory:
+    memory = Memory(storage=NullStorage())
+    for i in range(size):
+        memory.add("user" if i % 2 == 0 else "assistant", f"message number {i} " * 8, "bench")
+    return memory
+
+
+def naive_context(builder: ContextBuilder, conversation_id: str, limit: int) -> str:
+    """ContextBuilder.build as it was, rendering each line on every call"""
+    lines = []
+    used = 0
+    for msg in reversed(builder.memory.get_history(conversation_id, limit)):
+        if msg.get('error'):
+            continue
+        text = msg['message']
+        tokens = builder.memory.get_message_tokens(msg)
+        if tokens > builder.max_message_tokens:
+            text = truncate_to_tokens(text, builder.max_message_tokens)
+            tokens = builder.max_message_tokens
+        if used + tokens + 2 > builder.max_tokens:
+            break
+        role = "User" if msg['role'] == 'user' else "Assistant"
+        lines.append(f"{role}: {text}")
+        used += tokens + 2
+    lines.reverse()
+    return "\n".join(lines)
+
+
+def naive_prompt(controller: PromptController, user_input: str, context: str) -> str:
+    return "".join([controller.get_system_prompt(), "\n\n", "Previous conversation context:",
+                    context, "\n\n", f"User: {user_input}", "\n\nAssistant:"])
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    controller = PromptController("coder")
+    print(f"{'messages':>10} {'naive (us)':>12} {'cached (us)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        builder = ContextBuilder(build_memory(size))
+
+        def naive():
+            return naive_prompt(controller, "next question",
+                                naive_context(builder, "bench", args.window))
+
+        def cached():
+            return controller.build_prompt("next question", builder.build("bench", args.window))
+
+        assert naive() == cached()
+        naive_us = measure(naive, args.repeat)
+        cached_us = measure(cached, args.repeat)
+        print(f"{size:>10} {naive_us:>12.2f} {cached_us:>12.2f} {naive_us / cached_us:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Benchmark: retention sweeps against turn latency and memory footprint.
+
+Loads ``--conversations`` synthetic conversations of ``--messages`` messages
+from a journal, then runs turns (add, read the context window, add the
+reply, pause ``--pause-ms`` for the user) in the current conversation:
+without a sweeper, during a first sweep that trims and evicts most of the
+history, and for ``--turns`` more turns while a RetentionSweeper sweeps every
+``--interval`` seconds. Meanwhile a second thread keeps opening random old
+conversations, so each periodic sweep has conversations to evict once they
+have been idle ``--active-seconds``. Reports
+turn latency in each phase, the first sweep's duration and the footprint
+before and after.
+
+    python -m benchmarks.retention --conversations 1000 --messages 100 --turns 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from aurion.memory import Memory
+from aurion.retention import RetentionPolicy, RetentionSweeper
+from aurion.storage import create_storage
+from benchmarks.archive import write_history
+from benchmarks.common import environment, latency_summary, write_results
+
+
+def run_turns(memory: Memory, turns: int, pause: float, until=lambda: True) -> list:
+    """At least ``turns`` turns, and more until ``until()`` is true"""
+    latencies = []
+    i = 0
+    while i < turns or not until():
+        i += 1
+        start = time.perf_counter()
+        memory.add("user", f"Question {i}: how do hash maps resize?", "current")
+        memory.get_history("current", limit=20)
+        memory.add("assistant", "They allocate a larger table and rehash every key.", "current")
+        latencies.append(time.perf_counter() - start)
+        time.sleep(pause)
+    return latencies
+
+
+def open_conversations(memory: Memory, conversations: int, stop: threading.Event) -> None:
+    """Another session reading old conversations, which rehydrates them"""
+    rng = random.Random(1)
+    while not stop.is_set():
+        memory.get_history(f"c{rng.randrange(conversations)}", limit=20)
+        time.sleep(0.001)
+
+
+def footprint_summary(memory: Memory) -> dict:
+    footprint = memory.footprint().values()
+    return {
+        'conversations': len(footprint),
+        'resident_conversations': sum(1 for info in footprint if info['resident']),
+        'messages': sum(info['messages'] for info in footprint),
+        'resident_kib': sum(info['bytes'] for info in footprint if info['resident']) / 1024
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--pause-ms", type=float, default=1.0, help="Pause between turns")
+    parser.add_argument("--max-messages", type=int, default=50, help="Messages kept per conversation")
+    parser.add_argument("--max-resident", type=int, default=50, help="Conversations kept in memory")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between sweeps")
+    parser.add_argument("--active-seconds", type=float, default=0.05,
+                        help="Conversations used this recently are not evicted")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "memory.json")
+        write_history(path, args.conversations, args.messages)
+        memory = Memory(path, storage=create_storage("journal", path), background_writes=True)
+        before = footprint_summary(memory)
+
+        pause = args.pause_ms / 1000
+        baseline = latency_summary(run_turns(memory, args.turns, pause))
+
+        policy = RetentionPolicy(max_messages_per_conversation=args.max_messages,
+                                 max_resident_conversations=args.max_resident)
+        sweeper = RetentionSweeper(memory, policy, args.interval, args.active_seconds)
+        first = {}
+        stop = threading.Event()
+        reader = threading.Thread(target=open_conversations, args=(memory, args.conversations, stop), daemon=True)
+        reader.start()
+        sweep = threading.Thread(target=lambda: first.update(sweeper.sweep()))
+        sweep.start()
+        during_first = latency_summary(run_turns(memory, 1, pause, lambda: not sweep.is_alive()))
+        first_ms = sweeper.last_sweep_ms
+
+        sweeper.start()
+        periodic = latency_summary(run_turns(memory, args.turns, pause))
+        stop.set()
+        reader.join()
+        sweeper.stop()
+        stats = sweeper.stats()
+        after = footprint_summary(memory)
+        memory.close()
+
+    print(f"footprint: {before['resident_conversations']} conversations, {before['messages']} messages, "
+          f"{before['resident_kib']:.0f} KiB in RAM -> {after['resident_conversations']} conversations, "
+          f"{after['messages']} messages, {after['resident_kib']:.0f} KiB in RAM")
+    print(f"first sweep: {first_ms:.0f} ms ({first['trimmed_messages']} messages trimmed, "
+          f"{first['evicted']} evicted); {stats['sweeps']} sweeps, {stats['evicted']} evictions in total")
+    for name, summary in (("no sweeper", baseline), ("first sweep", during_first), ("periodic", periodic)):
+        print(f"{name:>11}: {summary['count']} turns, p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, "
+              f"max {summary['max_ms']:.1f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'conversations': args.conversations,
+            'messages': args.messages,
+            'footprint_before': before,
+            'footprint_after': after,
+            'first_sweep_ms': first_ms,
+            'sweeper': stats,
+            'turns': {'baseline': baseline, 'first_sweep': during_first, 'periodic': periodic}
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
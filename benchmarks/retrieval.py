@@ -0,0 +1,91 @@
+"""
+Benchmark: semantic recall over a large embedding index.
+
+Appends ``--size`` rows to a fresh VectorIndex and measures top-k search
+latency, plus the HashingEmbedder's throughput on chat-sized messages.
+Bulk rows are random unit vectors (embedding hundreds of thousands of
+messages would only measure the embedder); the queries are real embeddings.
+
+    python -m benchmarks.retrieval --size 300000 --queries 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from aurion.retrieval import HashingEmbedder, VectorIndex, np
+from benchmarks.common import environment, latency_summary, write_results
+
+TEXTS = [
+    "How do I reverse a linked list in Python without recursion?",
+    "Can you explain the difference between processes and threads?",
+    "I have an interview for a backend role next week, how should I prepare?",
+    "What are good habits for learning calculus on my own?",
+    "My favourite programming language is Rust because of the borrow checker",
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=300000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if np is None:
+        print("NumPy is required: pip install numpy")
+        return 1
+
+    embedder = HashingEmbedder(args.dim)
+    texts = [TEXTS[i % len(TEXTS)] + f" (variant {i})" for i in range(2000)]
+    start = time.perf_counter()
+    embedder.embed(texts)
+    embed_rate = len(texts) / (time.perf_counter() - start)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(os.path.join(directory, "bench"), args.dim)
+        start = time.perf_counter()
+        for offset in range(0, args.size, args.batch):
+            count = min(args.batch, args.size - offset)
+            vectors = rng.standard_normal((count, args.dim), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            index.append(vectors, [{'conversation_id': f"c{(offset + i) % 500}", 'role': 'user', 'message': ""}
+                                   for i in range(count)])
+        append_seconds = time.perf_counter() - start
+
+        queries = embedder.embed([TEXTS[i % len(TEXTS)] for i in range(args.queries)])
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, args.k)
+            latencies.append(time.perf_counter() - start)
+        index_bytes = len(index) * args.dim * 4  # The file itself is pre-grown (sparse) by doubling
+        index.close()
+
+    search = latency_summary(latencies)
+    print(f"rows: {args.size}, dim: {args.dim}, vectors: {index_bytes / 1e6:.1f} MB")
+    print(f"append: {args.size / append_seconds:,.0f} rows/s")
+    print(f"embed (hashing): {embed_rate:,.0f} messages/s")
+    print(f"search top-{args.k}: p50 {search['p50_ms']:.2f} ms, p95 {search['p95_ms']:.2f} ms, "
+          f"max {search['max_ms']:.2f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'rows': args.size,
+            'dim': args.dim,
+            'vector_bytes': index_bytes,
+            'append_rows_per_s': args.size / append_seconds,
+            'embed_messages_per_s': embed_rate,
+            'search': search
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark: full-text search latency against history size.
+
+Fills an in-memory Memory with synthetic messages drawn from a Zipf-like
+vocabulary, builds a SearchIndex over it and times rare-term, common-term,
+multi-term and phrase queries.
+
+    python -m benchmarks.search --size 1000000 --repeat 50
+"""
+import argparse
+import random
+import sys
+import time
+from itertools import accumulate
+
+from aurion.memory import Memory
+from aurion.search import SearchIndex
+from aurion.storage import NullStorage
+from benchmarks.common import environment, latency_summary, write_results
+
+QUERIES = {
+    'rare term': 'w4000',
+    'common term': 'w3',
+    'two terms': 'w10 w250',
+    'phrase': '"w1 w2"',
+}
+
+
+def build_memory(size: int, conversations: int, seed: int = 0) -> Memory:
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    memory = Memory(storage=NullStorage())
+    for i in range(size):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(5, 40))
+        memory.add("user" if i % 2 == 0 else "assistant", " ".join(words), f"c{i % conversations}")
+    return memory
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    memory = build_memory(args.size, args.conversations)
+    fill_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SearchIndex(memory)
+    build_seconds = time.perf_counter() - start
+    print(f"messages: {args.size}, fill: {fill_seconds:.1f} s, index build: {build_seconds:.1f} s")
+
+    results = {}
+    for name, query in QUERIES.items():
+        latencies = []
+        hits = 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = len(index.search(query))
+            latencies.append(time.perf_counter() - start)
+        summary = latency_summary(latencies)
+        results[name] = dict(summary, query=query, hits=hits)
+        print(f"{name:>12} {query!r:>14}: p50 {summary['p50_ms']:.2f} ms, "
+              f"p95 {summary['p95_ms']:.2f} ms ({hits} hits)")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'messages': args.size,
+            'index_build_s': build_seconds,
+            'queries': results
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Load test: service throughput against the number of worker processes.
+
+Starts ``python -m aurion.service`` with a fake engine and a fresh SQLite
+store for each worker count, then sends ``--requests`` prompts from
+``--concurrency`` concurrent clients (spread over several client processes,
+so the load generator is not the bottleneck). Every client talks in its own
+conversation, so each request reads history and writes two messages to the
+shared store. Workers only add throughput while there are idle CPU cores
+(the load generator needs some too).
+
+    python -m benchmarks.service --workers 1 2 4 --requests 4000 --concurrency 64
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from aurion.service import ServiceClient, ServiceError
+from benchmarks.common import environment, latency_summary, write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_service(workers: int, port: int, store: str, latency: float) -> subprocess.Popen:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    process = subprocess.Popen([sys.executable, "-m", "aurion.service", "--workers", str(workers),
+                                "--port", str(port), "--store", store, "--engine", "fake",
+                                "--fake-latency", str(latency), "--no-summary"],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    client = ServiceClient(f"http://127.0.0.1:{port}", timeout=1)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            client.health()
+            return process
+        except (OSError, ServiceError):
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The service did not start")
+
+
+def run_clients(url: str, client_id: int, threads: int, requests: int) -> list:
+    """One load-generator process: ``threads`` clients sending ``requests`` prompts in total"""
+    client = ServiceClient(url)
+    latencies = []
+    lock = threading.Lock()
+
+    def work(thread: int, count: int) -> None:
+        conversation_id = client.create_conversation(f"load-{client_id}-{thread}")
+        for i in range(count):
+            start = time.perf_counter()
+            client.respond(f"Question {i}: explain topic {i % 97} briefly", conversation_id)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    per_thread = [requests // threads + (1 if i < requests % threads else 0) for i in range(threads)]
+    workers = [threading.Thread(target=work, args=(i, count)) for i, count in enumerate(per_thread)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+def load(url: str, requests: int, concurrency: int, client_processes: int) -> dict:
+    threads = max(1, concurrency // client_processes)
+    with ProcessPoolExecutor(client_processes) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(run_clients, url, i, threads, requests // client_processes)
+                   for i in range(client_processes)]
+        latencies = [latency for future in futures for latency in future.result()]
+        elapsed = time.perf_counter() - start
+    return dict(latency_summary(latencies), throughput_per_s=len(latencies) / elapsed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per fake-engine reply")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} concurrent clients, {args.requests} requests per run")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in args.workers:
+            store = "sqlite:" + os.path.join(directory, f"memory-{workers}.db")
+            service = start_service(workers, args.port, store, args.latency)
+            try:
+                stats = load(f"http://127.0.0.1:{args.port}", args.requests, args.concurrency,
+                             args.client_processes)
+            finally:
+                service.terminate()
+                service.wait()
+            results[workers] = stats
+            base = results[args.workers[0]]['throughput_per_s'] / args.workers[0]
+            print(f"{workers:>3} workers: {stats['throughput_per_s']:.0f} requests/s "
+                  f"({stats['throughput_per_s'] / (base * workers):.0%} of linear), "
+                  f"p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'latency_s': args.latency,
+            'results': results
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
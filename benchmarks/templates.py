@@ -0,0 +1,61 @@
+"""
+Microbenchmark: role template lookups and prefix-keyed response caching.
+
+Measures the per-call cost of reading a compiled role template (including
+the throttled hot-reload check), the cost of one full check of the roles
+directory, and the response cache key computed over the whole prompt versus
+the role prefix's hash plus the rest of the prompt.
+
+    python -m benchmarks.templates --repeat 20000
+"""
+import argparse
+import sys
+import time
+
+from aurion.prompt_controller import PromptController
+from aurion.response_cache import make_cache_key
+from aurion.templates import TemplateRegistry
+from benchmarks.common import environment, write_results
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    registry = TemplateRegistry()
+    controller = PromptController("coder", registry)
+    prompt = controller.build_prompt("How do I reverse a linked list?", "User: hi\nAssistant: Hello!")
+    template = registry.match_prefix(prompt)
+
+    results = {
+        'prefix_lookup_us': measure(controller.get_prompt_prefix, args.repeat),
+        'reload_check_us': measure(lambda: registry.reload(), max(1, args.repeat // 10)),
+        'cache_key_full_us': measure(lambda: make_cache_key("gemini-2.5-flash", prompt), args.repeat),
+        'cache_key_prefix_us': measure(
+            lambda: make_cache_key("gemini-2.5-flash", registry.match_prefix(prompt).prefix_hash,
+                                   prompt[len(template.prefix):]), args.repeat)
+    }
+
+    print(f"prefix lookup:   {results['prefix_lookup_us']:.2f} us")
+    print(f"reload check ({len(registry.roles())} roles): {results['reload_check_us']:.1f} us, "
+          f"at most once per {registry.check_interval:.0f} s")
+    print(f"cache key:       full prompt {results['cache_key_full_us']:.2f} us, "
+          f"prefix hash + rest {results['cache_key_prefix_us']:.2f} us "
+          f"(prefix: {template.prefix_tokens} tokens)")
+
+    if args.output:
+        write_results(args.output, {'environment': environment(), 'results_us': results})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Benchmark the Assistant turn pipeline against a deterministic fake engine.
+
+Scenarios:
+    respond            blocking turns on one conversation with pre-filled history
+    respond_stream     streaming turns; also reports time-to-first-chunk
+    many_conversations turns spread round-robin over many conversations
+    memory_load        cold load of a large memory file
+
+    python -m benchmarks.turn_pipeline --backend journal --history 5000 --output bench/results.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict
+
+from aurion.assistant import Assistant
+from aurion.memory import Memory
+from aurion.prompt_controller import PromptController
+from aurion.sqlite_memory import SQLiteMemory
+from aurion.storage import create_storage
+from aurion.testing import FakeGeminiEngine
+from benchmarks.common import bytes_written, directory_size, environment, latency_summary, write_results
+
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def open_memory(backend: str, directory: str) -> Memory:
+    if backend == "sqlite":
+        return SQLiteMemory(os.path.join(directory, "memory.db"))
+    return Memory(storage=create_storage(backend, os.path.join(directory, "memory.json")))
+
+
+def make_engine(args) -> FakeGeminiEngine:
+    reply = "x" * args.reply_chars
+    return FakeGeminiEngine(reply=lambda prompt: reply, latency=args.latency,
+                            chunk_size=args.chunk_size, chunk_delay=args.chunk_delay)
+
+
+def prefill(memory: Memory, conversation_id: str, messages: int) -> None:
+    for i in range(messages):
+        memory.add("user" if i % 2 == 0 else "assistant", f"prefilled message {i} " * 6, conversation_id)
+
+
+def run_turns(args, directory: str, stream: bool, conversations: int = 1) -> Dict:
+    memory = open_memory(args.backend, directory)
+    for c in range(conversations):
+        prefill(memory, f"conv-{c}", args.history // conversations)
+    engine = make_engine(args)
+    assistant = Assistant(engine, PromptController(), memory)
+
+    latencies = []
+    first_chunk = []
+    written_before = bytes_written()
+    disk_before = directory_size(directory)
+    start = time.perf_counter()
+
+    for turn in range(args.turns):
+        conv_id = f"conv-{turn % conversations}"
+        turn_start = time.perf_counter()
+        if stream:
+            for i, _ in enumerate(assistant.respond_stream(f"question {turn}", conv_id)):
+                if i == 0:
+                    first_chunk.append(time.perf_counter() - turn_start)
+        else:
+            assistant.respond(f"question {turn}", conv_id)
+        latencies.append(time.perf_counter() - turn_start)
+
+    elapsed = time.perf_counter() - start
+    memory.close()
+    written_after = bytes_written()
+
+    result = {
+        'turns': args.turns,
+        'conversations': conversations,
+        'elapsed_s': elapsed,
+        'throughput_turns_per_s': args.turns / elapsed if elapsed else 0.0,
+        'latency': latency_summary(latencies),
+        'disk_growth_bytes': directory_size(directory) - disk_before,
+        'bytes_written': (written_after - written_before) if written_before is not None else None,
+        'bytes_written_per_turn': ((written_after - written_before) / args.turns
+                                   if written_before is not None and args.turns else None)
+    }
+    if stream:
+        result['time_to_first_chunk'] = latency_summary(first_chunk)
+    return result
+
+
+def run_memory_load(args, directory: str) -> Dict:
+    path = os.path.join(directory, "memory.json")
+    per_conversation = max(1, args.history // args.conversations)
+    conversations = {
+        f"conv-{c}": [
+            {'role': "user" if i % 2 == 0 else "assistant",
+             'message': f"stored message {i} " * 6,
+             'timestamp': "2025-01-01T12:00:00"}
+            for i in range(per_conversation)
+        ]
+        for c in range(args.conversations)
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'conversations': conversations, 'current_conversation_id': None}, f, indent=2)
+    del conversations
+
+    if args.backend == "sqlite":
+        memory = SQLiteMemory(os.path.join(directory, "memory.db"))
+        memory.import_json(path)
+        memory.close()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    memory = open_memory(args.backend, directory)
+    memory.get_conversation_ids(limit=20)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory.close()
+
+    return {
+        'messages': per_conversation * args.conversations,
+        'conversations': args.conversations,
+        'file_bytes': os.path.getsize(path),
+        'load_s': elapsed,
+        'resident_bytes': current,
+        'peak_bytes': peak
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+",
+                        default=["respond", "respond_stream", "many_conversations", "memory_load"])
+    parser.add_argument("--backend", choices=BACKENDS, default="json")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--history", type=int, default=2000, help="messages stored before measuring")
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake engine time to first chunk (s)")
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--reply-chars", type=int, default=800)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {'environment': environment(), 'config': vars(args), 'scenarios': {}}
+    for scenario in args.scenarios:
+        with tempfile.TemporaryDirectory() as directory:
+            if scenario == "respond":
+                result = run_turns(args, directory, stream=False)
+            elif scenario == "respond_stream":
+                result = run_turns(args, directory, stream=True)
+            elif scenario == "many_conversations":
+                result = run_turns(args, directory, stream=False, conversations=args.conversations)
+            elif scenario == "memory_load":
+                result = run_memory_load(args, directory)
+            else:
+                parser.error(f"unknown scenario '{scenario}'")
+        results['scenarios'][scenario] = result
+
+        summary = result.get('latency')
+        if summary:
+            print(f"{scenario:<20} p50 {summary['p50_ms']:8.2f} ms  p95 {summary['p95_ms']:8.2f} ms  "
+                  f"{result['throughput_turns_per_s']:8.1f} turns/s  "
+                  f"{(result['bytes_written_per_turn'] or 0) / 1024:8.1f} KiB written/turn")
+        else:
+            print(f"{scenario:<20} load {result['load_s'] * 1000:8.2f} ms  "
+                  f"resident {result['resident_bytes'] / 1024 / 1024:8.2f} MiB  "
+                  f"({result['messages']} messages, {result['file_bytes'] / 1024 / 1024:.2f} MiB file)")
+
+    if args.output:
+        write_results(args.output, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Benchmark: voice-to-first-token latency, one-shot recognition against VoicePipeline.
+
+Plays a synthetic WAV of ``--speech-seconds`` in real time and answers the
+transcript with a fake engine. The recognizer is a ScriptedRecognizer that
+costs ``--recognition-latency`` per call plus ``--recognition-rate`` per
+second of audio, and recall over past conversations costs ``--recall-ms``.
+
+The baseline works like VoiceHandler: calibrate for 0.5 s, record the whole
+utterance, recognize it in one call, then build the prompt and generate.
+The pipeline reuses the calibration, recognizes chunks while the user is
+speaking and lets Assistant.prepare() pack the context and run recall on
+the partial transcript.
+Latency is measured from the end of speech to the first streamed token,
+and from the click to the first token.
+
+    python -m benchmarks.voice_pipeline --speech-seconds 6 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+from aurion.assistant import Assistant
+from aurion.memory import Memory
+from aurion.prompt_controller import PromptController
+from aurion.storage import NullStorage
+from aurion.testing import FakeGeminiEngine
+from aurion.voice_pipeline import ScriptedRecognizer, VoicePipeline, WaveFileSource
+from benchmarks.common import environment, write_results
+
+CALIBRATION_SECONDS = 0.5  # VoiceHandler's adjust_for_ambient_noise on every call
+SAMPLE_RATE = 16000
+
+WORDS = "could you explain how a hash map handles collisions and when it needs to resize".split()
+
+
+class TimedRecall:
+    """Stand-in for Retriever whose search takes a fixed time"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def search(self, query, k=3, conversation_id=None, exclude_recent=0):
+        time.sleep(self.seconds)
+        return []
+
+
+def write_speech(path: str, seconds: float) -> None:
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(b"\x00\x01" * int(SAMPLE_RATE * seconds))
+
+
+def transcripts(chunks: int) -> list:
+    per_chunk = max(1, len(WORDS) // chunks)
+    return [" ".join(WORDS[i * per_chunk:(i + 1) * per_chunk if i < chunks - 1 else None]) for i in range(chunks)]
+
+
+def make_assistant(args) -> Assistant:
+    memory = Memory(storage=NullStorage())
+    for i in range(40):
+        memory.add("user" if i % 2 == 0 else "assistant", f"Earlier message {i} about data structures", "voice")
+    assistant = Assistant(FakeGeminiEngine(latency=args.first_token_latency, chunk_size=8),
+                          PromptController(), memory)
+    assistant.retriever = TimedRecall(args.recall_ms / 1000)
+    return assistant
+
+
+def first_token(assistant: Assistant, text: str) -> float:
+    for _ in assistant.respond_stream(text, "voice"):
+        return time.perf_counter()
+    return time.perf_counter()
+
+
+def baseline(path: str, args) -> dict:
+    assistant = make_assistant(args)
+    recognizer = ScriptedRecognizer([" ".join(WORDS)], args.recognition_latency, args.recognition_rate)
+    clicked = time.perf_counter()
+    time.sleep(CALIBRATION_SECONDS)
+    source = WaveFileSource(path, chunk_seconds=args.speech_seconds + 1, realtime=True)
+    chunk = next(source.chunks(threading.Event()))
+    speech_ended = time.perf_counter()
+    text = recognizer.transcribe(chunk)
+    token = first_token(assistant, text)
+    return {'after_speech': token - speech_ended, 'after_click': token - clicked}
+
+
+def pipelined(path: str, args) -> dict:
+    assistant = make_assistant(args)
+    chunks = max(1, round(args.speech_seconds / args.chunk_seconds))
+    recognizer = ScriptedRecognizer(transcripts(chunks), args.recognition_latency, args.recognition_rate)
+    clicked = time.perf_counter()
+    pipeline = VoicePipeline(WaveFileSource(path, args.chunk_seconds, realtime=True), recognizer,
+                             on_partial=lambda partial: assistant.prepare(partial, "voice")).start()
+    text = pipeline.result()
+    token = first_token(assistant, text)
+    return {'after_speech': token - pipeline.speech_ended_at, 'after_click': token - clicked}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--speech-seconds", type=float, default=6.0)
+    parser.add_argument("--chunk-seconds", type=float, default=1.0)
+    parser.add_argument("--recognition-latency", type=float, default=0.15, help="Seconds per recognizer call")
+    parser.add_argument("--recognition-rate", type=float, default=0.08, help="Recognizer seconds per audio second")
+    parser.add_argument("--recall-ms", type=float, default=40.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.3)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "speech.wav")
+        write_speech(path, args.speech_seconds)
+        for name, run in (("baseline", baseline), ("pipeline", pipelined)):
+            samples = [run(path, args) for _ in range(args.runs)]
+            results[name] = {f"{key}_ms": statistics.median(sample[key] for sample in samples) * 1000
+                             for key in ('after_speech', 'after_click')}
+            print(f"{name:>8}: end of speech -> first token {results[name]['after_speech_ms']:.0f} ms, "
+                  f"click -> first token {results[name]['after_click_ms']:.0f} ms (median of {args.runs})")
+
+    saved = results['baseline']['after_speech_ms'] - results['pipeline']['after_speech_ms']
+    print(f"voice-to-first-token: {saved:.0f} ms faster "
+          f"({saved / results['baseline']['after_speech_ms']:.0%})")
+
+    if args.output:
+        write_results(args.output, {
+            'environment': environment(),
+            'speech_seconds': args.speech_seconds,
+            'chunk_seconds': args.chunk_seconds,
+            'results': results
+        })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,19 @@
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Optional, Tuple
 
 class Settings:
     """
     Handles application configuration and environment variables
     """
     
+    # Approximate list prices in USD per million (input, output) tokens, for routing cost stats
+    MODEL_PRICES = {
+        "gemini-2.5-flash-lite": (0.10, 0.40),
+        "gemini-2.5-flash": (0.30, 2.50),
+        "gemini-2.5-pro": (1.25, 10.00)
+    }
+    
     def __init__(self):
         load_dotenv()
         self._api_key: Optional[str] = None
@@ -27,4 +34,101 @@ class Settings:
     def get_data_dir() -> str:
         data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
         os.makedirs(data_dir, exist_ok=True)
-        return data_dir
\ No newline at end of file
+        return data_dir
+    
+    @staticmethod
+    def get_memory_backend() -> str:
+        return os.getenv("AURION_MEMORY_BACKEND", "json")
+    
+    @staticmethod
+    def get_memory_file() -> str:
+        """Memory file of the json and journal backends"""
+        return os.getenv("AURION_MEMORY_FILE") or os.path.join(Settings.get_data_dir(), "memory.json")
+    
+    @staticmethod
+    def get_memory_db() -> str:
+        """Database of the sqlite backend; ``python -m aurion.sqlite_memory`` migrates the memory file into it"""
+        return os.getenv("AURION_MEMORY_DB") or os.path.join(Settings.get_data_dir(), "memory.db")
+    
+    @staticmethod
+    def is_response_cache_enabled() -> bool:
+        return os.getenv("AURION_RESPONSE_CACHE", "").lower() in ("1", "true", "yes")
+    
+    @staticmethod
+    def get_rate_limits() -> Tuple[float, Optional[float]]:
+        """Client-side quota: (requests per second, prompt tokens per minute or None)"""
+        rps = float(os.getenv("AURION_RATE_LIMIT_RPS", "5"))
+        tpm = os.getenv("AURION_RATE_LIMIT_TPM")
+        return rps, float(tpm) if tpm else None
+    
+    @staticmethod
+    def is_model_routing_enabled() -> bool:
+        return os.getenv("AURION_MODEL_ROUTING", "").lower() in ("1", "true", "yes")
+    
+    @staticmethod
+    def get_model_tiers() -> Tuple[str, str]:
+        """(fast, slow) model names used when model routing is enabled"""
+        return (os.getenv("AURION_FAST_MODEL", "gemini-2.5-flash-lite"),
+                os.getenv("AURION_SLOW_MODEL", "gemini-2.5-pro"))
+    
+    @staticmethod
+    def is_retrieval_enabled() -> bool:
+        return os.getenv("AURION_RETRIEVAL", "").lower() in ("1", "true", "yes")
+    
+    @staticmethod
+    def get_archive_idle_days() -> Optional[float]:
+        """Conversations idle this long are moved to the compressed archive at startup"""
+        days = os.getenv("AURION_ARCHIVE_IDLE_DAYS")
+        return float(days) if days else None
+    
+    @staticmethod
+    def get_retention_max_messages() -> Optional[int]:
+        """Oldest messages beyond this many per conversation are deleted"""
+        count = os.getenv("AURION_RETENTION_MAX_MESSAGES")
+        return int(count) if count else None
+    
+    @staticmethod
+    def get_retention_max_mb() -> Optional[float]:
+        """Least recently active conversations are deleted while all history exceeds this size"""
+        size = os.getenv("AURION_RETENTION_MAX_MB")
+        return float(size) if size else None
+    
+    @staticmethod
+    def get_retention_idle_days() -> Optional[float]:
+        """Conversations idle this long are deleted"""
+        days = os.getenv("AURION_RETENTION_IDLE_DAYS")
+        return float(days) if days else None
+    
+    @staticmethod
+    def get_max_resident_conversations() -> Optional[int]:
+        """Least recently used conversations beyond this many are moved to the archive"""
+        count = os.getenv("AURION_MAX_RESIDENT_CONVERSATIONS")
+        return int(count) if count else None
+    
+    @staticmethod
+    def get_retention_interval() -> float:
+        """Seconds between retention sweeps"""
+        return float(os.getenv("AURION_RETENTION_INTERVAL", "60"))
+    
+    @staticmethod
+    def get_roles_dir() -> Optional[str]:
+        """Directory of role templates (``<role>.json``) replacing ``config/roles``"""
+        return os.getenv("AURION_ROLES_DIR") or None
+    
+    @staticmethod
+    def get_voice_recognizer() -> str:
+        """"google" (Google Web Speech) or "sphinx" (offline, needs pocketsphinx)"""
+        return os.getenv("AURION_VOICE_RECOGNIZER", "google")
+    
+    @staticmethod
+    def get_service_url() -> Optional[str]:
+        """Base URL of an Aurion service (python -m aurion.service); the app then acts as its client"""
+        return os.getenv("AURION_SERVICE_URL") or None
+    
+    @staticmethod
+    def is_tracing_enabled() -> bool:
+        return os.getenv("AURION_TRACING", "").lower() in ("1", "true", "yes")
+    
+    @staticmethod
+    def get_trace_file() -> Optional[str]:
+        return os.getenv("AURION_TRACE_FILE") or None